@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -28,6 +29,9 @@ SECRET_KEY = 'django-insecure-5%3a@fm6qr9ddvszjwp^8o2jc31+ebeqj$o(jjgwsxc6w!d$i!
 DEBUG = True
 
 ALLOWED_HOSTS = ["*"]
+
+# 'manage.py test' ile çalışırken gerçek önbellek ve log dosyalarına yazılmaz
+TESTING = sys.argv[1:2] == ['test']
 X_FRAME_OPTIONS = 'SAMEORIGIN'
 
 STATICFILES_DIRS = [
@@ -53,6 +57,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Oturum/kullanıcı sorguları da sayılsın diye en başta
+    'core_utils.middleware.SorguOlcumuMiddleware',
+    # Okuma isteklerindeki atomic bloklar yazma kilidi beklemesin (bkz. core_utils/sqlite3)
+    'core_utils.middleware.OkumaIstegiMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -87,12 +95,122 @@ WSGI_APPLICATION = 'Web.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # Django'nun sqlite3 backend'i; transaction'lar BEGIN IMMEDIATE ile başlar (core_utils/sqlite3).
+        # Yazma kilidi salt okunur atomic bloklarda da alınır; GET/HEAD istekleri bu yüzden
+        # OkumaIstegiMiddleware ile düz BEGIN kullanır.
+        'ENGINE': 'core_utils.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Bağlantı her istekte yeniden açılmaz; kopan/bozulan bağlantı istek başında kontrol edilir
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        # Test veritabanı dosyada tutulur; eşzamanlılık testleri birden fazla bağlantı açabilsin
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
 
+# SQLite bağlantı ayarları; her yeni bağlantıda connection_created ile uygulanır (core_utils.db).
+# WAL modunda okuyucular yazarı, yazar da okuyucuları beklemez; aynı anda tek yazar kalır ve
+# diğer yazarlar busy_timeout kadar sırada bekler ('database is locked' hatası yerine).
+
+SQLITE_PRAGMALARI = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL', # WAL ile güvenli; fsync her commit yerine checkpoint'te yapılır
+    'busy_timeout': 5000, # ms
+    'mmap_size': 256 * 1024 * 1024, # bayt
+    'cache_size': -64 * 1024, # negatif değer KiB cinsindendir (64 MB)
+    'temp_store': 'MEMORY',
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Dashboard önbelleği tüm worker süreçleri arasında paylaşılmalıdır, bu yüzden süreç içi
+# LocMemCache yerine dosya tabanlı önbellek kullanılır. Önbellek anahtarlarındaki veri sürümü
+# sayacı önbellekte değil veritabanında (core_utils.VeriSurumu) tutulur; girdiler rastgele
+# silinse (cull) de eski sürümlü sayfalar geri gelmez.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        # Sayaç önbellekten veritabanına taşınırken 1'den yeniden başladı; eski 'vN' girdileri
+        # yeni sayaç değerleriyle çakışmasın diye anahtar sürümü artırıldı
+        'VERSION': 2,
+    }
+}
+
+if TESTING:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'testler',
+        }
+    }
+
+DASHBOARD_CACHE_TIMEOUT = 60 * 60 # saniye
+DASHBOARD_CACHE_LOCK_TIMEOUT = 30 # saniye
+DASHBOARD_GIDER_PIVOT_AY_SAYISI = 6 # Kategori bazlı gider tablosunda gösterilecek ay sayısı
+AUTOCOMPLETE_CACHE_TIMEOUT = 5 * 60 # saniye; müşteri/ürün değişince sürüm artar
+STOK_AYARLARI_CACHE_TIMEOUT = 5 * 60 # saniye; kayıt değişince ayrıca temizlenir
+
+
+# İstek başına sorgu ölçümü (core_utils.middleware.SorguOlcumuMiddleware)
+# Üretimde ORNEKLEME_ORANI düşürülmelidir (örn. 0.05); ölçülmeyen istekler ek sorgu/zaman maliyeti getirmez.
+
+SORGU_OLCUMU = {
+    'ORNEKLEME_ORANI': 0 if TESTING else 1.0 if DEBUG else 0.05, # testler ölçümü kendi ayarlarıyla açar
+    'SORGU_BUTCESI': 50,
+    'GORUNUM_BUTCELERI': {
+        'admin:index': 25, # custom_admin_dashboard
+        'admin:satis_satis_changelist': 15,
+        'admin:siparis_siparis_changelist': 15,
+        'admin:giderler_gider_changelist': 15,
+        'admin:autocomplete': 10,
+        'pos_satis': 20,
+    },
+    'YAVAS_SORGU_SAYISI': 5,
+    'TEKRAR_ESIGI': 5,
+    'SERVER_TIMING': True,
+}
+
+# Birden fazla worker süreci aynı dosyaya yazar; RotatingFileHandler süreçler arası güvenli
+# değildir (her süreç kendi başına döndürür, satırlar kaybolur). WatchedFileHandler dosya
+# dışarıdan (logrotate vb.) taşındığında yeniden açar; döndürme sunucu tarafında yapılmalıdır:
+#   /yol/logs/*.jsonl { daily rotate 7 compress missingok notifempty }
+LOG_DIR = BASE_DIR / 'logs'
+if not TESTING:
+    LOG_DIR.mkdir(exist_ok=True)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'yalin': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'sorgu_dosyasi': {
+            'class': 'logging.handlers.WatchedFileHandler',
+            'filename': LOG_DIR / 'sorgular.jsonl',
+            'encoding': 'utf-8',
+            'delay': True,
+            'formatter': 'yalin',
+        } if not TESTING else {
+            'class': 'logging.NullHandler',
+        },
+    },
+    'loggers': {
+        'optik.sorgular': {
+            'handlers': ['sorgu_dosyasi'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -1,3 +1,96 @@
+# core_utils/admin.py
+
+import hashlib
+
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.autocomplete import AutocompleteJsonView
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.http import JsonResponse
+
+from core_utils import arama
+from core_utils.cache import surumlu_onbellek
+
+
+class OnekAramaMixin:
+    """
+    Otomatik tamamlama (autocomplete) isteklerinde search_fields yerine
+    onek_arama_alanlari üzerinde önek (istartswith) araması yapar.
+    Önek araması ilgili sütunlardaki NOCASE indeksleri kullanabilir;
+    '%terim%' biçimindeki LIKE sorguları tüm tabloyu tarar.
+    """
+    onek_arama_alanlari = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        eslesme = request.resolver_match
+        if not (self.onek_arama_alanlari and search_term and eslesme and eslesme.url_name == 'autocomplete'):
+            return super().get_search_results(request, queryset, search_term)
+
+        for kelime in search_term.split():
+            kosul = Q()
+            for alan in self.onek_arama_alanlari:
+                kosul |= Q(**{f'{alan}__istartswith': kelime})
+            queryset = queryset.filter(kosul)
+        return queryset, False
+
+
+class FtsAramaMixin:
+    """
+    Admin aramasını search_fields üzerindeki '%terim%' LIKE taraması yerine
+    modelin FTS5 arama tablosundan yapar (bkz. core_utils.arama).
+    Veritabanı desteklemiyorsa Django'nun varsayılan aramasına döner.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if search_term and arama.destekleniyor(queryset.model, queryset.db):
+            eslesme = arama.eslesen_idler_sql(queryset.model, search_term)
+            if eslesme is not None:
+                return queryset.filter(pk__in=RawSQL(*eslesme)), False
+        return super().get_search_results(request, queryset, search_term)
+
+
+class OnbellekliAutocompleteJsonView(AutocompleteJsonView):
+    """
+    Otomatik tamamlama sonuçlarını hedef modelin kapsamlı veri sürümüyle önbelleğe alır.
+    Yetki kontrolü her istekte yapılır; sadece sorgu sonucu paylaşılır.
+    """
+
+    def get(self, request, *args, **kwargs):
+        (
+            self.term,
+            self.model_admin,
+            self.source_field,
+            to_field_name,
+        ) = self.process_request(request)
+
+        if not self.has_perm(request):
+            raise PermissionDenied
+
+        def hesapla():
+            self.object_list = self.get_queryset()
+            context = self.get_context_data()
+            return {
+                "results": [
+                    self.serialize_result(obj, to_field_name)
+                    for obj in context["object_list"]
+                ],
+                "pagination": {"more": context["page_obj"].has_next()},
+            }
+
+        kaynak = f"{self.source_field.model._meta.label_lower}.{self.source_field.name}"
+        terim = hashlib.md5(self.term.encode()).hexdigest()
+        sayfa = request.GET.get(self.page_kwarg, '1')
+        kapsam = self.model_admin.model._meta.label_lower
+        sonuc = surumlu_onbellek(
+            f"autocomplete:{kaynak}:{to_field_name}:{sayfa}:{terim}",
+            hesapla,
+            timeout=getattr(settings, 'AUTOCOMPLETE_CACHE_TIMEOUT', 5 * 60),
+            kapsam=kapsam,
+        )
+        return JsonResponse(sonuc)
+
 
-# Register your models here.
+def autocomplete_view(request):
+    return OnbellekliAutocompleteJsonView.as_view(admin_site=admin.site)(request)
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CoreUtilsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core_utils'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from core_utils import signals  # noqa: F401
+        from core_utils.db import sqlite_ayarlarini_uygula
+
+        connection_created.connect(sqlite_ayarlarini_uygula, dispatch_uid='sqlite_ayarlarini_uygula')
@@ -0,0 +1,154 @@
+# core_utils/arama.py
+
+import re
+
+from django.db import connections, transaction
+
+# Tam metin arama (SQLite FTS5) indeksine alınan modeller ve alanları.
+# Her model için '<tablo>_arama' adında bir FTS5 tablosu tutulur; satırın rowid'i kaydın pk'sıdır.
+ARAMA_ALANLARI = {
+    'urun.urun': ('ad', 'marka', 'model_kodu', 'aciklama'),
+    'musteri.musteri': ('ad', 'soyad', 'telefon', 'eposta'),
+}
+
+# Metin Python tarafında katlandığı için tokenizer'ın ayrıca Türkçe bilmesi gerekmez
+FTS_TOKENIZER = 'unicode61 remove_diacritics 2'
+
+_TURKCE_BUYUK_HARFLER = str.maketrans({'İ': 'i', 'I': 'ı'})
+_TURKCE_KARAKTERLER = str.maketrans('ıçğöşü', 'icgosu')
+_AYRACLAR = re.compile(r'[\s\-./()]+')
+_KELIME = re.compile(r'\w+')
+
+
+def turkce_katla(metin):
+    """
+    Metni Türkçe kurallarıyla küçük harfe çevirip ASCII karşılıklarına indirger
+    ('İSTANBUL' -> 'istanbul', 'IŞIK' -> 'isik', 'Çağrı' -> 'cagri').
+    Hem indekslenen metne hem arama terimine uygulanır.
+    """
+    if not metin:
+        return ''
+    return str(metin).translate(_TURKCE_BUYUK_HARFLER).lower().translate(_TURKCE_KARAKTERLER)
+
+
+def _etiket(model):
+    return model._meta.concrete_model._meta.label_lower
+
+
+def arama_tablosu(model):
+    return f"{model._meta.concrete_model._meta.db_table}_arama"
+
+
+def destekleniyor(model, using='default'):
+    return _etiket(model) in ARAMA_ALANLARI and connections[using].vendor == 'sqlite'
+
+
+def _arama_metni(degerler):
+    parcalar = []
+    for deger in degerler:
+        if not deger:
+            continue
+        deger = str(deger)
+        parcalar.append(deger)
+        # '0532 123 45 67' / 'RB-3025' gibi değerler bitişik yazılarak da bulunabilsin
+        bitisik = _AYRACLAR.sub('', deger)
+        if bitisik != deger and any(karakter.isdigit() for karakter in deger):
+            parcalar.append(bitisik)
+    return turkce_katla(' '.join(parcalar))
+
+
+def tabloyu_olustur(model, using='default'):
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS "{arama_tablosu(model)}" '
+            f"USING fts5(metin, tokenize='{FTS_TOKENIZER}')"
+        )
+
+
+def tabloyu_kaldir(model, using='default'):
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS "{arama_tablosu(model)}"')
+
+
+def indeksle(model, nesneler, using='default'):
+    """Verilen kayıtların arama satırlarını (yeniden) yazar."""
+    if not destekleniyor(model, using):
+        return
+    alanlar = ARAMA_ALANLARI[_etiket(model)]
+    satirlar = [
+        (nesne.pk, _arama_metni(getattr(nesne, alan) for alan in alanlar))
+        for nesne in nesneler
+    ]
+    if not satirlar:
+        return
+    tablo = arama_tablosu(model)
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.executemany(f'DELETE FROM "{tablo}" WHERE rowid = %s', [(pk,) for pk, _ in satirlar])
+        cursor.executemany(f'INSERT INTO "{tablo}" (rowid, metin) VALUES (%s, %s)', satirlar)
+
+
+def indeksten_sil(model, pkler, using='default'):
+    if not destekleniyor(model, using):
+        return
+    pkler = list(pkler)
+    if pkler:
+        with connections[using].cursor() as cursor:
+            cursor.executemany(f'DELETE FROM "{arama_tablosu(model)}" WHERE rowid = %s', [(pk,) for pk in pkler])
+
+
+@transaction.atomic
+def yeniden_olustur(model, using='default', parca_boyutu=2000):
+    """Modelin arama tablosunu sıfırdan doldurur. Eklenen kayıt sayısını döndürür."""
+    if not destekleniyor(model, using):
+        return 0
+    alanlar = ARAMA_ALANLARI[_etiket(model)]
+    tablo = arama_tablosu(model)
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM "{tablo}"')
+        sayi = 0
+        satirlar = []
+        kayitlar = model._base_manager.using(using).values_list('pk', *alanlar).iterator(chunk_size=parca_boyutu)
+        for pk, *degerler in kayitlar:
+            satirlar.append((pk, _arama_metni(degerler)))
+            if len(satirlar) >= parca_boyutu:
+                cursor.executemany(f'INSERT INTO "{tablo}" (rowid, metin) VALUES (%s, %s)', satirlar)
+                sayi += len(satirlar)
+                satirlar = []
+        if satirlar:
+            cursor.executemany(f'INSERT INTO "{tablo}" (rowid, metin) VALUES (%s, %s)', satirlar)
+            sayi += len(satirlar)
+    return sayi
+
+
+def eslesme_ifadesi(terim):
+    """
+    Arama terimini FTS5 MATCH ifadesine çevirir: her kelime önek olarak aranır ve
+    tüm kelimelerin eşleşmesi gerekir (admin araması gibi). Kelime yoksa None.
+    """
+    kelimeler = _KELIME.findall(turkce_katla(terim))
+    if not kelimeler:
+        return None
+    return ' '.join(f'"{kelime}"*' for kelime in kelimeler)
+
+
+def eslesen_idler_sql(model, terim):
+    """
+    pk__in filtresinde kullanılacak (sql, parametreler) ikilisi döndürür;
+    terim aranabilir bir kelime içermiyorsa None.
+    """
+    ifade = eslesme_ifadesi(terim)
+    if ifade is None:
+        return None
+    tablo = arama_tablosu(model)
+    return f'SELECT rowid FROM "{tablo}" WHERE "{tablo}" MATCH %s', (ifade,)
+
+
+# --- Sinyal alıcıları ---
+
+def kayit_kaydedildi(sender, instance, raw=False, using='default', **kwargs):
+    if not raw:
+        indeksle(sender, [instance], using=using)
+
+
+def kayit_silindi(sender, instance, using='default', **kwargs):
+    indeksten_sil(sender, [instance.pk], using=using)
@@ -0,0 +1,158 @@
+# core_utils/benchmark.py
+
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import time
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.contrib import admin
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core_utils.cache import veri_surumunu_artir
+from core_utils.export import DISA_AKTARIMLAR, csv_akisi
+from giderler.models import Gider
+from musteri.models import Musteri
+from satis.models import Satis, SatisUrun
+from siparis.models import Siparis
+from urun.models import StokHareketi, Urun
+
+# Sonuç dosyasındaki 'veri' bölümünde sayılan tablolar
+SAYILAN_MODELLER = (Musteri, Urun, Satis, SatisUrun, Siparis, Gider, StokHareketi)
+TARIH_ALANLARI = {'satis': 'satis_tarihi', 'siparis': 'siparis_tarihi', 'gider': 'gider_tarihi'}
+
+
+def yuzdelik(sureler, oran):
+    sirali = sorted(sureler)
+    return sirali[min(len(sirali) - 1, int(round(oran * (len(sirali) - 1))))]
+
+
+def _git_surumu():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class BenchmarkCalistirici:
+    """
+    Dashboard, her admin changelist'i, arama/otomatik tamamlama ve CSV dışa aktarma yollarını
+    mevcut veritabanında ölçer. Her senaryo bir ısınma turundan sonra 'tekrar' kez çalıştırılır;
+    süre dağılımı ve sorgu sayısı kaydedilir.
+
+    Önbellekli sayfalar iki kez ölçülür: 'soguk' senaryolarda her turdan önce ilgili veri sürümü
+    artırılır (önbelleği silmeden geçersiz kılar), 'sicak' senaryolarda önbellek dolu kalır.
+    Sonuçlar sonuc() ile JSON'a yazılabilir ve karsilastir() ile önceki bir çalıştırmayla kıyaslanır.
+    """
+
+    def __init__(self, kullanici, tekrar=5, disa_aktarma_gun=365, filtre=None):
+        self.tekrar = tekrar
+        self.disa_aktarma_gun = disa_aktarma_gun
+        self.filtre = filtre
+        self.client = Client()
+        self.client.force_login(kullanici)
+        self.sonuclar = {}
+
+    def olc(self, ad, calistir, hazirla=None):
+        if self.filtre and self.filtre not in ad:
+            return
+        sureler, sorgu_sayisi = [], None
+        for tur in range(self.tekrar + 1):
+            if hazirla:
+                hazirla()
+            with CaptureQueriesContext(connection) as sorgular:
+                baslangic = time.perf_counter()
+                calistir()
+                sure = time.perf_counter() - baslangic
+            if tur: # ilk tur ısınma
+                sureler.append(sure * 1000)
+                sorgu_sayisi = len(sorgular)
+        self.sonuclar[ad] = {
+            'medyan_ms': round(statistics.median(sureler), 2),
+            'min_ms': round(min(sureler), 2),
+            'p95_ms': round(yuzdelik(sureler, 0.95), 2),
+            'max_ms': round(max(sureler), 2),
+            'sorgu_sayisi': sorgu_sayisi,
+        }
+
+    def _get(self, url):
+        def calistir():
+            response = self.client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} {response.status_code} döndü.")
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+        return calistir
+
+    def calistir(self):
+        dashboard = reverse('admin:index')
+        self.olc('dashboard:soguk', self._get(dashboard), hazirla=veri_surumunu_artir)
+        self.olc('dashboard:sicak', self._get(dashboard))
+
+        for model in admin.site._registry:
+            opts = model._meta
+            self.olc(f'changelist:{opts.label_lower}', self._get(reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')))
+
+        urun = Urun.objects.exclude(marka=None).order_by('pk').values('marka', 'model_kodu').first()
+        if urun:
+            urunler = reverse('admin:urun_urun_changelist')
+            self.olc('arama:urun:marka', self._get(f"{urunler}?q={urun['marka']}"))
+            if urun['model_kodu']:
+                self.olc('arama:urun:model_kodu', self._get(f"{urunler}?q={urun['model_kodu']}"))
+        musteri = Musteri.objects.order_by('pk').values('ad', 'soyad').first()
+        if musteri:
+            self.olc('arama:musteri', self._get(f"{reverse('admin:musteri_musteri_changelist')}?q={musteri['ad']} {musteri['soyad']}"))
+            otomatik = f"{reverse('admin:autocomplete')}?app_label=satis&model_name=satis&field_name=musteri&term={musteri['ad'][:3]}"
+            self.olc('autocomplete:musteri:soguk', self._get(otomatik), hazirla=lambda: veri_surumunu_artir('musteri.musteri'))
+            self.olc('autocomplete:musteri:sicak', self._get(otomatik))
+
+        baslangic = timezone.now() - timedelta(days=self.disa_aktarma_gun)
+        for tur, (model, satirlar) in DISA_AKTARIMLAR.items():
+            queryset = model.objects.filter(**{f'{TARIH_ALANLARI[tur]}__gte': baslangic})
+            self.olc(f'disa_aktarma:{tur}', lambda queryset=queryset, satirlar=satirlar: sum(1 for _ in csv_akisi(satirlar(queryset))))
+        return self
+
+    def sonuc(self):
+        return {
+            'olusturma': timezone.now().isoformat(),
+            'git': _git_surumu(),
+            'ortam': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'veritabani': connection.vendor,
+                'sqlite': sqlite3.sqlite_version if connection.vendor == 'sqlite' else None,
+            },
+            'tekrar': self.tekrar,
+            'disa_aktarma_gun': self.disa_aktarma_gun,
+            'veri': {model._meta.label_lower: model.objects.count() for model in SAYILAN_MODELLER},
+            'sonuclar': self.sonuclar,
+        }
+
+
+def karsilastir(onceki, simdiki):
+    """İki sonuç sözlüğündeki ortak senaryolar için (ad, önceki medyan, şimdiki medyan, % fark, sorgu farkı) döndürür."""
+    satirlar = []
+    for ad, sonuc in simdiki['sonuclar'].items():
+        eski = onceki['sonuclar'].get(ad)
+        if eski is None:
+            continue
+        fark = (sonuc['medyan_ms'] - eski['medyan_ms']) / eski['medyan_ms'] * 100 if eski['medyan_ms'] else 0.0
+        satirlar.append((ad, eski['medyan_ms'], sonuc['medyan_ms'], fark, sonuc['sorgu_sayisi'] - eski['sorgu_sayisi']))
+    return satirlar
+
+
+def sonuclari_oku(yol):
+    with open(yol, encoding='utf-8') as dosya:
+        return json.load(dosya)
@@ -0,0 +1,88 @@
+# core_utils/cache.py
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from core_utils.models import VeriSurumu
+
+GENEL_KAPSAM = ''
+
+
+def veri_surumu(kapsam=None):
+    """
+    Rapor verilerini etkileyen herhangi bir kayıt değiştiğinde artan global sayaç.
+    Önbellek anahtarları bu sürümü içerdiği için eski girdiler kendiliğinden geçersiz olur.
+    kapsam verilirse (örn. 'musteri.musteri') sadece o modele ait ayrı sayaç kullanılır.
+    Sayaç VeriSurumu tablosundadır; henüz hiç artırılmamış kapsamın sürümü 1'dir.
+    """
+    surum = VeriSurumu.objects.filter(kapsam=kapsam or GENEL_KAPSAM).values_list('surum', flat=True).first()
+    return surum or 1
+
+
+def veri_surumunu_artir(kapsam=None):
+    kapsam = kapsam or GENEL_KAPSAM
+    if VeriSurumu.objects.filter(kapsam=kapsam).update(surum=F('surum') + 1):
+        return
+    try:
+        with transaction.atomic():
+            VeriSurumu.objects.create(kapsam=kapsam, surum=2)
+    except IntegrityError:
+        # Başka bir süreç satırı aynı anda oluşturdu
+        VeriSurumu.objects.filter(kapsam=kapsam).update(surum=F('surum') + 1)
+
+
+def veri_degisti(sender=None, **kwargs):
+    # Sürüm işlem (transaction) tamamlandıktan sonra artırılır; aksi halde eşzamanlı bir
+    # istek eski veriyi yeni sürüm anahtarıyla önbelleğe yazabilir.
+    transaction.on_commit(veri_surumunu_artir)
+
+
+def model_verisi_degisti(sender, **kwargs):
+    # Sadece ilgili modelin kapsamlı sürümünü artırır (örn. otomatik tamamlama sonuçları).
+    # Proxy modeller asıl modelin sürümünü paylaşır.
+    kapsam = sender._meta.concrete_model._meta.label_lower
+    transaction.on_commit(lambda: veri_surumunu_artir(kapsam))
+
+
+def surumlu_onbellek(ad, hesapla, timeout=None, kapsam=None):
+    """
+    hesapla() sonucunu mevcut veri sürümüne (veya verilen kapsamın sürümüne) bağlı olarak önbellekte tutar.
+    Önbellek boşken aynı anda gelen isteklerden yalnızca biri hesaplama yapar
+    (single-flight); diğerleri sonucun yazılmasını kısa bir süre bekler.
+
+    Kilit cache.add ile alınır ve en iyi çaba (best-effort) esaslıdır: FileBasedCache'te add
+    süreçler arası atomik değildir, iki worker aynı anda kilidi alıp ikisi de hesaplayabilir.
+    Bu sadece fazladan bir hesaplama demektir; doğruluk veri sürümüne bağlıdır, kilide değil.
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 60 * 60)
+    bekleme_suresi = getattr(settings, 'DASHBOARD_CACHE_LOCK_TIMEOUT', 30)
+
+    anahtar = f"optik:{ad}:v{veri_surumu(kapsam)}"
+    deger = cache.get(anahtar)
+    if deger is not None:
+        return deger
+
+    kilit = f"{anahtar}:kilit"
+    if cache.add(kilit, 1, timeout=bekleme_suresi):
+        try:
+            deger = hesapla()
+            cache.set(anahtar, deger, timeout)
+        finally:
+            cache.delete(kilit)
+        return deger
+
+    # Başka bir istek hesaplıyor; sonucu bekle, süre dolarsa kendimiz hesaplayalım
+    bitis = time.monotonic() + bekleme_suresi
+    while time.monotonic() < bitis:
+        time.sleep(0.05)
+        deger = cache.get(anahtar)
+        if deger is not None:
+            return deger
+        if cache.get(kilit) is None:
+            break
+    return hesapla()
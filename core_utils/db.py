@@ -0,0 +1,41 @@
+# core_utils/db.py
+
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+
+def sqlite_ayarlarini_uygula(sender, connection, **kwargs):
+    """
+    connection_created sinyali ile her yeni SQLite bağlantısında SQLITE_PRAGMALARI ayarını uygular.
+    CONN_MAX_AGE ile bağlantılar istekler arasında yeniden kullanıldığı için PRAGMA'lar
+    istek başına değil, bağlantı başına bir kez çalışır.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmalar = getattr(settings, 'SQLITE_PRAGMALARI', {})
+    if not pragmalar:
+        return
+    with connection.cursor() as cursor:
+        for ad, deger in pragmalar.items():
+            cursor.execute(f'PRAGMA {ad} = {deger}')
+
+
+@contextmanager
+def ertelenmis_transactionlar():
+    """
+    Blok içinde açılan atomic() transaction'larını yazma kilidi almadan (düz 'BEGIN') başlatır.
+    Sadece okuma yapan kod yolları içindir: blok içinde yazmaya geçen bir transaction, başka bir
+    yazar araya girmişse busy_timeout beklemeden 'database is locked' alabilir.
+    Bağlantılar thread'e özel olduğu için ayar sadece çağıran thread'i etkiler.
+    """
+    baglantilar = [baglanti for baglanti in connections.all() if hasattr(baglanti, 'ertelenmis_transaction')]
+    oncekiler = [baglanti.ertelenmis_transaction for baglanti in baglantilar]
+    for baglanti in baglantilar:
+        baglanti.ertelenmis_transaction = True
+    try:
+        yield
+    finally:
+        for baglanti, onceki in zip(baglantilar, oncekiler):
+            baglanti.ertelenmis_transaction = onceki
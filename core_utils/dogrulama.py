@@ -0,0 +1,110 @@
+# core_utils/dogrulama.py
+
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from satis.models import Satis
+
+# Toplu içe aktarma (core_utils.importer) ve kasa uç noktası (core_utils.pos) için ortak
+# belge doğrulama yardımcıları. Hatalı değerler BelgeHatasi ile, alan adını içeren mesajla bildirilir.
+
+ODEME_SEKILLERI = {deger for deger, _ in Satis._meta.get_field('odeme_sekli').choices}
+
+
+class BelgeHatasi(ValueError):
+    pass
+
+
+def tutar(deger, alan, zorunlu=False):
+    if deger in (None, ''):
+        if zorunlu:
+            raise BelgeHatasi(f"'{alan}' zorunlu.")
+        return None
+    try:
+        sonuc = Decimal(str(deger)).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise BelgeHatasi(f"'{alan}' geçerli bir tutar değil: {deger}")
+    if sonuc < 0:
+        raise BelgeHatasi(f"'{alan}' negatif olamaz: {deger}")
+    return sonuc
+
+
+def tam_sayi(deger, alan):
+    try:
+        return int(deger)
+    except (TypeError, ValueError):
+        raise BelgeHatasi(f"'{alan}' tam sayı olmalı: {deger}")
+
+
+def zaman(deger, alan, varsayilan):
+    if deger in (None, ''):
+        return varsayilan
+    sonuc = parse_datetime(str(deger))
+    if sonuc is None:
+        gun = parse_date(str(deger))
+        if gun is None:
+            raise BelgeHatasi(f"'{alan}' geçerli bir tarih değil: {deger}")
+        sonuc = datetime(gun.year, gun.month, gun.day, 12) # sadece gün verilmişse gün ortası
+    if timezone.is_naive(sonuc):
+        sonuc = timezone.make_aware(sonuc)
+    return sonuc
+
+
+def secenek(deger, alan, secenekler, varsayilan):
+    if deger in (None, ''):
+        return varsayilan
+    if deger not in secenekler:
+        raise BelgeHatasi(f"'{alan}' geçersiz: {deger}")
+    return deger
+
+
+def sayisal_idler(degerler):
+    # Toplu varlık kontrolü sorgusuna sadece tam sayıya çevrilebilen id'ler gönderilir;
+    # diğerleri satır doğrulanırken tam_sayi ile hata verir
+    idler = []
+    for deger in degerler:
+        try:
+            idler.append(int(deger))
+        except (TypeError, ValueError):
+            pass
+    return idler
+
+
+def musteri_idsi(deger, mevcut_musteriler):
+    """Boş değer için None; aksi halde id'nin mevcut_musteriler içinde olduğunu doğrular."""
+    if deger in (None, ''):
+        return None
+    musteri_id = tam_sayi(deger, 'musteri_id')
+    if musteri_id not in mevcut_musteriler:
+        raise BelgeHatasi(f"Müşteri bulunamadı: {musteri_id}")
+    return musteri_id
+
+
+def urun_satirlari(satirlar, urun_fiyatlari):
+    """
+    Satış ürün satırlarını doğrular. urun_fiyatlari {urun_id: satis_fiyati} sözlüğüdür; fiyatı
+    verilmeyen satıra ürünün satış fiyatı yazılır (SatisUrun.save() ile aynı).
+    unique_together (satis, urun) nedeniyle aynı ürünün satırları birleştirilir.
+    """
+    urunler = {}
+    for satir in satirlar:
+        if not isinstance(satir, dict):
+            raise BelgeHatasi("Ürün satırı bir nesne olmalı.")
+        urun_id = tam_sayi(satir.get('urun_id'), 'urun_id')
+        if urun_id not in urun_fiyatlari:
+            raise BelgeHatasi(f"Ürün bulunamadı: {urun_id}")
+        adet = satir.get('adet')
+        adet = 1 if adet is None else tam_sayi(adet, 'adet') # sadece verilmemişse 1; 0 reddedilir
+        if adet <= 0:
+            raise BelgeHatasi(f"'adet' pozitif olmalı: {adet}")
+        birim_fiyat = tutar(satir.get('birim_fiyat'), 'birim_fiyat') or urun_fiyatlari[urun_id]
+        if urun_id in urunler:
+            if urunler[urun_id]['birim_fiyat'] != birim_fiyat:
+                raise BelgeHatasi(f"Ürün {urun_id} aynı satışta farklı fiyatlarla geçiyor.")
+            urunler[urun_id]['adet'] += adet
+        else:
+            urunler[urun_id] = {'urun_id': urun_id, 'adet': adet, 'birim_fiyat': birim_fiyat}
+    return list(urunler.values())
@@ -0,0 +1,158 @@
+# core_utils/export.py
+
+import csv
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from giderler.models import Gider
+from satis.models import Satis, SatisUrun
+from siparis.models import Siparis
+
+# Her seferde bellekte tutulacak kayıt sayısı (ilişkili satırlar da bu parça için tek sorguda çekilir)
+PARCA_BOYUTU = 2000
+
+
+class _Yanki:
+    # csv.writer'ın yazdığı satırı olduğu gibi döndürür; böylece satırlar tek tek üretilebilir
+    def write(self, deger):
+        return deger
+
+
+def _tarih(deger):
+    if not deger:
+        return ''
+    if hasattr(deger, 'hour'):
+        return timezone.localtime(deger).strftime('%Y-%m-%d %H:%M')
+    return deger.strftime('%Y-%m-%d')
+
+
+def _tutar(deger):
+    # SQLite'ta toplam annotation'ları tam sayı olarak dönebilir; hepsi iki basamakla yazılır
+    return f"{Decimal(deger):.2f}" if deger is not None else ''
+
+
+def _musteri(musteri):
+    return f"{musteri.ad} {musteri.soyad}" if musteri else ''
+
+
+def satis_satirlari(queryset, parca_boyutu=PARCA_BOYUTU):
+    """
+    Her satış için ürün satırlarını ve ödemeleri ayrı satırlar olarak üretir.
+    Satış toplamları SQL'de hesaplanır (tutarlari_ekle).
+    """
+    yield [
+        'Satış No', 'Satış Tarihi', 'Müşteri', 'Ödeme Şekli',
+        'Satış Toplamı', 'Ödenen', 'Kalan',
+        'Kayıt Türü', 'Ürün', 'Adet', 'Birim Fiyat', 'Tutar',
+        'Ödeme Şekli (Ödeme)', 'Ödeme Tarihi', 'Notlar',
+    ]
+    satislar = (
+        queryset.select_related('musteri').tutarlari_ekle()
+        .prefetch_related(None)
+        .prefetch_related(
+            Prefetch('satis_urunleri', queryset=SatisUrun.objects.select_related('urun').order_by('pk')),
+            'satis_odemeleri',
+        )
+        .order_by('pk')
+        .iterator(chunk_size=parca_boyutu)
+    )
+    for satis in satislar:
+        ortak = [
+            satis.pk, _tarih(satis.satis_tarihi), _musteri(satis.musteri), satis.odeme_sekli,
+            _tutar(satis.hesaplanan_toplam), _tutar(satis.odenen_toplam), _tutar(satis.kalan_tutar),
+        ]
+        satir_var = False
+        for satis_urun in satis.satis_urunleri.all():
+            satir_var = True
+            yield ortak + [
+                'Ürün', satis_urun.urun.ad if satis_urun.urun else '', satis_urun.adet,
+                _tutar(satis_urun.birim_fiyat), _tutar(satis_urun.adet * satis_urun.birim_fiyat),
+                '', '', '',
+            ]
+        for odeme in satis.satis_odemeleri.all():
+            satir_var = True
+            yield ortak + ['Ödeme', '', '', '', _tutar(odeme.miktar), odeme.odeme_sekli, _tarih(odeme.odeme_tarihi), odeme.notlar or '']
+        if not satir_var:
+            yield ortak + ['Satış', '', '', '', '', '', '', satis.notlar or '']
+
+
+def siparis_satirlari(queryset, parca_boyutu=PARCA_BOYUTU):
+    """Her sipariş için ödemeleri ayrı satırlar olarak üretir; ödemesiz siparişler tek satırdır."""
+    yield [
+        'Sipariş No', 'Sipariş Tarihi', 'Müşteri', 'Durum', 'Teslimat Tarihi',
+        'Toplam Tutar', 'Ödenen', 'Kalan',
+        'Ödeme Tutarı', 'Ödeme Şekli', 'Ödeme Tarihi', 'Notlar',
+    ]
+    siparisler = (
+        queryset.select_related('musteri').tutarlari_ekle()
+        .prefetch_related(None)
+        .prefetch_related('odemeler')
+        .order_by('pk')
+        .iterator(chunk_size=parca_boyutu)
+    )
+    for siparis in siparisler:
+        ortak = [
+            siparis.pk, _tarih(siparis.siparis_tarihi), _musteri(siparis.musteri), siparis.durum,
+            _tarih(siparis.teslimat_tarihi), _tutar(siparis.toplam_tutar), _tutar(siparis.odenen_toplam), _tutar(siparis.kalan_tutar),
+        ]
+        odemeler = siparis.odemeler.all()
+        for odeme in odemeler:
+            yield ortak + [_tutar(odeme.miktar), odeme.odeme_sekli, _tarih(odeme.odeme_tarihi), odeme.notlar or '']
+        if not odemeler:
+            yield ortak + ['', '', '', siparis.notlar or '']
+
+
+def gider_satirlari(queryset, parca_boyutu=PARCA_BOYUTU):
+    yield ['Gider No', 'Gider Tarihi', 'Kategori', 'Tutar', 'İlgili Kullanıcılar', 'Notlar']
+    kullanicilar = get_user_model().objects.only('id', 'username', 'first_name', 'last_name')
+    giderler = (
+        queryset.select_related('kategori')
+        .prefetch_related(None) # admin queryset'inden gelen prefetch'ler parça bazlı olanlarla çakışmasın
+        .prefetch_related(Prefetch('harcanan_kullanicilar', queryset=kullanicilar))
+        .order_by('pk')
+        .iterator(chunk_size=parca_boyutu)
+    )
+    for gider in giderler:
+        yield [
+            gider.pk, _tarih(gider.gider_tarihi), gider.kategori.ad if gider.kategori else '', _tutar(gider.miktar),
+            ", ".join(user.get_full_name() or user.username for user in gider.harcanan_kullanicilar.all()),
+            gider.notlar or '',
+        ]
+
+
+# tür -> (model, satır üreteci); admin aksiyonları ve 'export_data' komutu tarafından kullanılır
+DISA_AKTARIMLAR = {
+    'satis': (Satis, satis_satirlari),
+    'siparis': (Siparis, siparis_satirlari),
+    'gider': (Gider, gider_satirlari),
+}
+
+
+def csv_akisi(satirlar):
+    """Satırları CSV metni olarak tek tek üretir. Excel'in UTF-8 olarak açması için BOM ile başlar."""
+    yazici = csv.writer(_Yanki())
+    yield '\ufeff'
+    for satir in satirlar:
+        yield yazici.writerow(satir)
+
+
+def csv_yaniti(satirlar, dosya_adi):
+    response = StreamingHttpResponse(csv_akisi(satirlar), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{dosya_adi}"'
+    return response
+
+
+def disa_aktarma_aksiyonu(tur, dosya_oneki):
+    """Seçili kayıtları CSV olarak akış halinde indiren bir admin aksiyonu üretir."""
+    def aksiyon(modeladmin, request, queryset):
+        dosya_adi = f"{dosya_oneki}_{timezone.localdate():%Y%m%d}.csv"
+        return csv_yaniti(DISA_AKTARIMLAR[tur][1](queryset), dosya_adi)
+    aksiyon.short_description = "Seçili kayıtları CSV olarak dışa aktar"
+    aksiyon.allowed_permissions = ('view',)
+    aksiyon.__name__ = f'{tur}_csv_disa_aktar'
+    return aksiyon
+
@@ -0,0 +1,256 @@
+# core_utils/importer.py
+
+import csv
+import json
+import time
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from core_utils.cache import veri_degisti
+from core_utils.dogrulama import (
+    ODEME_SEKILLERI, BelgeHatasi, musteri_idsi, sayisal_idler, secenek, tutar, urun_satirlari, zaman,
+)
+from core_utils.models import DailyFinanceSnapshot
+from core_utils.reports import KAZANC_SIPARIS_DURUMLARI, SIFIR
+from core_utils.signals import snapshot_uygula
+from musteri.models import Musteri
+from satis.models import Satis, SatisOdeme, SatisUrun
+from siparis.models import Odeme, Siparis
+from urun.models import HAREKET_ICE_AKTARMA, Urun
+from urun.stok import farklari_birlestir, stok_farklarini_uygula
+
+SIPARIS_DURUMLARI = {deger for deger, _ in Siparis.SIPARIS_DURUM_SECENEKLERI}
+
+# CSV'de bir belgenin (satış/sipariş) başlık alanları; aynı 'tur' + 'kaynak_no' ile ardışık
+# gelen satırlar tek belgede birleştirilir, her satır bir ürün satırı ve/veya bir ödeme taşıyabilir.
+CSV_BASLIK_ALANLARI = ('tur', 'kaynak_no', 'tarih', 'musteri_id', 'odeme_sekli', 'durum', 'toplam_tutar', 'teslimat_tarihi', 'notlar')
+
+
+# --- Okuyucular ---
+# Her okuyucu (satır_no, belge) ikilileri üretir. Belge biçimi JSONL ile aynıdır:
+# {"tur": "satis", "tarih": ..., "musteri_id": ..., "odeme_sekli": ..., "notlar": ...,
+#  "urunler": [{"urun_id": ..., "adet": ..., "birim_fiyat": ...}],
+#  "odemeler": [{"miktar": ..., "odeme_sekli": ..., "tarih": ..., "notlar": ...}]}
+# {"tur": "siparis", "tarih": ..., "musteri_id": ..., "toplam_tutar": ..., "durum": ...,
+#  "teslimat_tarihi": ..., "notlar": ..., "odemeler": [...]}
+
+def jsonl_belgeleri(dosya):
+    for satir_no, satir in enumerate(dosya, start=1):
+        satir = satir.strip()
+        if not satir:
+            continue
+        try:
+            yield satir_no, json.loads(satir)
+        except json.JSONDecodeError as exc:
+            yield satir_no, BelgeHatasi(f"Geçersiz JSON: {exc}")
+
+
+def csv_belgeleri(dosya):
+    belge, anahtar, baslangic_satiri = None, None, None
+    for satir_no, satir in enumerate(csv.DictReader(dosya), start=2):
+        satir = {alan: (deger or '').strip() for alan, deger in satir.items() if alan}
+        satir_anahtari = (satir.get('tur'), satir.get('kaynak_no'))
+        if belge is None or not satir.get('kaynak_no') or satir_anahtari != anahtar:
+            if belge is not None:
+                yield baslangic_satiri, belge
+            belge = {alan: satir.get(alan) for alan in CSV_BASLIK_ALANLARI if satir.get(alan)}
+            belge['urunler'], belge['odemeler'] = [], []
+            anahtar, baslangic_satiri = satir_anahtari, satir_no
+        if satir.get('urun_id'):
+            belge['urunler'].append({
+                'urun_id': satir['urun_id'],
+                'adet': satir.get('adet') or None, # boş hücre = adet verilmemiş
+                'birim_fiyat': satir.get('birim_fiyat'),
+            })
+        if satir.get('odeme_miktar'):
+            belge['odemeler'].append({
+                'miktar': satir['odeme_miktar'],
+                'odeme_sekli': satir.get('odeme_odeme_sekli'),
+                'tarih': satir.get('odeme_tarihi'),
+                'notlar': satir.get('odeme_notlar'),
+            })
+    if belge is not None:
+        yield baslangic_satiri, belge
+
+
+class IceAktarici:
+    """
+    Satış ve siparişleri (ürün satırları ve ödemeleriyle) parça parça doğrulayıp bulk_create ile yazar.
+
+    Her parça kendi transaction'ında yazılır. Stok farkları parça boyunca ürün bazında toplanıp
+    stok_farklarini_uygula ile uygulanır. bulk_create sinyal tetiklemediği için günlük finans
+    özetleri ve dashboard veri sürümü de burada güncellenir.
+    Hatalı belgeler atlanır ve 'hatalar' listesine (satır_no, mesaj) olarak eklenir.
+    """
+
+    def __init__(self, parca_boyutu=1000, dry_run=False, stok_guncelle=True):
+        self.parca_boyutu = parca_boyutu
+        self.dry_run = dry_run
+        self.stok_guncelle = stok_guncelle
+        self.sayaclar = Counter()
+        self.hatalar = []
+        self.sure = 0.0
+
+    def calistir(self, belgeler):
+        baslangic = time.monotonic()
+        parca = []
+        for satir_no, belge in belgeler:
+            parca.append((satir_no, belge))
+            if len(parca) >= self.parca_boyutu:
+                self._parcayi_isle(parca)
+                parca = []
+        if parca:
+            self._parcayi_isle(parca)
+        if not self.dry_run and self.sayaclar['belge']:
+            veri_degisti()
+        self.sure = time.monotonic() - baslangic
+        return self
+
+    def _parcayi_isle(self, parca):
+        gecerliler = self._dogrula(parca)
+        self.sayaclar['okunan'] += len(parca)
+        if gecerliler and not self.dry_run:
+            self._yaz(gecerliler)
+        self.sayaclar['belge'] += len(gecerliler)
+        for belge in gecerliler:
+            self.sayaclar[belge['tur']] += 1
+            self.sayaclar['satis_urun'] += len(belge.get('urunler', ()))
+            self.sayaclar['odeme'] += len(belge['odemeler'])
+
+    # --- Doğrulama ---
+
+    def _dogrula(self, parca):
+        musteri_idleri, urun_idleri = set(), set()
+        for _, belge in parca:
+            if isinstance(belge, dict):
+                if belge.get('musteri_id') not in (None, ''):
+                    musteri_idleri.add(str(belge['musteri_id']))
+                urun_idleri.update(str(satir.get('urun_id')) for satir in belge.get('urunler') or () if isinstance(satir, dict))
+        # Parçadaki tüm referanslar iki sorguyla kontrol edilir
+        self._musteriler = set(Musteri.objects.filter(pk__in=sayisal_idler(musteri_idleri)).values_list('pk', flat=True))
+        self._urun_fiyatlari = dict(Urun.objects.filter(pk__in=sayisal_idler(urun_idleri)).values_list('pk', 'satis_fiyati'))
+
+        gecerliler = []
+        for satir_no, belge in parca:
+            try:
+                if isinstance(belge, Exception):
+                    raise belge
+                if not isinstance(belge, dict):
+                    raise BelgeHatasi("Belge bir nesne olmalı.")
+                gecerliler.append(self._belgeyi_dogrula(belge))
+            except BelgeHatasi as exc:
+                self.hatalar.append((satir_no, str(exc)))
+        return gecerliler
+
+    def _belgeyi_dogrula(self, belge):
+        tur = belge.get('tur')
+        if tur not in ('satis', 'siparis'):
+            raise BelgeHatasi(f"'tur' 'satis' veya 'siparis' olmalı: {tur}")
+
+        musteri_id = musteri_idsi(belge.get('musteri_id'), self._musteriler)
+        tarih = zaman(belge.get('tarih'), 'tarih', timezone.now())
+        temiz = {
+            'tur': tur,
+            'tarih': tarih,
+            'musteri_id': musteri_id,
+            'notlar': belge.get('notlar') or None,
+            'odemeler': [self._odemeyi_dogrula(odeme, tarih) for odeme in belge.get('odemeler') or ()],
+        }
+        if tur == 'satis':
+            temiz['odeme_sekli'] = secenek(belge.get('odeme_sekli'), 'odeme_sekli', ODEME_SEKILLERI, 'Nakit')
+            temiz['urunler'] = urun_satirlari(belge.get('urunler') or (), self._urun_fiyatlari)
+        else:
+            temiz['durum'] = secenek(belge.get('durum'), 'durum', SIPARIS_DURUMLARI, 'Beklemede')
+            temiz['toplam_tutar'] = tutar(belge.get('toplam_tutar'), 'toplam_tutar') or SIFIR
+            teslimat = belge.get('teslimat_tarihi')
+            temiz['teslimat_tarihi'] = parse_date(str(teslimat)) if teslimat else None
+            if teslimat and temiz['teslimat_tarihi'] is None:
+                raise BelgeHatasi(f"'teslimat_tarihi' geçerli bir tarih değil: {teslimat}")
+        return temiz
+
+    @staticmethod
+    def _odemeyi_dogrula(odeme, varsayilan_tarih):
+        if not isinstance(odeme, dict):
+            raise BelgeHatasi("Ödeme bir nesne olmalı.")
+        return {
+            'miktar': tutar(odeme.get('miktar'), 'miktar', zorunlu=True),
+            'odeme_sekli': secenek(odeme.get('odeme_sekli'), 'odeme_sekli', ODEME_SEKILLERI, 'Nakit'),
+            'tarih': zaman(odeme.get('tarih'), 'odeme tarihi', varsayilan_tarih),
+            'notlar': odeme.get('notlar') or None,
+        }
+
+    # --- Yazma ---
+
+    @staticmethod
+    def _tarihleri_yaz(model, nesneler, alan, tarihler):
+        # bulk_create auto_now_add alanlarını şimdiki zamanla doldurur; asıl tarihler tek UPDATE ile geri yazılır
+        for nesne, tarih in zip(nesneler, tarihler):
+            setattr(nesne, alan, tarih)
+        model.objects.bulk_update(nesneler, [alan])
+
+    @transaction.atomic
+    def _yaz(self, belgeler):
+        satis_belgeleri = [belge for belge in belgeler if belge['tur'] == 'satis']
+        siparis_belgeleri = [belge for belge in belgeler if belge['tur'] == 'siparis']
+        satis_farklari = {}
+        ozet_farklari = defaultdict(lambda: {'satis': SIFIR, 'siparis_odeme': SIFIR})
+
+        if satis_belgeleri:
+            satislar = Satis.objects.bulk_create([
+                Satis(musteri_id=belge['musteri_id'], odeme_sekli=belge['odeme_sekli'], notlar=belge['notlar'])
+                for belge in satis_belgeleri
+            ])
+            self._tarihleri_yaz(Satis, satislar, 'satis_tarihi', [belge['tarih'] for belge in satis_belgeleri])
+
+            satis_urunleri, odemeler, odeme_tarihleri = [], [], []
+            for satis, belge in zip(satislar, satis_belgeleri):
+                gun = timezone.localtime(belge['tarih']).date()
+                for satir in belge['urunler']:
+                    satis_urunleri.append(SatisUrun(satis=satis, **satir))
+                    ozet_farklari[gun]['satis'] += satir['adet'] * satir['birim_fiyat']
+                for odeme in belge['odemeler']:
+                    odemeler.append(SatisOdeme(satis=satis, miktar=odeme['miktar'], odeme_sekli=odeme['odeme_sekli'], notlar=odeme['notlar']))
+                    odeme_tarihleri.append(odeme['tarih'])
+            SatisUrun.objects.bulk_create(satis_urunleri)
+            if odemeler:
+                SatisOdeme.objects.bulk_create(odemeler)
+                self._tarihleri_yaz(SatisOdeme, odemeler, 'odeme_tarihi', odeme_tarihleri)
+            for satir in satis_urunleri:
+                satis_farki = satis_farklari.setdefault(satir.satis_id, {})
+                satis_farki[satir.urun_id] = satis_farki.get(satir.urun_id, 0) + satir.adet
+
+        if siparis_belgeleri:
+            siparisler = Siparis.objects.bulk_create([
+                Siparis(
+                    musteri_id=belge['musteri_id'], toplam_tutar=belge['toplam_tutar'], durum=belge['durum'],
+                    notlar=belge['notlar'], teslimat_tarihi=belge['teslimat_tarihi'],
+                )
+                for belge in siparis_belgeleri
+            ])
+            self._tarihleri_yaz(Siparis, siparisler, 'siparis_tarihi', [belge['tarih'] for belge in siparis_belgeleri])
+
+            odemeler, odeme_tarihleri = [], []
+            for siparis, belge in zip(siparisler, siparis_belgeleri):
+                kazanca_dahil = belge['durum'] in KAZANC_SIPARIS_DURUMLARI
+                for odeme in belge['odemeler']:
+                    odemeler.append(Odeme(siparis=siparis, miktar=odeme['miktar'], odeme_sekli=odeme['odeme_sekli'], notlar=odeme['notlar']))
+                    odeme_tarihleri.append(odeme['tarih'])
+                    if kazanca_dahil:
+                        ozet_farklari[timezone.localtime(odeme['tarih']).date()]['siparis_odeme'] += odeme['miktar']
+            if odemeler:
+                Odeme.objects.bulk_create(odemeler)
+                self._tarihleri_yaz(Odeme, odemeler, 'odeme_tarihi', odeme_tarihleri)
+
+        if self.stok_guncelle:
+            # Parçadaki tüm satırların stok düşümleri ürün başına tek farkta toplanır;
+            # defterde ise her satış ayrı hareket olarak görünür
+            stok_farklarini_uygula(farklari_birlestir(*satis_farklari.values()), HAREKET_ICE_AKTARMA, satis_farklari)
+        # Eksik gün özetleri tek INSERT ile açılır; ardından her gün için tek F() UPDATE çalışır
+        DailyFinanceSnapshot.objects.bulk_create(
+            [DailyFinanceSnapshot(gun=gun) for gun in ozet_farklari], ignore_conflicts=True,
+        )
+        for gun, fark in ozet_farklari.items():
+            snapshot_uygula(gun, satis=fark['satis'], siparis_odeme=fark['siparis_odeme'])
@@ -0,0 +1,64 @@
+# core_utils/management/commands/export_data.py
+
+import sys
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core_utils.export import DISA_AKTARIMLAR, csv_akisi
+
+TARIH_ALANLARI = {
+    'satis': 'satis_tarihi',
+    'siparis': 'siparis_tarihi',
+    'gider': 'gider_tarihi',
+}
+
+
+def _gun(deger):
+    try:
+        return datetime.strptime(deger, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Geçersiz tarih: {deger} (YYYY-AA-GG bekleniyor)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Satışları (ürün satırları ve ödemeleriyle), siparişleri (ödemeleriyle) veya giderleri "
+        "CSV olarak dışa aktarır. Kayıtlar parça parça okunur; bellek kullanımı kayıt sayısından bağımsızdır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('tur', choices=sorted(DISA_AKTARIMLAR), help="Dışa aktarılacak veri türü.")
+        parser.add_argument('--baslangic', type=_gun, help="Bu günden itibaren (YYYY-AA-GG, dahil).")
+        parser.add_argument('--bitis', type=_gun, help="Bu güne kadar (YYYY-AA-GG, dahil).")
+        parser.add_argument('--yil', type=int, help="Sadece verilen yılın kayıtları (--baslangic/--bitis yerine).")
+        parser.add_argument('--cikti', '-o', help="Çıktı dosyası; verilmezse standart çıktıya yazılır.")
+
+    def handle(self, *args, **options):
+        model, satir_uretici = DISA_AKTARIMLAR[options['tur']]
+        baslangic, bitis = options['baslangic'], options['bitis']
+        if options['yil']:
+            baslangic = datetime(options['yil'], 1, 1).date()
+            bitis = datetime(options['yil'], 12, 31).date()
+
+        queryset = model.objects.all()
+        tarih_alani = TARIH_ALANLARI[options['tur']]
+        tz = timezone.get_current_timezone()
+        if baslangic:
+            queryset = queryset.filter(**{f'{tarih_alani}__gte': datetime.combine(baslangic, time.min, tzinfo=tz)})
+        if bitis:
+            queryset = queryset.filter(**{f'{tarih_alani}__lte': datetime.combine(bitis, time.max, tzinfo=tz)})
+
+        dosya = open(options['cikti'], 'w', encoding='utf-8', newline='') if options['cikti'] else sys.stdout
+        satir_sayisi = -2 # BOM ve başlık satırı sayılmaz
+        try:
+            for parca in csv_akisi(satir_uretici(queryset)):
+                dosya.write(parca)
+                satir_sayisi += 1
+        finally:
+            if dosya is not sys.stdout:
+                dosya.close()
+
+        if options['cikti']:
+            self.stdout.write(self.style.SUCCESS(f"{satir_sayisi} satır '{options['cikti']}' dosyasına yazıldı."))
@@ -0,0 +1,57 @@
+# core_utils/management/commands/generate_data.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core_utils.sentetik import SentetikVeriUretici
+
+
+class Command(BaseCommand):
+    help = (
+        "Performans ölçümleri için gerçekçi sentetik veri üretir: müşteriler, kategorili ürünler, satışlar "
+        "(ürün satırları ve ödemeleriyle), tüm durumlarda siparişler ve kullanıcı etiketli giderler. "
+        "Diğer miktarlar verilmezse satış sayısına göre ölçeklenir. Mevcut veriye eklenir, hiçbir şey silinmez."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--satis', type=int, default=10000, help="Satış sayısı (örn. 10000, 100000, 1000000).")
+        parser.add_argument('--musteri', type=int, help="Müşteri sayısı (varsayılan: satış / 10).")
+        parser.add_argument('--urun', type=int, help="Ürün sayısı (varsayılan: satış / 50, en az 50).")
+        parser.add_argument('--siparis', type=int, help="Sipariş sayısı (varsayılan: satış / 4).")
+        parser.add_argument('--gider', type=int, help="Gider sayısı (varsayılan: satış / 20, en az aylık kategori başına bir).")
+        parser.add_argument('--kullanici', type=int, default=10, help="Giderlere etiketlenecek personel sayısı.")
+        parser.add_argument('--yil', type=int, default=3, help="Verinin yayılacağı yıl sayısı (bugünden geriye).")
+        parser.add_argument('--tohum', type=int, default=42, help="Rastgele sayı tohumu; aynı tohumla aynı veri üretilir.")
+        parser.add_argument('--parca-boyutu', type=int, default=2000, help="Tek seferde yazılacak kayıt sayısı.")
+        parser.add_argument('--stoksuz', action='store_true', help="Satışlar ürün stoklarını ve stok defterini değiştirmesin.")
+
+    def handle(self, *args, **options):
+        for alan in ('satis', 'musteri', 'urun', 'siparis', 'gider', 'kullanici'):
+            if options[alan] is not None and options[alan] < 0:
+                raise CommandError(f"--{alan} negatif olamaz.")
+        if options['yil'] < 1 or options['parca_boyutu'] < 1:
+            raise CommandError("--yil ve --parca-boyutu en az 1 olmalı.")
+
+        uretici = SentetikVeriUretici(
+            satis=options['satis'],
+            musteri=options['musteri'],
+            urun=options['urun'],
+            siparis=options['siparis'],
+            gider=options['gider'],
+            kullanici=options['kullanici'],
+            yil=options['yil'],
+            tohum=options['tohum'],
+            parca_boyutu=options['parca_boyutu'],
+            stok_guncelle=not options['stoksuz'],
+            ilerleme=self.stdout.write,
+        )
+        try:
+            uretici.calistir()
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        for adim, sure in uretici.sureler.items():
+            self.stdout.write(f"  {adim}: {sure:.2f} sn")
+        toplam = sum(uretici.sureler.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Tamamlandı ({toplam:.2f} sn): " + ", ".join(f"{sayi} {alan}" for alan, sayi in uretici.sayaclar.items())
+        ))
@@ -0,0 +1,66 @@
+# core_utils/management/commands/import_data.py
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core_utils.importer import IceAktarici, csv_belgeleri, jsonl_belgeleri
+
+OKUYUCULAR = {
+    'csv': csv_belgeleri,
+    'jsonl': jsonl_belgeleri,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Geçmiş satış ve siparişleri (ürün satırları ve ödemeleriyle) CSV veya JSONL dosyasından toplu olarak içe aktarır. "
+        "Kayıtlar parça parça doğrulanır ve bulk_create ile yazılır; stok düşümleri parça başına ürün bazında toplanır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dosya', help="İçe aktarılacak .csv veya .jsonl dosyası.")
+        parser.add_argument('--format', choices=sorted(OKUYUCULAR), help="Dosya biçimi; verilmezse uzantıdan anlaşılır.")
+        parser.add_argument('--parca-boyutu', type=int, default=1000, help="Tek seferde doğrulanıp yazılacak belge sayısı.")
+        parser.add_argument('--dry-run', action='store_true', help="Sadece doğrula, veritabanına yazma.")
+        parser.add_argument('--stoksuz', action='store_true', help="Ürün stoklarını değiştirme (stoğu zaten güncel olan geçmiş kayıtlar için).")
+        parser.add_argument('--hata-limiti', type=int, default=20, help="Ekrana yazılacak en fazla hata sayısı.")
+
+    def handle(self, *args, **options):
+        dosya_yolu = options['dosya']
+        bicim = options['format'] or os.path.splitext(dosya_yolu)[1].lstrip('.').lower()
+        if bicim not in OKUYUCULAR:
+            raise CommandError(f"Dosya biçimi anlaşılamadı: {dosya_yolu} (--format csv|jsonl kullanın)")
+        if options['parca_boyutu'] < 1:
+            raise CommandError("--parca-boyutu en az 1 olmalı.")
+
+        ice_aktarici = IceAktarici(
+            parca_boyutu=options['parca_boyutu'],
+            dry_run=options['dry_run'],
+            stok_guncelle=not options['stoksuz'],
+        )
+        try:
+            with open(dosya_yolu, encoding='utf-8-sig', newline='') as dosya:
+                ice_aktarici.calistir(OKUYUCULAR[bicim](dosya))
+        except OSError as exc:
+            raise CommandError(f"Dosya okunamadı: {exc}")
+
+        sayaclar, sure = ice_aktarici.sayaclar, ice_aktarici.sure
+        satir_sayisi = sayaclar['satis'] + sayaclar['siparis'] + sayaclar['satis_urun'] + sayaclar['odeme']
+        for satir_no, mesaj in ice_aktarici.hatalar[:options['hata_limiti']]:
+            self.stderr.write(f"Satır {satir_no}: {mesaj}")
+        if len(ice_aktarici.hatalar) > options['hata_limiti']:
+            self.stderr.write(f"... ve {len(ice_aktarici.hatalar) - options['hata_limiti']} hata daha.")
+
+        onek = "[DRY RUN] Doğrulandı" if options['dry_run'] else "İçe aktarıldı"
+        self.stdout.write(
+            f"{onek}: {sayaclar['satis']} satış, {sayaclar['satis_urun']} ürün satırı, "
+            f"{sayaclar['siparis']} sipariş, {sayaclar['odeme']} ödeme "
+            f"({sayaclar['okunan']} belge okundu, {len(ice_aktarici.hatalar)} hatalı)."
+        )
+        if sure > 0:
+            self.stdout.write(
+                f"Süre: {sure:.2f} sn — {sayaclar['okunan'] / sure:.0f} belge/sn, {satir_sayisi / sure:.0f} kayıt/sn."
+            )
+        stil = self.style.WARNING if ice_aktarici.hatalar else self.style.SUCCESS
+        self.stdout.write(stil("Tamamlandı."))
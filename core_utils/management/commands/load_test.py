@@ -0,0 +1,85 @@
+# core_utils/management/commands/load_test.py
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core_utils.yuk_testi import YukTesti
+
+
+class Command(BaseCommand):
+    help = (
+        "Birden çok kasiyer ve yönetici oturumunu eşzamanlı çalıştırarak yük testi yapar; iş yükü başına "
+        "istek/sn, p50/p95/p99 gecikme, hata ve 'database is locked' oranlarını raporlar. --adres verilmezse "
+        "WSGI uygulaması süreç içinde çağrılır; --adres ile kilit hataları sadece sunucu DEBUG=True iken ayırt edilir, "
+        "aksi halde http_500 olarak sayılır. Test verileri (satışlar, ödemeler) veritabanına gerçekten yazılır; "
+        "canlı veritabanında çalıştırmayın."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kasiyer', type=int, default=4, help="Eşzamanlı kasiyer oturumu sayısı.")
+        parser.add_argument('--yonetici', type=int, default=1, help="Eşzamanlı yönetici (dashboard) oturumu sayısı.")
+        parser.add_argument('--sure', type=float, default=30, help="Test süresi (saniye).")
+        parser.add_argument('--bekleme', type=float, default=0, help="Her oturumun istekler arasında beklediği süre (saniye).")
+        parser.add_argument('--adres', help="Çalışan sunucunun adresi (örn. http://127.0.0.1:8000); verilirse istekler HTTP ile gider.")
+        parser.add_argument('--kullanici', help="Oturumların kullanacağı süper kullanıcı (varsayılan: ilk süper kullanıcı).")
+        parser.add_argument('--sifre', help="--adres ile giriş için kullanıcının şifresi.")
+        parser.add_argument('--tohum', type=int, help="İş yükü seçimleri için rastgele sayı tohumu.")
+        parser.add_argument('--cikti', '-o', help="Raporun yazılacağı JSON dosyası.")
+
+    def handle(self, *args, **options):
+        if options['kasiyer'] < 0 or options['yonetici'] < 0 or options['kasiyer'] + options['yonetici'] < 1:
+            raise CommandError("En az bir kasiyer veya yönetici oturumu gerekli.")
+        if options['sure'] <= 0:
+            raise CommandError("--sure pozitif olmalı.")
+        if options['adres'] and not options['sifre']:
+            raise CommandError("--adres ile çalışırken --sifre gerekli.")
+        kullanicilar = get_user_model().objects.filter(is_superuser=True, is_active=True)
+        if options['kullanici']:
+            kullanicilar = kullanicilar.filter(username=options['kullanici'])
+        kullanici = kullanicilar.order_by('pk').first()
+        if kullanici is None:
+            raise CommandError("Yük testi için aktif bir süper kullanıcı bulunamadı (createsuperuser veya --kullanici).")
+
+        self.stdout.write(
+            f"{options['kasiyer']} kasiyer, {options['yonetici']} yönetici, {options['sure']:.0f} sn "
+            f"({options['adres'] or 'süreç içi WSGI'})..."
+        )
+        try:
+            rapor = YukTesti(
+                kullanici,
+                kasiyer=options['kasiyer'],
+                yonetici=options['yonetici'],
+                sure=options['sure'],
+                bekleme=options['bekleme'],
+                adres=options['adres'],
+                sifre=options['sifre'],
+                tohum=options['tohum'],
+            ).calistir().rapor()
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(f"{'İş yükü':<16} {'istek':>7} {'istek/sn':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'hata':>7} {'kilit':>7}")
+        satirlar = list(rapor['is_yukleri'].items()) + [('TOPLAM', rapor['toplam'])]
+        for ad, ozet in satirlar:
+            if not ozet['istek']:
+                continue
+            satir = (
+                f"{ad:<16} {ozet['istek']:>7} {ozet['istek_sn']:>9.2f} {ozet['p50_ms']:>9.2f} {ozet['p95_ms']:>9.2f} "
+                f"{ozet['p99_ms']:>9.2f} {ozet['hata_orani']:>7.2%} {ozet['kilit_orani']:>7.2%}"
+            )
+            self.stdout.write(self.style.WARNING(satir) if ozet['hata_orani'] else satir)
+        for ad, ozet in rapor['is_yukleri'].items():
+            if ozet['hatalar']:
+                self.stdout.write(f"  {ad} hataları: " + ", ".join(f"{hata} x{sayi}" for hata, sayi in ozet['hatalar'].items()))
+
+        if options['cikti']:
+            try:
+                with open(options['cikti'], 'w', encoding='utf-8') as dosya:
+                    json.dump(rapor, dosya, ensure_ascii=False, indent=2)
+            except OSError as exc:
+                raise CommandError(f"Rapor dosyası yazılamadı: {exc}")
+            self.stdout.write(f"Rapor {options['cikti']} dosyasına yazıldı.")
+        stil = self.style.WARNING if rapor['toplam']['kilit_orani'] else self.style.SUCCESS
+        self.stdout.write(stil("Tamamlandı."))
@@ -0,0 +1,13 @@
+# core_utils/management/commands/rebuild_finance_snapshots.py
+
+from django.core.management.base import BaseCommand
+
+from core_utils.reports import snapshotlari_yeniden_olustur
+
+
+class Command(BaseCommand):
+    help = "Günlük finans özetlerini (DailyFinanceSnapshot) satış, sipariş ödemesi ve gider tablolarından sıfırdan üretir."
+
+    def handle(self, *args, **options):
+        gun_sayisi = snapshotlari_yeniden_olustur()
+        self.stdout.write(self.style.SUCCESS(f"{gun_sayisi} günlük finans özeti yeniden oluşturuldu."))
@@ -0,0 +1,20 @@
+# core_utils/management/commands/rebuild_search_index.py
+
+from django.core.management.base import BaseCommand
+
+from core_utils import arama
+from musteri.models import Musteri
+from urun.models import Urun
+
+
+class Command(BaseCommand):
+    help = "Ürün ve müşteri tam metin arama (FTS5) tablolarını sıfırdan oluşturur."
+
+    def handle(self, *args, **options):
+        for model in (Urun, Musteri):
+            if not arama.destekleniyor(model):
+                self.stdout.write(self.style.WARNING(f"{model._meta.verbose_name_plural}: veritabanı FTS5 desteklemiyor, atlandı."))
+                continue
+            arama.tabloyu_olustur(model)
+            sayi = arama.yeniden_olustur(model)
+            self.stdout.write(self.style.SUCCESS(f"{model._meta.verbose_name_plural}: {sayi} kayıt indekslendi."))
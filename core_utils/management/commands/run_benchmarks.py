@@ -0,0 +1,63 @@
+# core_utils/management/commands/run_benchmarks.py
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core_utils.benchmark import BenchmarkCalistirici, karsilastir, sonuclari_oku
+
+
+class Command(BaseCommand):
+    help = (
+        "Dashboard, admin changelist'leri, arama/otomatik tamamlama ve CSV dışa aktarma yollarının sürelerini ve "
+        "sorgu sayılarını mevcut veritabanında ölçer; sonuçları karşılaştırılabilir bir JSON dosyasına yazar. "
+        "Üretim ölçeğinde veri için önce 'generate_data' kullanın."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cikti', '-o', default='benchmark.json', help="Sonuçların yazılacağı JSON dosyası.")
+        parser.add_argument('--karsilastir', metavar='DOSYA', help="Önceki bir sonuç dosyasıyla medyan süreleri karşılaştır.")
+        parser.add_argument('--tekrar', type=int, default=5, help="Her senaryonun ölçülen tekrar sayısı (ısınma turu hariç).")
+        parser.add_argument('--disa-aktarma-gun', type=int, default=365, help="Dışa aktarma senaryolarında son kaç günün kayıtları okunsun.")
+        parser.add_argument('--kullanici', help="İstekleri yapacak süper kullanıcının adı (varsayılan: ilk süper kullanıcı).")
+        parser.add_argument('--filtre', help="Sadece adında bu metin geçen senaryoları çalıştır (örn. 'changelist').")
+
+    def handle(self, *args, **options):
+        if options['tekrar'] < 1:
+            raise CommandError("--tekrar en az 1 olmalı.")
+        kullanicilar = get_user_model().objects.filter(is_superuser=True, is_active=True)
+        if options['kullanici']:
+            kullanicilar = kullanicilar.filter(username=options['kullanici'])
+        kullanici = kullanicilar.order_by('pk').first()
+        if kullanici is None:
+            raise CommandError("Ölçüm için aktif bir süper kullanıcı bulunamadı (createsuperuser veya --kullanici).")
+        onceki = None
+        if options['karsilastir']:
+            try:
+                onceki = sonuclari_oku(options['karsilastir'])
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Karşılaştırma dosyası okunamadı: {exc}")
+
+        calistirici = BenchmarkCalistirici(
+            kullanici, tekrar=options['tekrar'], disa_aktarma_gun=options['disa_aktarma_gun'], filtre=options['filtre'],
+        ).calistir()
+        sonuc = calistirici.sonuc()
+
+        self.stdout.write("Veri: " + ", ".join(f"{model} {sayi}" for model, sayi in sonuc['veri'].items()))
+        self.stdout.write(f"{'Senaryo':<45} {'medyan ms':>10} {'p95 ms':>10} {'sorgu':>6}")
+        for ad, olcum in sonuc['sonuclar'].items():
+            self.stdout.write(f"{ad:<45} {olcum['medyan_ms']:>10.2f} {olcum['p95_ms']:>10.2f} {olcum['sorgu_sayisi']:>6}")
+
+        if onceki is not None:
+            self.stdout.write(f"\nKarşılaştırma ({options['karsilastir']}, git {onceki.get('git')} -> {sonuc['git']}):")
+            for ad, eski, yeni, fark, sorgu_farki in karsilastir(onceki, sonuc):
+                stil = self.style.ERROR if fark > 10 or sorgu_farki > 0 else self.style.SUCCESS if fark < -10 else str
+                self.stdout.write(stil(f"{ad:<45} {eski:>10.2f} -> {yeni:>10.2f} ms ({fark:+.1f}%, sorgu {sorgu_farki:+d})"))
+
+        try:
+            with open(options['cikti'], 'w', encoding='utf-8') as dosya:
+                json.dump(sonuc, dosya, ensure_ascii=False, indent=2)
+        except OSError as exc:
+            raise CommandError(f"Sonuç dosyası yazılamadı: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"Sonuçlar {options['cikti']} dosyasına yazıldı."))
@@ -0,0 +1,171 @@
+# core_utils/middleware.py
+
+import hashlib
+import heapq
+import json
+import logging
+import random
+import re
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+import sqlparse
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from core_utils.db import ertelenmis_transactionlar
+
+logger = logging.getLogger('optik.sorgular')
+
+VARSAYILAN_AYARLAR = {
+    'ORNEKLEME_ORANI': 1.0, # 0-1 arası; üretimde düşük tutulursa ölçülmeyen isteklerin ek maliyeti tek bir random() çağrısıdır
+    'SORGU_BUTCESI': 50, # görünüm için ayrı bütçe tanımlı değilse
+    'GORUNUM_BUTCELERI': {}, # {'admin:satis_satis_changelist': 15, ...} (url adı veya view fonksiyonunun yolu)
+    'YAVAS_SORGU_SAYISI': 5,
+    'TEKRAR_ESIGI': 5, # aynı parmak izli sorgu bu kadar tekrarlanırsa N+1 şüphesi olarak raporlanır
+    'SERVER_TIMING': True,
+}
+
+_DIZI = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTESI = re.compile(r"\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)")
+_SAVEPOINT = re.compile(r'"s\d+_x\d+"')
+
+
+def sorgu_ayarlari():
+    return {**VARSAYILAN_AYARLAR, **getattr(settings, 'SORGU_OLCUMU', {})}
+
+
+def parmak_izi(sql):
+    """
+    Sorgudaki sabitleri ve IN listelerinin uzunluğunu atarak aynı kalıptaki sorguları aynı
+    anahtarda toplar. Satır başına tekrarlanan (N+1) sorgular böylece tek parmak izinde görünür.
+    """
+    kalip = _SAVEPOINT.sub('"?"', sql)
+    kalip = _DIZI.sub('?', kalip)
+    kalip = _IN_LISTESI.sub('(...)', kalip)
+    return hashlib.md5(kalip.encode()).hexdigest()[:12], kalip
+
+
+class SorguKaydedici:
+    """connection.execute_wrapper olarak her sorgunun süresini ve SQL metnini toplar."""
+
+    def __init__(self):
+        self.sorgular = [] # (süre, sql)
+
+    def __call__(self, execute, sql, params, many, context):
+        baslangic = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sorgular.append((time.perf_counter() - baslangic, sql))
+
+    @property
+    def toplam_sure(self):
+        return sum(sure for sure, _ in self.sorgular)
+
+    def en_yavaslar(self, sayi):
+        return [
+            {'sure_ms': round(sure * 1000, 2), 'sql': sqlparse.format(sql, reindent=True, keyword_case='upper')}
+            for sure, sql in heapq.nlargest(sayi, self.sorgular, key=lambda sorgu: sorgu[0])
+        ]
+
+    def tekrarlar(self, esik):
+        gruplar = defaultdict(lambda: [0, 0.0, None])
+        for sure, sql in self.sorgular:
+            anahtar, kalip = parmak_izi(sql)
+            grup = gruplar[anahtar]
+            grup[0] += 1
+            grup[1] += sure
+            grup[2] = kalip
+        return sorted((
+            {'parmak_izi': anahtar, 'sayi': sayi, 'toplam_ms': round(sure * 1000, 2), 'kalip': kalip}
+            for anahtar, (sayi, sure, kalip) in gruplar.items() if sayi >= esik
+        ), key=lambda tekrar: -tekrar['sayi'])
+
+
+def _gorunum_adi(request):
+    eslesme = getattr(request, 'resolver_match', None)
+    if eslesme is None:
+        return None
+    return eslesme.view_name or eslesme._func_path
+
+
+class SorguOlcumuMiddleware:
+    """
+    Örneklenen isteklerde SQL sorgu sayısını, toplam veritabanı süresini, en yavaş sorguları
+    ve tekrarlanan sorgu kalıplarını ölçer.
+
+    Sonuç 'Server-Timing' başlığına ve 'optik.sorgular' logger'ına (JSONL) yazılır. Görünüm
+    sorgu bütçesini aşarsa kayıt WARNING seviyesinde ve 'butce_asildi' ile işaretlenir.
+    Oturum ve kullanıcı sorgularını da sayması için listede en başlara yakın eklenmelidir.
+    StreamingHttpResponse gövdesi üretilirken çalışan sorgular ölçüme dahil değildir.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        ayarlar = sorgu_ayarlari()
+        if random.random() >= ayarlar['ORNEKLEME_ORANI']:
+            return self.get_response(request)
+
+        kaydedici = SorguKaydedici()
+        baslangic = time.perf_counter()
+        with ExitStack() as yigin:
+            for baglanti in connections.all():
+                yigin.enter_context(baglanti.execute_wrapper(kaydedici))
+            response = self.get_response(request)
+        sure = time.perf_counter() - baslangic
+
+        gorunum = _gorunum_adi(request)
+        sorgu_sayisi = len(kaydedici.sorgular)
+        db_sure = kaydedici.toplam_sure
+        butce = ayarlar['GORUNUM_BUTCELERI'].get(gorunum, ayarlar['SORGU_BUTCESI'])
+        butce_asildi = butce is not None and sorgu_sayisi > butce
+
+        if ayarlar['SERVER_TIMING']:
+            olcumler = [
+                f'db;dur={db_sure * 1000:.2f};desc="{sorgu_sayisi} sorgu"',
+                f'uygulama;dur={(sure - db_sure) * 1000:.2f}',
+            ]
+            if response.has_header('Server-Timing'):
+                olcumler.insert(0, response['Server-Timing'])
+            response['Server-Timing'] = ', '.join(olcumler)
+
+        kayit = {
+            'zaman': timezone.now().isoformat(),
+            'metod': request.method,
+            'yol': request.path,
+            'gorunum': gorunum,
+            'durum': response.status_code,
+            'sure_ms': round(sure * 1000, 2),
+            'sorgu_sayisi': sorgu_sayisi,
+            'db_ms': round(db_sure * 1000, 2),
+            'butce': butce,
+            'butce_asildi': butce_asildi,
+            'en_yavaslar': kaydedici.en_yavaslar(ayarlar['YAVAS_SORGU_SAYISI']),
+            'tekrarlar': kaydedici.tekrarlar(ayarlar['TEKRAR_ESIGI']),
+        }
+        logger.log(logging.WARNING if butce_asildi else logging.INFO, json.dumps(kayit, ensure_ascii=False))
+        return response
+
+
+class OkumaIstegiMiddleware:
+    """
+    Güvenli (GET/HEAD/OPTIONS) isteklerde atomic() bloklarını yazma kilidi almadan açar
+    (core_utils.db.ertelenmis_transactionlar). Admin değişiklik/silme sayfalarının GET'leri de
+    atomic içinde çalıştığı için, aksi halde BEGIN IMMEDIATE ile yazarların arkasında beklerler.
+    """
+
+    GUVENLI_METODLAR = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in self.GUVENLI_METODLAR:
+            return self.get_response(request)
+        with ertelenmis_transactionlar():
+            return self.get_response(request)
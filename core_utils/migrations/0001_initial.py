@@ -0,0 +1,64 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:18
+
+from django.db import migrations, models
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def snapshotlari_doldur(apps, schema_editor):
+    # Mevcut veriden günlük özetleri üret (core_utils.reports.snapshotlari_yeniden_olustur ile aynı mantık)
+    DailyFinanceSnapshot = apps.get_model('core_utils', 'DailyFinanceSnapshot')
+    SatisUrun = apps.get_model('satis', 'SatisUrun')
+    Odeme = apps.get_model('siparis', 'Odeme')
+    Gider = apps.get_model('giderler', 'Gider')
+    tz = timezone.get_default_timezone()
+
+    kaynaklar = {
+        'satis_geliri': SatisUrun.objects.annotate(gun=TruncDate('satis__satis_tarihi', tzinfo=tz))
+            .values('gun').annotate(toplam=Sum(F('adet') * F('birim_fiyat'))).order_by(),
+        'siparis_odeme_geliri': Odeme.objects.filter(siparis__durum__in=['Teslim Edildi', 'Tamamlandı'])
+            .annotate(gun=TruncDate('odeme_tarihi', tzinfo=tz))
+            .values('gun').annotate(toplam=Sum('miktar')).order_by(),
+        'gider_toplami': Gider.objects.annotate(gun=TruncDate('gider_tarihi', tzinfo=tz))
+            .values('gun').annotate(toplam=Sum('miktar')).order_by(),
+    }
+    gunler = {}
+    for alan, satirlar in kaynaklar.items():
+        for satir in satirlar:
+            snapshot = gunler.setdefault(satir['gun'], DailyFinanceSnapshot(gun=satir['gun']))
+            setattr(snapshot, alan, satir['toplam'] or 0)
+    for snapshot in gunler.values():
+        snapshot.net_kazanc = snapshot.satis_geliri + snapshot.siparis_odeme_geliri - snapshot.gider_toplami
+    DailyFinanceSnapshot.objects.bulk_create(gunler.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('giderler', '0002_alter_gider_harcanan_kullanicilar_alter_gider_miktar'),
+        ('satis', '0003_alter_satis_toplam_tutar_satisodeme'),
+        ('siparis', '0005_remove_siparis_odenmis_tutar_odeme'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyFinanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gun', models.DateField(unique=True, verbose_name='Gün')),
+                ('satis_geliri', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Satış Geliri')),
+                ('siparis_odeme_geliri', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Tamamlanan Sipariş Ödemeleri')),
+                ('gider_toplami', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Giderler')),
+                ('net_kazanc', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Net Kazanç')),
+            ],
+            options={
+                'verbose_name': 'Günlük Finans Özeti',
+                'verbose_name_plural': 'Günlük Finans Özetleri',
+                'ordering': ['-gun'],
+            },
+        ),
+        migrations.RunPython(snapshotlari_doldur, migrations.RunPython.noop),
+    ]
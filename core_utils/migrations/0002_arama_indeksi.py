@@ -0,0 +1,80 @@
+import re
+
+from django.db import migrations
+
+# Bu migration'ın yazıldığı andaki arama tablosu şeması ve metin katlama kuralları burada
+# dondurulmuştur; core_utils.arama sonradan değişse de eski migration'lar aynı sonucu üretir.
+ARAMA_ALANLARI = {
+    ('urun', 'Urun'): ('ad', 'marka', 'model_kodu', 'aciklama'),
+    ('musteri', 'Musteri'): ('ad', 'soyad', 'telefon', 'eposta'),
+}
+FTS_TOKENIZER = 'unicode61 remove_diacritics 2'
+PARCA_BOYUTU = 2000
+
+_TURKCE_BUYUK_HARFLER = str.maketrans({'İ': 'i', 'I': 'ı'})
+_TURKCE_KARAKTERLER = str.maketrans('ıçğöşü', 'icgosu')
+_AYRACLAR = re.compile(r'[\s\-./()]+')
+
+
+def turkce_katla(metin):
+    if not metin:
+        return ''
+    return str(metin).translate(_TURKCE_BUYUK_HARFLER).lower().translate(_TURKCE_KARAKTERLER)
+
+
+def arama_metni(degerler):
+    parcalar = []
+    for deger in degerler:
+        if not deger:
+            continue
+        deger = str(deger)
+        parcalar.append(deger)
+        bitisik = _AYRACLAR.sub('', deger)
+        if bitisik != deger and any(karakter.isdigit() for karakter in deger):
+            parcalar.append(bitisik)
+    return turkce_katla(' '.join(parcalar))
+
+
+def arama_tablosu(model):
+    return f"{model._meta.db_table}_arama"
+
+
+def arama_tablolarini_olustur(apps, schema_editor):
+    # FTS5 sadece SQLite'ta vardır; diğer veritabanlarında admin varsayılan aramayı kullanır
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    using = schema_editor.connection.alias
+    for (app_label, model_adi), alanlar in ARAMA_ALANLARI.items():
+        model = apps.get_model(app_label, model_adi)
+        tablo = arama_tablosu(model)
+        schema_editor.execute(f'CREATE VIRTUAL TABLE IF NOT EXISTS "{tablo}" USING fts5(metin, tokenize=\'{FTS_TOKENIZER}\')')
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM "{tablo}"')
+            satirlar = []
+            for pk, *degerler in model._base_manager.using(using).values_list('pk', *alanlar).iterator(chunk_size=PARCA_BOYUTU):
+                satirlar.append((pk, arama_metni(degerler)))
+                if len(satirlar) >= PARCA_BOYUTU:
+                    cursor.executemany(f'INSERT INTO "{tablo}" (rowid, metin) VALUES (%s, %s)', satirlar)
+                    satirlar = []
+            if satirlar:
+                cursor.executemany(f'INSERT INTO "{tablo}" (rowid, metin) VALUES (%s, %s)', satirlar)
+
+
+def arama_tablolarini_kaldir(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for app_label, model_adi in ARAMA_ALANLARI:
+        schema_editor.execute(f'DROP TABLE IF EXISTS "{arama_tablosu(apps.get_model(app_label, model_adi))}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_utils', '0001_initial'),
+        ('musteri', '0002_autocomplete_indexes'),
+        ('urun', '0005_autocomplete_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(arama_tablolarini_olustur, arama_tablolarini_kaldir),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_utils', '0002_arama_indeksi'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VeriSurumu',
+            fields=[
+                ('kapsam', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Kapsam')),
+                ('surum', models.PositiveBigIntegerField(default=1, verbose_name='Sürüm')),
+            ],
+            options={
+                'verbose_name': 'Veri Sürümü',
+                'verbose_name_plural': 'Veri Sürümleri',
+            },
+        ),
+    ]
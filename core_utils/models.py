@@ -1,3 +1,36 @@
+# core_utils/models.py
+
 from django.db import models
 
-# Create your models here.
+
+class DailyFinanceSnapshot(models.Model):
+    # Gün bazında önceden toplanmış finans özeti.
+    # Sinyallerle artımlı olarak güncellenir, 'rebuild_finance_snapshots' komutuyla sıfırdan üretilebilir.
+    gun = models.DateField(unique=True, verbose_name="Gün")
+    satis_geliri = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Satış Geliri")
+    siparis_odeme_geliri = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Tamamlanan Sipariş Ödemeleri")
+    gider_toplami = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Giderler")
+    net_kazanc = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Net Kazanç")
+
+    class Meta:
+        verbose_name = "Günlük Finans Özeti"
+        verbose_name_plural = "Günlük Finans Özetleri"
+        ordering = ['-gun']
+
+    def __str__(self):
+        return f"{self.gun.strftime('%Y-%m-%d')} - Net: {self.net_kazanc} TL"
+
+
+class VeriSurumu(models.Model):
+    # Önbellek anahtarlarındaki veri sürümü sayaçları (core_utils.cache).
+    # Sayaç veritabanında tutulur; artırma tek bir UPDATE olduğu için süreçler arası atomiktir
+    # ve önbellekten düşüp eski bir değerle geri gelemez.
+    kapsam = models.CharField(max_length=100, primary_key=True, verbose_name="Kapsam") # '' = genel sayaç
+    surum = models.PositiveBigIntegerField(default=1, verbose_name="Sürüm")
+
+    class Meta:
+        verbose_name = "Veri Sürümü"
+        verbose_name_plural = "Veri Sürümleri"
+
+    def __str__(self):
+        return f"{self.kapsam or 'genel'}: v{self.surum}"
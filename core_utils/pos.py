@@ -0,0 +1,159 @@
+# core_utils/pos.py
+
+import hashlib
+import json
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import PermissionDenied
+from django.db import IntegrityError, transaction
+from django.http import JsonResponse
+from django.views.decorators.http import require_POST
+
+from core_utils.dogrulama import (
+    ODEME_SEKILLERI, BelgeHatasi, musteri_idsi, sayisal_idler, secenek, tutar, urun_satirlari,
+)
+from core_utils.reports import SIFIR
+from core_utils.signals import snapshot_uygula, yerel_gun
+from musteri.models import Musteri
+from satis.models import PosIslemi, Satis, SatisOdeme, SatisUrun
+from urun.models import HAREKET_SATIS, Urun
+from urun.stok import stok_farklarini_uygula
+
+# İstek gövdesi:
+# {"musteri_id": ..., "odeme_sekli": ..., "notlar": ...,
+#  "urunler": [{"urun_id": ..., "adet": ..., "birim_fiyat": ...}],
+#  "odemeler": [{"miktar": ..., "odeme_sekli": ..., "notlar": ...}]}
+# Tekrar anahtarı 'Idempotency-Key' başlığıyla gönderilir.
+ANAHTAR_UZUNLUGU = PosIslemi._meta.get_field('anahtar').max_length
+
+
+def istek_ozeti(veri):
+    # Aynı anahtarla farklı içerik gönderildiğini yakalamak için alan sırasından bağımsız özet
+    return hashlib.sha256(json.dumps(veri, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def satis_istegini_dogrula(veri):
+    """İstek gövdesini doğrular; müşteri ve ürün fiyatları ikişer sorguyla toplu kontrol edilir."""
+    if not isinstance(veri, dict):
+        raise BelgeHatasi("İstek gövdesi bir nesne olmalı.")
+    satirlar = veri.get('urunler')
+    if not satirlar or not isinstance(satirlar, list):
+        raise BelgeHatasi("'urunler' en az bir satır içeren bir liste olmalı.")
+    odemeler = veri.get('odemeler') or []
+    if not isinstance(odemeler, list):
+        raise BelgeHatasi("'odemeler' bir liste olmalı.")
+
+    musteriler = Musteri.objects.filter(pk__in=sayisal_idler([veri.get('musteri_id')]))
+    musteri_id = musteri_idsi(veri.get('musteri_id'), set(musteriler.values_list('pk', flat=True)))
+
+    urun_idleri = sayisal_idler(satir.get('urun_id') for satir in satirlar if isinstance(satir, dict))
+    fiyatlar = dict(Urun.objects.filter(pk__in=urun_idleri).values_list('pk', 'satis_fiyati'))
+    urunler = urun_satirlari(satirlar, fiyatlar)
+
+    temiz_odemeler = []
+    for odeme in odemeler:
+        if not isinstance(odeme, dict):
+            raise BelgeHatasi("Ödeme bir nesne olmalı.")
+        miktar = tutar(odeme.get('miktar'), 'miktar', zorunlu=True)
+        if not miktar:
+            raise BelgeHatasi("'miktar' sıfır olamaz.")
+        temiz_odemeler.append({
+            'miktar': miktar,
+            'odeme_sekli': secenek(odeme.get('odeme_sekli'), 'odeme_sekli', ODEME_SEKILLERI, 'Nakit'),
+            'notlar': odeme.get('notlar') or None,
+        })
+
+    return {
+        'musteri_id': musteri_id,
+        'odeme_sekli': secenek(veri.get('odeme_sekli'), 'odeme_sekli', ODEME_SEKILLERI, 'Nakit'),
+        'notlar': veri.get('notlar') or None,
+        'urunler': urunler,
+        'odemeler': temiz_odemeler,
+    }
+
+
+@transaction.atomic
+def pos_satisi_olustur(temiz, kullanici, anahtar, ozet):
+    """
+    Satışı, ürün satırlarını ve ödemeleri tek transaction'da yazar ve yanıtı tekrar anahtarıyla saklar.
+
+    Satırlar bulk_create ile yazıldığı için SatisUrun.save() ve sinyalleri çalışmaz; stok farkları
+    stok_farklarini_uygula ile, günlük finans özeti snapshot_uygula ile burada uygulanır.
+    Aynı anahtar eşzamanlı olarak ikinci kez yazılırsa IntegrityError ile tüm işlem geri alınır.
+    """
+    satis = Satis.objects.create(musteri_id=temiz['musteri_id'], odeme_sekli=temiz['odeme_sekli'], notlar=temiz['notlar'])
+    SatisUrun.objects.bulk_create([SatisUrun(satis=satis, **satir) for satir in temiz['urunler']])
+    if temiz['odemeler']:
+        SatisOdeme.objects.bulk_create([SatisOdeme(satis=satis, **odeme) for odeme in temiz['odemeler']])
+
+    farklar = {satir['urun_id']: satir['adet'] for satir in temiz['urunler']}
+    stok_farklarini_uygula(farklar, HAREKET_SATIS, {satis.pk: farklar})
+
+    toplam = sum((satir['adet'] * satir['birim_fiyat'] for satir in temiz['urunler']), SIFIR)
+    odenen = sum((odeme['miktar'] for odeme in temiz['odemeler']), SIFIR)
+    snapshot_uygula(yerel_gun(satis.satis_tarihi), satis=toplam)
+
+    yanit = {
+        'satis_id': satis.pk,
+        'satis_tarihi': satis.satis_tarihi.isoformat(),
+        'toplam': f"{toplam:.2f}",
+        'odenen': f"{odenen:.2f}",
+        'kalan': f"{toplam - odenen:.2f}",
+        'urunler': [
+            {'urun_id': satir['urun_id'], 'adet': satir['adet'], 'birim_fiyat': f"{satir['birim_fiyat']:.2f}"}
+            for satir in temiz['urunler']
+        ],
+    }
+    PosIslemi.objects.create(kullanici=kullanici, anahtar=anahtar, istek_ozeti=ozet, satis=satis, yanit=yanit)
+    return yanit
+
+
+def _kayitli_yanit(kullanici, anahtar, ozet):
+    kayit = PosIslemi.objects.filter(kullanici=kullanici, anahtar=anahtar).values_list('istek_ozeti', 'yanit').first()
+    if kayit is None:
+        return None
+    if kayit[0] != ozet:
+        return JsonResponse({'hatalar': ["Bu tekrar anahtarı farklı bir istekle kullanılmış."]}, status=422)
+    response = JsonResponse(kayit[1], status=200)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+# --- Kasa (POS) Satış Endpoint'i ---
+@staff_member_required
+@require_POST
+def pos_satis(request):
+    """
+    Tek istekte satış oluşturur. Yanıt 201 ile döner; aynı 'Idempotency-Key' ile yapılan
+    tekrar denemeleri yeni satış oluşturmaz, ilk yanıtı 200 ile tekrar döndürür.
+    """
+    if not request.user.has_perm('satis.add_satis'):
+        raise PermissionDenied
+
+    anahtar = request.headers.get('Idempotency-Key', '').strip()
+    if not anahtar or len(anahtar) > ANAHTAR_UZUNLUGU:
+        return JsonResponse({'hatalar': [f"'Idempotency-Key' başlığı zorunlu (en fazla {ANAHTAR_UZUNLUGU} karakter)."]}, status=400)
+    try:
+        veri = json.loads(request.body)
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+        return JsonResponse({'hatalar': [f"Geçersiz JSON: {exc}"]}, status=400)
+
+    ozet = istek_ozeti(veri)
+    tekrar = _kayitli_yanit(request.user, anahtar, ozet)
+    if tekrar is not None:
+        return tekrar
+
+    try:
+        temiz = satis_istegini_dogrula(veri)
+    except BelgeHatasi as exc:
+        return JsonResponse({'hatalar': [str(exc)]}, status=400)
+
+    try:
+        yanit = pos_satisi_olustur(temiz, request.user, anahtar, ozet)
+    except IntegrityError:
+        # Aynı anahtarlı eşzamanlı istek önce yazdı; onun yanıtı döner
+        tekrar = _kayitli_yanit(request.user, anahtar, ozet)
+        if tekrar is None:
+            raise
+        return tekrar
+    return JsonResponse(yanit, status=201)
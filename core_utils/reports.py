@@ -0,0 +1,293 @@
+# core_utils/reports.py
+
+import calendar
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from functools import cached_property
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from core_utils.cache import veri_degisti
+from core_utils.models import DailyFinanceSnapshot
+from giderler.models import Gider, GiderKategorisi
+from satis.models import SatisUrun
+from siparis.models import Odeme, Siparis
+
+# Türkçe gün ve ay çevirileri için sözlükler
+weekday_to_turkish = {
+    'Mon': 'Pzt', 'Tue': 'Sal', 'Wed': 'Çar', 'Thu': 'Per',
+    'Fri': 'Cum', 'Sat': 'Cmt', 'Sun': 'Paz'
+}
+
+month_to_turkish = {
+    'Jan': 'Oca', 'Feb': 'Şub', 'Mar': 'Mar', 'Apr': 'Nis',
+    'May': 'May', 'Jun': 'Haz', 'Jul': 'Tem', 'Aug': 'Ağu',
+    'Sep': 'Eyl', 'Oct': 'Eki', 'Nov': 'Kas', 'Dec': 'Ara'
+}
+
+# Sadece bu durumlardaki siparişlerin ödemeleri kazanca dahil edilir
+KAZANC_SIPARIS_DURUMLARI = ['Teslim Edildi', 'Tamamlandı']
+
+# Dashboard'daki zaman dilimi butonları (data-chart-type) ve başlıkları
+ZAMAN_DILIMLERI = {
+    'haftalik': 'Haftalık',
+    'aylik': 'Aylık',
+    'ucaylik': 'Son 3 Ay',
+    'altiaylik': 'Son 6 Ay',
+    'yillik': 'Son 12 Ay',
+    'tumzamanlar': 'Tüm Zamanlar',
+}
+
+GRAFIKLER = {
+    'net_kazanc': 'Net Kazanç',
+    'gider': 'Giderler',
+}
+
+SIFIR = Decimal('0.00')
+
+# Kategorisi boş (NULL) olan giderler pivot tablosunda bu başlık altında toplanır
+KATEGORISIZ = 'Kategorisiz'
+
+
+def gunluk_toplamlar():
+    """
+    Satış, tamamlanmış sipariş ödemesi ve gider toplamlarını gün bazında döndürür.
+    Her kaynak tablo için tek bir GROUP BY sorgusu çalışır; günler yerel saat
+    dilimine (Europe/Istanbul) göre kesilir.
+    Dönüş: {'satis': {date: Decimal}, 'siparis_odeme': {...}, 'gider': {...}}
+    """
+    tz = timezone.get_default_timezone()
+
+    satislar = (
+        SatisUrun.objects
+        .annotate(gun=TruncDate('satis__satis_tarihi', tzinfo=tz))
+        .values('gun')
+        .annotate(toplam=Sum(F('adet') * F('birim_fiyat')))
+        .order_by()
+    )
+    siparis_odemeleri = (
+        Odeme.objects
+        .filter(siparis__durum__in=KAZANC_SIPARIS_DURUMLARI)
+        .annotate(gun=TruncDate('odeme_tarihi', tzinfo=tz))
+        .values('gun')
+        .annotate(toplam=Sum('miktar'))
+        .order_by()
+    )
+    giderler = (
+        Gider.objects
+        .annotate(gun=TruncDate('gider_tarihi', tzinfo=tz))
+        .values('gun')
+        .annotate(toplam=Sum('miktar'))
+        .order_by()
+    )
+
+    return {
+        'satis': {row['gun']: row['toplam'] or SIFIR for row in satislar},
+        'siparis_odeme': {row['gun']: row['toplam'] or SIFIR for row in siparis_odemeleri},
+        'gider': {row['gun']: row['toplam'] or SIFIR for row in giderler},
+    }
+
+
+def gider_kategori_pivotu(ay_sayisi=6, simdi=None):
+    """
+    Son `ay_sayisi` ay (mevcut ay dahil) için kategori x ay gider matrisini döndürür.
+    Ay ve kategori sayısından bağımsız olarak tek bir GROUP BY sorgusu (ve kategori
+    listesi için bir sorgu) çalışır. Kategorisiz giderler KATEGORISIZ başlığında toplanır.
+    Dönüş: ({'YYYY-MM': {kategori_adi: float}}, [kategori_adi, ...]) — aylar yeniden eskiye.
+    """
+    bugun = timezone.localdate(simdi or timezone.now())
+    tz = timezone.get_default_timezone()
+
+    aylar = []
+    for i in range(ay_sayisi):
+        yil, ay = divmod(bugun.year * 12 + bugun.month - 1 - i, 12)
+        aylar.append(date(yil, ay + 1, 1))
+    ilk_ay = aylar[-1]
+
+    kategoriler = dict(GiderKategorisi.objects.order_by('ad').values_list('id', 'ad'))
+    satirlar = (
+        Gider.objects
+        .filter(gider_tarihi__gte=timezone.make_aware(datetime(ilk_ay.year, ilk_ay.month, 1), tz))
+        .annotate(ay=TruncMonth('gider_tarihi', tzinfo=tz))
+        .values('ay', 'kategori_id')
+        .annotate(toplam=Sum('miktar'))
+        .order_by()
+    )
+
+    kategori_adlari = list(kategoriler.values())
+    pivot = {ay.strftime('%Y-%m'): {ad: 0.0 for ad in kategori_adlari} for ay in aylar}
+    for satir in satirlar:
+        ay_anahtari = timezone.localtime(satir['ay'], tz).strftime('%Y-%m')
+        if ay_anahtari not in pivot:
+            continue
+        kategori_adi = kategoriler.get(satir['kategori_id'], KATEGORISIZ)
+        if kategori_adi == KATEGORISIZ and KATEGORISIZ not in kategori_adlari:
+            kategori_adlari.append(KATEGORISIZ)
+            for ay_verisi in pivot.values():
+                ay_verisi.setdefault(KATEGORISIZ, 0.0)
+        pivot[ay_anahtari][kategori_adi] += float(satir['toplam'] or SIFIR)
+
+    return pivot, kategori_adlari
+
+
+def snapshot_gunluk_toplamlar(baslangic=None):
+    """
+    gunluk_toplamlar() ile aynı yapıyı DailyFinanceSnapshot tablosundan tek sorguyla okur.
+    baslangic verilirse yalnızca o günden itibaren olan satırlar okunur.
+    """
+    toplamlar = {'satis': {}, 'siparis_odeme': {}, 'gider': {}}
+    satirlar = DailyFinanceSnapshot.objects.all()
+    if baslangic is not None:
+        satirlar = satirlar.filter(gun__gte=baslangic)
+    satirlar = satirlar.values_list(
+        'gun', 'satis_geliri', 'siparis_odeme_geliri', 'gider_toplami'
+    ).order_by()
+    for gun, satis, siparis_odeme, gider in satirlar:
+        toplamlar['satis'][gun] = satis
+        toplamlar['siparis_odeme'][gun] = siparis_odeme
+        toplamlar['gider'][gun] = gider
+    return toplamlar
+
+
+@transaction.atomic
+def snapshotlari_yeniden_olustur():
+    """
+    DailyFinanceSnapshot tablosunu ham tablolardan sıfırdan üretir.
+    Oluşturulan gün sayısını döndürür. bulk_create sinyal göndermediği için veri sürümü
+    burada, işlem tamamlandıktan sonra artırılır; önbellekteki eski rakamlar kullanılmaz.
+    """
+    toplamlar = gunluk_toplamlar()
+    gunler = sorted(set(toplamlar['satis']) | set(toplamlar['siparis_odeme']) | set(toplamlar['gider']))
+
+    snapshotlar = []
+    for gun in gunler:
+        satis = toplamlar['satis'].get(gun, SIFIR)
+        siparis_odeme = toplamlar['siparis_odeme'].get(gun, SIFIR)
+        gider = toplamlar['gider'].get(gun, SIFIR)
+        snapshotlar.append(DailyFinanceSnapshot(
+            gun=gun,
+            satis_geliri=satis,
+            siparis_odeme_geliri=siparis_odeme,
+            gider_toplami=gider,
+            net_kazanc=satis + siparis_odeme - gider,
+        ))
+
+    DailyFinanceSnapshot.objects.all().delete()
+    DailyFinanceSnapshot.objects.bulk_create(snapshotlar, batch_size=500)
+    veri_degisti()
+    return len(snapshotlar)
+
+
+class FinansRaporu:
+    """
+    Dashboard grafiklerindeki tüm zaman dilimi serilerini tek seferde hesaplar.
+    Günlük toplamlar DailyFinanceSnapshot tablosundan bir kez okunur; aylık ve yıllık
+    kovalar bellekte toplanır, böylece sorgu sayısı kova sayısından bağımsızdır.
+    """
+
+    def __init__(self, simdi=None, gunluk=None, zaman_dilimi=None):
+        self.simdi = timezone.localtime(simdi or timezone.now())
+        self.bugun = self.simdi.date()
+        if gunluk is None:
+            # Tek bir zaman dilimi isteniyorsa sadece onun kapsadığı günler okunur
+            baslangic = self.baslangic_gunu(zaman_dilimi) if zaman_dilimi else None
+            gunluk = snapshot_gunluk_toplamlar(baslangic)
+        self.gunluk = gunluk
+
+        self.aylik = {kaynak: defaultdict(Decimal) for kaynak in self.gunluk}
+        self.yillik = {kaynak: defaultdict(Decimal) for kaynak in self.gunluk}
+        for kaynak, gunler in self.gunluk.items():
+            for gun, toplam in gunler.items():
+                self.aylik[kaynak][(gun.year, gun.month)] += toplam
+                self.yillik[kaynak][gun.year] += toplam
+
+    def baslangic_gunu(self, zaman_dilimi):
+        """Zaman diliminin kapsadığı ilk gün; 'tumzamanlar' için None."""
+        if zaman_dilimi == 'haftalik':
+            return self.bugun - timedelta(days=self.bugun.weekday())
+        if zaman_dilimi == 'aylik':
+            return self.bugun.replace(day=1)
+        ay_sayilari = {'ucaylik': 3, 'altiaylik': 6, 'yillik': 12}
+        if zaman_dilimi in ay_sayilari:
+            yil, ay = divmod(self.bugun.year * 12 + self.bugun.month - ay_sayilari[zaman_dilimi], 12)
+            return date(yil, ay + 1, 1)
+        return None
+
+    def _deger(self, tablo, anahtar, grafik):
+        gider = tablo['gider'].get(anahtar, SIFIR)
+        if grafik == 'gider':
+            return gider
+        return tablo['satis'].get(anahtar, SIFIR) + tablo['siparis_odeme'].get(anahtar, SIFIR) - gider
+
+    @cached_property
+    def ilk_yil(self):
+        yillar = [yil for kaynak in self.yillik.values() for yil in kaynak]
+        # Henüz ödemesi olmayan siparişler de tüm zamanlar aralığını genişletir
+        ilk_siparis = Siparis.objects.order_by('siparis_tarihi').values_list('siparis_tarihi', flat=True).first()
+        if ilk_siparis is not None:
+            yillar.append(timezone.localtime(ilk_siparis).year)
+        return min(yillar + [self.bugun.year])
+
+    def haftalik(self, grafik):
+        # Pazartesiden Pazar'a dahil
+        hafta_basi = self.bugun - timedelta(days=self.bugun.weekday())
+        labels, values = [], []
+        for i in range(7):
+            gun = hafta_basi + timedelta(days=i)
+            labels.append(weekday_to_turkish.get(gun.strftime('%a'), gun.strftime('%a')))
+            values.append(float(self._deger(self.gunluk, gun, grafik)))
+        return {'labels': labels, 'values': values}
+
+    def aylik_gunler(self, grafik):
+        # Ayın 1'inden son gününe
+        gun_sayisi = calendar.monthrange(self.bugun.year, self.bugun.month)[1]
+        labels, values = [], []
+        for i in range(1, gun_sayisi + 1):
+            gun = date(self.bugun.year, self.bugun.month, i)
+            labels.append(str(i))
+            values.append(float(self._deger(self.gunluk, gun, grafik)))
+        return {'labels': labels, 'values': values}
+
+    def son_aylar(self, ay_sayisi, grafik):
+        # Mevcut ay dahil, eskiden yeniye sıralı
+        labels, values = [], []
+        for i in reversed(range(ay_sayisi)):
+            yil, ay = divmod(self.bugun.year * 12 + self.bugun.month - 1 - i, 12)
+            ay += 1
+            ay_kisaltmasi = date(yil, ay, 1).strftime('%b')
+            labels.append(f"{month_to_turkish.get(ay_kisaltmasi, ay_kisaltmasi)} {yil}")
+            values.append(float(self._deger(self.aylik, (yil, ay), grafik)))
+        return {'labels': labels, 'values': values}
+
+    def tum_zamanlar(self, grafik):
+        yillar = list(range(self.ilk_yil, self.bugun.year + 1))
+        return {
+            'labels': yillar,
+            'values': [float(self._deger(self.yillik, yil, grafik)) for yil in yillar],
+        }
+
+    def seri(self, grafik, zaman_dilimi):
+        """
+        grafik: 'net_kazanc' veya 'gider'
+        zaman_dilimi: ZAMAN_DILIMLERI anahtarlarından biri
+        """
+        if zaman_dilimi == 'haftalik':
+            data = self.haftalik(grafik)
+        elif zaman_dilimi == 'aylik':
+            data = self.aylik_gunler(grafik)
+        elif zaman_dilimi == 'ucaylik':
+            data = self.son_aylar(3, grafik)
+        elif zaman_dilimi == 'altiaylik':
+            data = self.son_aylar(6, grafik)
+        elif zaman_dilimi == 'yillik':
+            data = self.son_aylar(12, grafik)
+        elif zaman_dilimi == 'tumzamanlar':
+            data = self.tum_zamanlar(grafik)
+        else:
+            raise ValueError(f"Bilinmeyen zaman dilimi: {zaman_dilimi}")
+        data['title'] = f"{ZAMAN_DILIMLERI[zaman_dilimi]} {GRAFIKLER[grafik]}"
+        return data
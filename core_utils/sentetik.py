@@ -0,0 +1,256 @@
+# core_utils/sentetik.py
+
+import random
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from core_utils import arama
+from core_utils.cache import model_verisi_degisti, veri_degisti
+from core_utils.dogrulama import ODEME_SEKILLERI
+from core_utils.importer import IceAktarici
+from core_utils.models import DailyFinanceSnapshot
+from core_utils.signals import snapshot_uygula
+from giderler.models import Gider, GiderKategorisi
+from musteri.models import Musteri
+from urun.katalog import KatalogGuncelleyici
+from urun.models import Urun
+
+ADLAR = (
+    'Ahmet', 'Mehmet', 'Mustafa', 'Ali', 'Hüseyin', 'Emre', 'Can', 'Burak', 'Oğuz', 'İsmail',
+    'Ayşe', 'Fatma', 'Zeynep', 'Elif', 'Selin', 'Merve', 'Şule', 'Gül', 'Özge', 'İrem',
+)
+SOYADLAR = (
+    'Yılmaz', 'Kaya', 'Demir', 'Şahin', 'Çelik', 'Yıldız', 'Yıldırım', 'Öztürk', 'Aydın', 'Özdemir',
+    'Arslan', 'Doğan', 'Kılıç', 'Aslan', 'Çetin', 'Kara', 'Koç', 'Kurt', 'Özkan', 'Şimşek',
+)
+MARKALAR = ('Ray-Ban', 'Oakley', 'Vogue', 'Prada', 'Polaroid', 'Carrera', 'Police', 'Osse', 'Persol', 'Essilor')
+URUN_KATEGORILERI = ('Güneş Gözlüğü', 'Optik Çerçeve', 'Gözlük Camı', 'Kontakt Lens', 'Lens Solüsyonu', 'Aksesuar')
+GIDER_KATEGORILERI = ('Kira', 'Elektrik', 'Su', 'Maaş', 'Tedarik', 'Vergi', 'Reklam', 'Bakım')
+# Siparişlerin durum dağılımı; çoğu geçmiş sipariş teslim edilmiştir
+SIPARIS_DURUM_AGIRLIKLARI = {'Beklemede': 1, 'Onaylandı': 1, 'Hazır': 1, 'Teslim Edildi': 6, 'İptal Edildi': 1}
+KULLANICI_ONEKI = 'sentetik_'
+
+
+class SentetikVeriUretici:
+    """
+    Yerelde üretim ölçeğinde veri oluşturur: müşteriler, kategorili ürünler, ürün satırları ve
+    ödemeleriyle satışlar, tüm durumlarda siparişler ve kullanıcı etiketli giderler.
+
+    Ürünler KatalogGuncelleyici, satış ve siparişler IceAktarici ile yazılır; böylece stok defteri,
+    arama indeksi ve günlük finans özetleri gerçek içe aktarma yoluyla aynı şekilde güncellenir.
+    Belgeler tarih sırasıyla üretilir ki her parça az sayıda günün özetine dokunsun.
+    Aynı tohum (seed) ve ölçekle aynı veri üretilir.
+    """
+
+    def __init__(self, satis=10000, musteri=None, urun=None, siparis=None, gider=None, kullanici=10,
+                 yil=3, tohum=42, parca_boyutu=2000, stok_guncelle=True, ilerleme=None):
+        self.satis = satis
+        self.musteri = musteri if musteri is not None else max(satis // 10, 10)
+        self.urun = urun if urun is not None else max(satis // 50, 50)
+        self.siparis = siparis if siparis is not None else satis // 4
+        self.gider = gider if gider is not None else max(yil * 12 * len(GIDER_KATEGORILERI), satis // 20)
+        self.kullanici = kullanici
+        self.yil = yil
+        self.parca_boyutu = parca_boyutu
+        self.stok_guncelle = stok_guncelle
+        self.rastgele = random.Random(tohum)
+        self.ilerleme = ilerleme or (lambda mesaj: None)
+        self.bitis = timezone.now()
+        self.baslangic = self.bitis - timedelta(days=365 * yil)
+        self.sayaclar = Counter()
+        self.sureler = {}
+
+    def calistir(self):
+        for adim in (self._kullanicilari_olustur, self._musterileri_olustur, self._urunleri_olustur,
+                     self._satis_ve_siparisleri_olustur, self._giderleri_olustur):
+            baslangic = time.monotonic()
+            adim()
+            self.sureler[adim.__name__.strip('_')] = time.monotonic() - baslangic
+        return self
+
+    # --- Yardımcılar ---
+
+    def _tarihler(self, adet):
+        """
+        'adet' zamanı baştan sona sıralı üretir; hepsi bellekte tutulmaz.
+        Günlere dağılım: cumartesi yoğun, pazar sakin, dönem boyunca hafif büyüme.
+        Saatler dükkan saatleri (09:00-19:00, yerel) içindedir.
+        """
+        ilk_gun = timezone.localtime(self.baslangic).date()
+        gunler = [ilk_gun + timedelta(days=i) for i in range((timezone.localtime(self.bitis).date() - ilk_gun).days)]
+        agirliklar = [
+            {5: 1.5, 6: 0.5}.get(gun.weekday(), 1.0) * (0.7 + 0.6 * sira / len(gunler))
+            for sira, gun in enumerate(gunler)
+        ]
+        toplam = sum(agirliklar)
+        paylar = [adet * agirlik / toplam for agirlik in agirliklar]
+        sayilar = [int(pay) for pay in paylar]
+        # Yuvarlamadan kalanlar kesirli kısmı en büyük günlere dağıtılır
+        for sira in sorted(range(len(gunler)), key=lambda i: sayilar[i] - paylar[i])[:adet - sum(sayilar)]:
+            sayilar[sira] += 1
+        for gun, sayi in zip(gunler, sayilar):
+            gun_baslangici = timezone.make_aware(datetime(gun.year, gun.month, gun.day))
+            for saniye in sorted(self.rastgele.randrange(9 * 3600, 19 * 3600) for _ in range(sayi)):
+                yield gun_baslangici + timedelta(seconds=saniye)
+
+    def _parcalar(self, nesneler):
+        nesneler = iter(nesneler)
+        while parca := list(islice(nesneler, self.parca_boyutu)):
+            yield parca
+
+    def _tutar(self, alt, ust):
+        return Decimal(self.rastgele.randrange(alt * 100, ust * 100)) / 100
+
+    # --- Adımlar ---
+
+    def _kullanicilari_olustur(self):
+        User = get_user_model()
+        mevcut = set(User.objects.filter(username__startswith=KULLANICI_ONEKI).values_list('username', flat=True))
+        yeniler = []
+        for sira in range(1, self.kullanici + 1):
+            kullanici_adi = f"{KULLANICI_ONEKI}{sira}"
+            if kullanici_adi not in mevcut:
+                kullanici = User(username=kullanici_adi, first_name=self.rastgele.choice(ADLAR),
+                                 last_name=self.rastgele.choice(SOYADLAR), is_staff=True)
+                kullanici.set_unusable_password()
+                yeniler.append(kullanici)
+        User.objects.bulk_create(yeniler)
+        model_verisi_degisti(User)
+        self.kullanici_idleri = list(
+            User.objects.filter(username__startswith=KULLANICI_ONEKI).values_list('pk', flat=True)[:self.kullanici]
+        )
+        self.sayaclar['kullanici'] = len(yeniler)
+        self.ilerleme(f"{len(yeniler)} kullanıcı oluşturuldu.")
+
+    def _musterileri_olustur(self):
+        for parca in self._parcalar(range(self.musteri)):
+            with transaction.atomic():
+                musteriler = Musteri.objects.bulk_create([
+                    Musteri(
+                        ad=self.rastgele.choice(ADLAR),
+                        soyad=self.rastgele.choice(SOYADLAR),
+                        telefon=f"05{self.rastgele.randrange(30, 56)}{self.rastgele.randrange(10 ** 7):07d}",
+                        eposta=f"musteri{sira}@example.com" if self.rastgele.random() < 0.5 else None,
+                    )
+                    for sira in parca
+                ])
+                # bulk_create sinyal tetiklemediği için arama satırları burada yazılır
+                arama.indeksle(Musteri, musteriler)
+        model_verisi_degisti(Musteri)
+        self.musteri_idleri = list(Musteri.objects.values_list('pk', flat=True))
+        self.sayaclar['musteri'] = self.musteri
+        self.ilerleme(f"{self.musteri} müşteri oluşturuldu.")
+
+    def _urunleri_olustur(self):
+        satirlar = []
+        for sira in range(1, self.urun + 1):
+            marka = self.rastgele.choice(MARKALAR)
+            alis = self._tutar(100, 3000)
+            satirlar.append((sira, {
+                'marka': marka,
+                'model_kodu': f"SN-{sira:06d}",
+                'ad': f"{marka} {self.rastgele.choice(URUN_KATEGORILERI)} {sira}",
+                'kategori': self.rastgele.choice(URUN_KATEGORILERI),
+                'alis_fiyati': str(alis),
+                'satis_fiyati': str((alis * Decimal('1.6')).quantize(Decimal('0.01'))),
+                'stok_adedi': self.rastgele.randrange(0, 200),
+            }))
+        guncelleyici = KatalogGuncelleyici(parca_boyutu=self.parca_boyutu).calistir(satirlar)
+        self.urun_fiyatlari = dict(Urun.objects.values_list('pk', 'satis_fiyati'))
+        self.sayaclar['urun'] = guncelleyici.sayaclar['yeni']
+        self.ilerleme(f"{guncelleyici.sayaclar['yeni']} ürün oluşturuldu ({guncelleyici.sayaclar['guncellenen']} güncellendi).")
+
+    def _satis_belgesi(self, tarih):
+        urun_idleri = self.rastgele.sample(self._urun_listesi, min(self.rastgele.choice((1, 1, 2, 2, 3, 4)), len(self._urun_listesi)))
+        urunler = [{'urun_id': urun_id, 'adet': self.rastgele.choice((1, 1, 1, 2))} for urun_id in urun_idleri]
+        toplam = sum(self.urun_fiyatlari[satir['urun_id']] * satir['adet'] for satir in urunler)
+        odeme_sekli = self.rastgele.choice(sorted(ODEME_SEKILLERI))
+        # Çoğu satış peşin; bir kısmı kısmi ödemeli (veresiye)
+        odemeler = [{'miktar': str(toplam), 'odeme_sekli': odeme_sekli, 'tarih': tarih.isoformat()}]
+        if self.rastgele.random() < 0.15:
+            odemeler[0]['miktar'] = str((toplam / 2).quantize(Decimal('0.01')))
+        return {
+            'tur': 'satis',
+            'tarih': tarih.isoformat(),
+            'musteri_id': self.rastgele.choice(self.musteri_idleri) if self.rastgele.random() < 0.7 else None,
+            'odeme_sekli': odeme_sekli,
+            'urunler': urunler,
+            'odemeler': odemeler,
+        }
+
+    def _siparis_belgesi(self, tarih):
+        durum = self.rastgele.choices(list(SIPARIS_DURUM_AGIRLIKLARI), weights=list(SIPARIS_DURUM_AGIRLIKLARI.values()))[0]
+        toplam = self._tutar(500, 8000)
+        odemeler = []
+        if durum != 'İptal Edildi':
+            kapora = (toplam * Decimal('0.3')).quantize(Decimal('0.01'))
+            odemeler.append({'miktar': str(kapora), 'tarih': tarih.isoformat()})
+            if durum == 'Teslim Edildi':
+                odemeler.append({'miktar': str(toplam - kapora), 'tarih': min(tarih + timedelta(days=7), self.bitis).isoformat()})
+        return {
+            'tur': 'siparis',
+            'tarih': tarih.isoformat(),
+            'musteri_id': self.rastgele.choice(self.musteri_idleri),
+            'toplam_tutar': str(toplam),
+            'durum': durum,
+            'teslimat_tarihi': (tarih + timedelta(days=self.rastgele.randrange(3, 15))).date().isoformat(),
+            'odemeler': odemeler,
+        }
+
+    def _belgeler(self):
+        self._urun_listesi = sorted(self.urun_fiyatlari)
+        turler = ['satis'] * self.satis + ['siparis'] * self.siparis
+        self.rastgele.shuffle(turler)
+        for sira, (tur, tarih) in enumerate(zip(turler, self._tarihler(len(turler))), start=1):
+            yield sira, self._satis_belgesi(tarih) if tur == 'satis' else self._siparis_belgesi(tarih)
+            if sira % (self.parca_boyutu * 10) == 0:
+                self.ilerleme(f"{sira}/{len(turler)} belge yazıldı.")
+
+    def _satis_ve_siparisleri_olustur(self):
+        ice_aktarici = IceAktarici(parca_boyutu=self.parca_boyutu, stok_guncelle=self.stok_guncelle)
+        ice_aktarici.calistir(self._belgeler())
+        if ice_aktarici.hatalar:
+            satir_no, mesaj = ice_aktarici.hatalar[0]
+            raise ValueError(f"Üretilen belge içe aktarılamadı (belge {satir_no}): {mesaj}")
+        for alan in ('satis', 'satis_urun', 'siparis', 'odeme'):
+            self.sayaclar[alan] = ice_aktarici.sayaclar[alan]
+        self.ilerleme(f"{self.sayaclar['satis']} satış, {self.sayaclar['siparis']} sipariş oluşturuldu.")
+
+    def _giderleri_olustur(self):
+        GiderKategorisi.objects.bulk_create([GiderKategorisi(ad=ad) for ad in GIDER_KATEGORILERI], ignore_conflicts=True)
+        kategori_idleri = list(GiderKategorisi.objects.filter(ad__in=GIDER_KATEGORILERI).values_list('pk', flat=True))
+        Etiket = Gider.harcanan_kullanicilar.through
+        for parca in self._parcalar(self._tarihler(self.gider)):
+            ozet_farklari = defaultdict(Decimal)
+            with transaction.atomic():
+                giderler = Gider.objects.bulk_create([
+                    Gider(miktar=self._tutar(50, 5000), kategori_id=self.rastgele.choice(kategori_idleri + [None]))
+                    for _ in parca
+                ])
+                # bulk_create auto_now_add alanını şimdiki zamanla doldurur; asıl tarihler geri yazılır
+                for gider, tarih in zip(giderler, parca):
+                    gider.gider_tarihi = tarih
+                    ozet_farklari[timezone.localtime(tarih).date()] += gider.miktar
+                Gider.objects.bulk_update(giderler, ['gider_tarihi'])
+                if self.kullanici_idleri:
+                    Etiket.objects.bulk_create([
+                        Etiket(gider_id=gider.pk, user_id=user_id)
+                        for gider in giderler
+                        for user_id in self.rastgele.sample(self.kullanici_idleri, self.rastgele.randrange(0, min(3, len(self.kullanici_idleri)) + 1))
+                    ])
+                DailyFinanceSnapshot.objects.bulk_create(
+                    [DailyFinanceSnapshot(gun=gun) for gun in ozet_farklari], ignore_conflicts=True,
+                )
+                for gun, miktar in ozet_farklari.items():
+                    snapshot_uygula(gun, gider=miktar)
+        veri_degisti()
+        model_verisi_degisti(Gider)
+        self.sayaclar['gider'] = self.gider
+        self.ilerleme(f"{self.gider} gider oluşturuldu.")
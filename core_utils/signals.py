@@ -0,0 +1,230 @@
+# core_utils/signals.py
+
+from decimal import Decimal
+
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core_utils import arama
+from core_utils.cache import model_verisi_degisti, veri_degisti
+from core_utils.models import DailyFinanceSnapshot
+from core_utils.reports import KAZANC_SIPARIS_DURUMLARI
+from giderler.models import Gider, GiderKategorisi
+from musteri.models import Musteri
+from satis.models import Satis, SatisOdeme, SatisUrun
+from siparis.models import Odeme, Siparis
+from urun.models import StokAyarlari, Urun, YenidenSiparisUrunu
+
+SIFIR = Decimal('0.00')
+
+
+# --- Günlük Finans Özeti (DailyFinanceSnapshot) Artımlı Güncelleme ---
+
+def yerel_gun(tarih):
+    return timezone.localtime(tarih).date()
+
+
+def snapshot_uygula(gun, satis=SIFIR, siparis_odeme=SIFIR, gider=SIFIR):
+    """
+    Bir günün özetine fark (delta) ekler. F() ifadeleri kullanıldığı için
+    eşzamanlı kayıtlarda güncelleme kaybolmaz.
+    """
+    if not (satis or siparis_odeme or gider):
+        return
+    degisiklikler = {
+        'satis_geliri': F('satis_geliri') + satis,
+        'siparis_odeme_geliri': F('siparis_odeme_geliri') + siparis_odeme,
+        'gider_toplami': F('gider_toplami') + gider,
+        'net_kazanc': F('net_kazanc') + (satis + siparis_odeme - gider),
+    }
+    if not DailyFinanceSnapshot.objects.filter(gun=gun).update(**degisiklikler):
+        DailyFinanceSnapshot.objects.get_or_create(gun=gun)
+        DailyFinanceSnapshot.objects.filter(gun=gun).update(**degisiklikler)
+
+
+# Kaydedilmeden önceki değerler post_init'te saklanır, böylece farkı bulmak için
+# kaydı veritabanından tekrar okumaya gerek kalmaz.
+# __dict__ kullanılır ki ertelenmiş (deferred) alanlar ek sorgu tetiklemesin.
+
+@receiver(post_init, sender=SatisUrun)
+def satis_urun_ilk_degerleri(sender, instance, **kwargs):
+    instance._finans_onceki = (
+        instance.__dict__.get('satis_id'),
+        instance.__dict__.get('adet'),
+        instance.__dict__.get('birim_fiyat'),
+    ) if instance.pk else None
+
+
+@receiver(post_init, sender=Odeme)
+def odeme_ilk_degerleri(sender, instance, **kwargs):
+    instance._finans_onceki = (
+        instance.__dict__.get('siparis_id'),
+        instance.__dict__.get('miktar'),
+    ) if instance.pk else None
+
+
+@receiver(post_init, sender=Gider)
+def gider_ilk_degerleri(sender, instance, **kwargs):
+    instance._finans_onceki = instance.__dict__.get('miktar') if instance.pk else None
+
+
+@receiver(post_init, sender=Siparis)
+def siparis_ilk_durumu(sender, instance, **kwargs):
+    instance._finans_onceki_durum = instance.__dict__.get('durum') if instance.pk else None
+
+
+def _satis_gunu(satis_id, satis=None):
+    if satis is not None and satis.pk == satis_id:
+        return yerel_gun(satis.satis_tarihi)
+    tarih = Satis.objects.filter(pk=satis_id).values_list('satis_tarihi', flat=True).first()
+    return yerel_gun(tarih) if tarih else None
+
+
+def _siparis_kazanca_dahil_mi(siparis_id, siparis=None):
+    if siparis is not None and siparis.pk == siparis_id:
+        return siparis.durum in KAZANC_SIPARIS_DURUMLARI
+    return Siparis.objects.filter(pk=siparis_id, durum__in=KAZANC_SIPARIS_DURUMLARI).exists()
+
+
+@receiver(post_save, sender=SatisUrun)
+def satis_urun_kaydedildi(sender, instance, **kwargs):
+    yeni_tutar = instance.adet * (instance.birim_fiyat or SIFIR)
+    gun = _satis_gunu(instance.satis_id, instance.satis)
+
+    onceki = getattr(instance, '_finans_onceki', None)
+    if onceki:
+        onceki_satis_id, onceki_adet, onceki_fiyat = onceki
+        onceki_tutar = (onceki_adet or 0) * (onceki_fiyat or SIFIR)
+        if onceki_satis_id == instance.satis_id:
+            yeni_tutar -= onceki_tutar
+        else:
+            onceki_gun = _satis_gunu(onceki_satis_id)
+            if onceki_gun:
+                snapshot_uygula(onceki_gun, satis=-onceki_tutar)
+
+    snapshot_uygula(gun, satis=yeni_tutar)
+    instance._finans_onceki = (instance.satis_id, instance.adet, instance.birim_fiyat)
+
+
+@receiver(post_delete, sender=SatisUrun)
+def satis_urun_silindi(sender, instance, **kwargs):
+    satis_id, adet, birim_fiyat = instance._finans_onceki or (instance.satis_id, instance.adet, instance.birim_fiyat)
+    gun = _satis_gunu(satis_id)
+    if gun:
+        snapshot_uygula(gun, satis=-((adet or 0) * (birim_fiyat or SIFIR)))
+
+
+@receiver(post_save, sender=Odeme)
+def odeme_kaydedildi(sender, instance, **kwargs):
+    gun = yerel_gun(instance.odeme_tarihi)
+    yeni_tutar = instance.miktar if _siparis_kazanca_dahil_mi(instance.siparis_id, instance.siparis) else SIFIR
+
+    onceki = getattr(instance, '_finans_onceki', None)
+    if onceki:
+        onceki_siparis_id, onceki_miktar = onceki
+        if _siparis_kazanca_dahil_mi(onceki_siparis_id, instance.siparis):
+            yeni_tutar -= onceki_miktar or SIFIR
+
+    snapshot_uygula(gun, siparis_odeme=yeni_tutar)
+    instance._finans_onceki = (instance.siparis_id, instance.miktar)
+
+
+@receiver(post_delete, sender=Odeme)
+def odeme_silindi(sender, instance, **kwargs):
+    siparis_id, miktar = instance._finans_onceki or (instance.siparis_id, instance.miktar)
+    if _siparis_kazanca_dahil_mi(siparis_id):
+        snapshot_uygula(yerel_gun(instance.odeme_tarihi), siparis_odeme=-(miktar or SIFIR))
+
+
+@receiver(post_save, sender=Siparis)
+def siparis_durumu_degisti(sender, instance, created, **kwargs):
+    onceki_durum = getattr(instance, '_finans_onceki_durum', None)
+    instance._finans_onceki_durum = instance.durum
+    if created:
+        return
+
+    onceki_dahil = onceki_durum in KAZANC_SIPARIS_DURUMLARI
+    simdi_dahil = instance.durum in KAZANC_SIPARIS_DURUMLARI
+    if onceki_dahil == simdi_dahil:
+        return
+
+    # Siparişin tüm ödemeleri gün bazında tek sorguyla toplanıp özetlere eklenir/çıkarılır
+    isaret = 1 if simdi_dahil else -1
+    gunluk_odemeler = (
+        Odeme.objects.filter(siparis=instance)
+        .annotate(gun=TruncDate('odeme_tarihi', tzinfo=timezone.get_default_timezone()))
+        .values('gun')
+        .annotate(toplam=Sum('miktar'))
+        .order_by()
+    )
+    for satir in gunluk_odemeler:
+        snapshot_uygula(satir['gun'], siparis_odeme=isaret * satir['toplam'])
+
+
+@receiver(post_save, sender=Gider)
+def gider_kaydedildi(sender, instance, **kwargs):
+    onceki_miktar = getattr(instance, '_finans_onceki', None) or SIFIR
+    snapshot_uygula(yerel_gun(instance.gider_tarihi), gider=instance.miktar - onceki_miktar)
+    instance._finans_onceki = instance.miktar
+
+
+@receiver(post_delete, sender=Gider)
+def gider_silindi(sender, instance, **kwargs):
+    miktar = instance._finans_onceki if instance._finans_onceki is not None else instance.miktar
+    snapshot_uygula(yerel_gun(instance.gider_tarihi), gider=-miktar)
+
+
+# --- Dashboard Önbelleği Geçersiz Kılma ---
+# Bu modellerden herhangi biri değiştiğinde global veri sürümü artırılır.
+# Proxy modellerin sinyalleri kendi sınıflarıyla gönderildiği için ayrıca listelenir.
+DASHBOARD_MODELLERI = (
+    Satis, SatisUrun, SatisOdeme,
+    Siparis, Odeme,
+    Gider, GiderKategorisi,
+    Urun, YenidenSiparisUrunu, StokAyarlari,
+)
+
+for _model in DASHBOARD_MODELLERI:
+    post_save.connect(veri_degisti, sender=_model, dispatch_uid=f'veri_degisti_save_{_model.__name__}')
+    post_delete.connect(veri_degisti, sender=_model, dispatch_uid=f'veri_degisti_delete_{_model.__name__}')
+
+# --- Otomatik Tamamlama Önbelleği Geçersiz Kılma ---
+# Bu modellerin otomatik tamamlama sonuçları kendi kapsamlı sürümleriyle önbelleğe alınır.
+OTOMATIK_TAMAMLAMA_MODELLERI = (Musteri, Urun, YenidenSiparisUrunu)
+
+for _model in OTOMATIK_TAMAMLAMA_MODELLERI:
+    post_save.connect(model_verisi_degisti, sender=_model, dispatch_uid=f'model_verisi_degisti_save_{_model.__name__}')
+    post_delete.connect(model_verisi_degisti, sender=_model, dispatch_uid=f'model_verisi_degisti_delete_{_model.__name__}')
+
+# --- Gider Kullanıcı Filtresi Önbelleği ---
+# Gider kayıtlarının ve etiketlenen kullanıcıların sürümü; GiderAdmin'in kullanıcı filtresi seçenekleri bunlara bağlıdır.
+post_save.connect(model_verisi_degisti, sender=Gider, dispatch_uid='model_verisi_degisti_save_Gider')
+post_delete.connect(model_verisi_degisti, sender=Gider, dispatch_uid='model_verisi_degisti_delete_Gider')
+
+
+@receiver(m2m_changed, sender=Gider.harcanan_kullanicilar.through)
+def gider_kullanicilari_degisti(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        model_verisi_degisti(Gider)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def kullanici_degisti(sender, update_fields=None, **kwargs):
+    # Girişte sadece last_login güncellenir; filtre seçeneklerini etkilemez
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    model_verisi_degisti(sender)
+
+
+# --- Tam Metin Arama İndeksi (FTS5) ---
+# Arama satırları kaydın kendisiyle aynı işlem içinde yazılır/silinir.
+ARAMA_MODELLERI = (Musteri, Urun, YenidenSiparisUrunu)
+
+for _model in ARAMA_MODELLERI:
+    post_save.connect(arama.kayit_kaydedildi, sender=_model, dispatch_uid=f'arama_save_{_model.__name__}')
+    post_delete.connect(arama.kayit_silindi, sender=_model, dispatch_uid=f'arama_delete_{_model.__name__}')
@@ -0,0 +1,25 @@
+# core_utils/sqlite3/base.py
+
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+
+
+class DatabaseWrapper(SQLiteDatabaseWrapper):
+    """
+    transaction.atomic() bloklarını 'BEGIN IMMEDIATE' ile başlatan SQLite backend'i.
+
+    Varsayılan 'BEGIN' (DEFERRED) ile transaction önce okuyup sonra yazmaya geçtiğinde, araya
+    başka bir yazar girmişse SQLite busy_timeout'u beklemeden 'database is locked' döndürür
+    (okunan görüntü artık güncel değildir). IMMEDIATE ile yazma kilidi transaction başında
+    alınır; eşzamanlı yazarlar hata yerine busy_timeout süresince sırada bekler.
+
+    Bedeli: yazma kilidi sadece yazan değil her atomic blokta alınır; örneğin admin
+    changeform_view/delete_view GET istekleri de atomic içinde çalışır ve yazarların arkasında
+    sıraya girer. Bunu önlemek için ertelenmis_transaction True iken bloklar düz 'BEGIN' ile
+    açılır (WAL'da okuyucular beklemez); core_utils.db.ertelenmis_transactionlar ve
+    OkumaIstegiMiddleware güvenli (GET/HEAD/OPTIONS) isteklerde bunu kullanır.
+    """
+
+    ertelenmis_transaction = False
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN' if self.ertelenmis_transaction else 'BEGIN IMMEDIATE')
@@ -1,3 +1,799 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from Web.urls import dashboard_context
+from giderler.models import Gider, GiderKategorisi
+from musteri.models import Musteri
+from satis.models import Satis, SatisOdeme, SatisUrun
+from siparis.models import Odeme, Siparis
+from urun.katalog import KatalogGuncelleyici
+from urun.models import HAREKET_ICE_AKTARMA, Kategori, StokAyarlari, StokHareketi, Urun
+from . import arama
+from .importer import IceAktarici, csv_belgeleri, jsonl_belgeleri
+from .export import DISA_AKTARIMLAR, csv_akisi
+from .cache import surumlu_onbellek, veri_surumu, veri_surumunu_artir
+from .middleware import parmak_izi
+from .models import DailyFinanceSnapshot
+from .reports import GRAFIKLER, ZAMAN_DILIMLERI, FinansRaporu, KATEGORISIZ, gider_kategori_pivotu, gunluk_toplamlar, snapshotlari_yeniden_olustur
+from .sentetik import SentetikVeriUretici
+from .yuk_testi import YukTesti
+
+
+class VeriSurumuTests(TestCase):
+    def test_surum_artar_ve_onbellek_temizlense_de_korunur(self):
+        self.assertEqual(veri_surumu(), 1)
+        veri_surumunu_artir()
+        veri_surumunu_artir()
+        cache.clear()
+        self.assertEqual(veri_surumu(), 3)
+        # Kapsamlı sayaçlar birbirinden bağımsızdır
+        self.assertEqual(veri_surumu('musteri.musteri'), 1)
+
+    def test_kayit_degisince_surumlu_onbellek_yeniden_hesaplanir(self):
+        hesaplamalar = []
+        def hesapla():
+            hesaplamalar.append(1)
+            return len(hesaplamalar)
+        self.assertEqual(surumlu_onbellek('deneme', hesapla), 1)
+        self.assertEqual(surumlu_onbellek('deneme', hesapla), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Gider.objects.create(miktar=Decimal('100.00'))
+        self.assertEqual(surumlu_onbellek('deneme', hesapla), 2)
+
+
+def finans_ozetleri():
+    # Sıfır satırlar karşılaştırmaya katılmaz; artımlı güncelleme boşalan günün satırını silmez
+    return {
+        ozet.gun: (ozet.satis_geliri, ozet.siparis_odeme_geliri, ozet.gider_toplami, ozet.net_kazanc)
+        for ozet in DailyFinanceSnapshot.objects.all()
+        if ozet.satis_geliri or ozet.siparis_odeme_geliri or ozet.gider_toplami
+    }
+
+
+class FinansOzetiTests(TestCase):
+    """Her değişiklikten sonra artımlı özet, sıfırdan üretilenle aynı olmalı."""
+
+    def setUp(self):
+        self.urun = Urun.objects.create(ad="Çerçeve", satis_fiyati=Decimal('100.00'), stok_adedi=100)
+        self.dun = timezone.now() - timedelta(days=1)
+
+    def assertOzetTutarli(self):
+        artimli = finans_ozetleri()
+        snapshotlari_yeniden_olustur()
+        self.assertEqual(artimli, finans_ozetleri())
+        return artimli
+
+    def test_satis_satiri_degisiklikleri(self):
+        satis = Satis.objects.create()
+        eski_satis = Satis.objects.create()
+        Satis.objects.filter(pk=eski_satis.pk).update(satis_tarihi=self.dun)
+        eski_satis.refresh_from_db()
+        satir = SatisUrun.objects.create(satis=satis, urun=self.urun, adet=2)
+        self.assertOzetTutarli()
+
+        satir = SatisUrun.objects.get(pk=satir.pk)
+        satir.adet = 3
+        satir.birim_fiyat = Decimal('80.00')
+        satir.save()
+        ozetler = self.assertOzetTutarli()
+        self.assertEqual(ozetler[timezone.localdate()][0], Decimal('240.00'))
+
+        # Başka güne ait satışa taşınan satır bugünden düşer, dünkü özete eklenir
+        satir = SatisUrun.objects.get(pk=satir.pk)
+        satir.satis = eski_satis
+        satir.save()
+        ozetler = self.assertOzetTutarli()
+        self.assertEqual(ozetler[timezone.localdate(self.dun)][0], Decimal('240.00'))
+        self.assertNotIn(timezone.localdate(), ozetler)
+
+        SatisUrun.objects.get(pk=satir.pk).delete()
+        self.assertEqual(self.assertOzetTutarli(), {})
+
+    def test_siparis_odemeleri_ve_durum_gecisleri(self):
+        siparis = Siparis.objects.create(toplam_tutar=Decimal('500.00'), durum='Teslim Edildi')
+        odeme = Odeme.objects.create(siparis=siparis, miktar=Decimal('200.00'))
+        Odeme.objects.filter(pk=odeme.pk).update(odeme_tarihi=self.dun)
+        Odeme.objects.create(siparis=siparis, miktar=Decimal('50.00'))
+        # Tarih update() ile (sinyalsiz) geriye alındığı için başlangıç özeti yeniden üretilir
+        snapshotlari_yeniden_olustur()
+
+        odeme = Odeme.objects.get(pk=odeme.pk)
+        odeme.miktar = Decimal('150.00')
+        odeme.save()
+        self.assertEqual(self.assertOzetTutarli()[timezone.localdate(self.dun)][1], Decimal('150.00'))
+
+        # Kazanca dahil olmayan duruma geçen siparişin tüm ödemeleri düşer, geri dönünce eklenir
+        siparis = Siparis.objects.get(pk=siparis.pk)
+        siparis.durum = 'İptal Edildi'
+        siparis.save()
+        self.assertEqual(self.assertOzetTutarli(), {})
+        siparis.durum = 'Tamamlandı'
+        siparis.save()
+        self.assertEqual(len(self.assertOzetTutarli()), 2)
+
+        Odeme.objects.get(pk=odeme.pk).delete()
+        self.assertNotIn(timezone.localdate(self.dun), self.assertOzetTutarli())
+
+        # Kazanca dahil olmayan siparişin ödemesi özete yazılmaz
+        beklemede = Siparis.objects.create(toplam_tutar=Decimal('100.00'))
+        Odeme.objects.create(siparis=beklemede, miktar=Decimal('100.00'))
+        self.assertEqual(self.assertOzetTutarli()[timezone.localdate()][1], Decimal('50.00'))
+
+    def test_gider_degisiklikleri(self):
+        gider = Gider.objects.create(miktar=Decimal('70.00'))
+        Gider.objects.create(miktar=Decimal('30.00'))
+        gider = Gider.objects.get(pk=gider.pk)
+        gider.miktar = Decimal('90.00')
+        gider.save()
+        ozetler = self.assertOzetTutarli()
+        self.assertEqual(ozetler[timezone.localdate()][2:], (Decimal('120.00'), Decimal('-120.00')))
+
+        Gider.objects.get(pk=gider.pk).delete()
+        self.assertEqual(self.assertOzetTutarli()[timezone.localdate()][2], Decimal('30.00'))
+
+    def test_yeniden_olusturma_veri_surumunu_artirir(self):
+        surum = veri_surumu()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('rebuild_finance_snapshots', stdout=StringIO())
+        self.assertEqual(veri_surumu(), surum + 1)
+
+
+def yerel(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class FinansRaporuTests(TestCase):
+    """
+    Seriler her dönem için ayrı ayrı (yerel saatle) toplanmış değerlerle aynı olmalı.
+    Kayıtlar UTC'de bir önceki güne/aya düşen yerel gece yarısı sonrasına yerleştirilir.
+    """
+    SIMDI = (2026, 3, 3, 12) # Salı; hafta 2 Mart Pazartesi başlar
+
+    def setUp(self):
+        urun = Urun.objects.create(ad="Çerçeve", satis_fiyati=Decimal('1.00'), stok_adedi=10000)
+        for tutar, tarih in (
+            (100, yerel(2026, 3, 1, 23, 30)), # Pazar, geçen hafta
+            (200, yerel(2026, 3, 2, 0, 30)), # UTC'de 1 Mart
+            (50, yerel(2026, 2, 28, 23, 30)),
+            (40, yerel(2026, 3, 1, 0, 15)), # UTC'de 28 Şubat
+        ):
+            satis = Satis.objects.create()
+            SatisUrun.objects.create(satis=satis, urun=urun, adet=tutar)
+            Satis.objects.filter(pk=satis.pk).update(satis_tarihi=tarih)
+        for durum, tutar in (('Teslim Edildi', 300), ('Beklemede', 999)):
+            odeme = Odeme.objects.create(siparis=Siparis.objects.create(durum=durum), miktar=Decimal(tutar))
+            Odeme.objects.filter(pk=odeme.pk).update(odeme_tarihi=yerel(2026, 3, 2, 1, 0))
+        for tutar, tarih in ((70, yerel(2026, 3, 2, 2, 0)), (30, yerel(2026, 2, 28, 22, 0)), (20, yerel(2025, 6, 15, 12, 0))):
+            gider = Gider.objects.create(miktar=Decimal(tutar))
+            Gider.objects.filter(pk=gider.pk).update(gider_tarihi=tarih)
+        # Tarihler update() ile (sinyalsiz) değiştirildi
+        snapshotlari_yeniden_olustur()
+
+    def raporlar(self):
+        simdi = yerel(*self.SIMDI)
+        yield 'snapshot', FinansRaporu(simdi=simdi)
+        yield 'ham tablolar', FinansRaporu(simdi=simdi, gunluk=gunluk_toplamlar())
+
+    def test_seriler_yerel_gun_ve_ay_sinirlarina_gore_toplanir(self):
+        gunler = [0.0] * 31
+        gunler[0], gunler[1] = 140.0, 430.0
+        gun_giderleri = [0.0] * 31
+        gun_giderleri[1] = 70.0
+        on_iki_ay = [0.0] * 12
+        on_iki_ay[2] = -20.0 # Haziran 2025
+        beklenen = {
+            ('net_kazanc', 'haftalik'): [430.0, 0, 0, 0, 0, 0, 0],
+            ('gider', 'haftalik'): [70.0, 0, 0, 0, 0, 0, 0],
+            ('net_kazanc', 'aylik'): gunler,
+            ('gider', 'aylik'): gun_giderleri,
+            ('net_kazanc', 'ucaylik'): [0.0, 20.0, 570.0],
+            ('gider', 'ucaylik'): [0.0, 30.0, 70.0],
+            ('net_kazanc', 'altiaylik'): [0.0, 0.0, 0.0, 0.0, 20.0, 570.0],
+            ('net_kazanc', 'yillik'): on_iki_ay[:10] + [20.0, 570.0],
+            ('gider', 'yillik'): [0.0, 0.0, 20.0] + [0.0] * 7 + [30.0, 70.0],
+            ('net_kazanc', 'tumzamanlar'): [-20.0, 590.0],
+            ('gider', 'tumzamanlar'): [20.0, 100.0],
+        }
+        for kaynak, rapor in self.raporlar():
+            for (grafik, zaman_dilimi), degerler in beklenen.items():
+                with self.subTest(kaynak=kaynak, grafik=grafik, zaman_dilimi=zaman_dilimi):
+                    self.assertEqual(rapor.seri(grafik, zaman_dilimi)['values'], degerler)
+
+        rapor = FinansRaporu(simdi=yerel(*self.SIMDI))
+        self.assertEqual(rapor.seri('gider', 'ucaylik')['labels'], ['Oca 2026', 'Şub 2026', 'Mar 2026'])
+        self.assertEqual(rapor.seri('gider', 'tumzamanlar')['labels'], [2025, 2026])
+
+    def test_sorgu_sayisi_sabit(self):
+        simdi = yerel(*self.SIMDI)
+        with self.assertNumQueries(2): # günlük özetler + tüm zamanlar için ilk sipariş
+            rapor = FinansRaporu(simdi=simdi)
+            for grafik in GRAFIKLER:
+                for zaman_dilimi in ZAMAN_DILIMLERI:
+                    rapor.seri(grafik, zaman_dilimi)
+        with self.assertNumQueries(1):
+            FinansRaporu(simdi=simdi, zaman_dilimi='haftalik').seri('net_kazanc', 'haftalik')
+
+
+class GiderPivotuTests(TestCase):
+    def gider(self, miktar, an, kategori=None):
+        gider = Gider.objects.create(miktar=Decimal(miktar), kategori=kategori)
+        Gider.objects.filter(pk=gider.pk).update(gider_tarihi=timezone.make_aware(an))
+
+    def test_kategori_ay_matrisi_ve_ay_sinirlari(self):
+        kira = GiderKategorisi.objects.create(ad="Kira")
+        fatura = GiderKategorisi.objects.create(ad="Fatura")
+        # Yerel saatle ay sınırının iki yanı (UTC'de ikisi de Şubat'tadır)
+        self.gider('100.00', datetime(2026, 3, 1, 0, 30), kira)
+        self.gider('40.00', datetime(2026, 2, 28, 23, 30), kira)
+        self.gider('25.00', datetime(2026, 2, 10, 12), fatura)
+        self.gider('15.00', datetime(2026, 1, 5, 12))
+        self.gider('999.00', datetime(2025, 12, 31, 23, 59), kira) # üç aylık pencerenin dışında
+
+        with self.assertNumQueries(2):
+            pivot, kategoriler = gider_kategori_pivotu(ay_sayisi=3, simdi=timezone.make_aware(datetime(2026, 3, 15, 12)))
+
+        self.assertEqual(list(pivot), ['2026-03', '2026-02', '2026-01'])
+        self.assertEqual(kategoriler, ["Fatura", "Kira", KATEGORISIZ])
+        self.assertEqual(pivot['2026-03'], {"Fatura": 0.0, "Kira": 100.0, KATEGORISIZ: 0.0})
+        self.assertEqual(pivot['2026-02'], {"Fatura": 25.0, "Kira": 40.0, KATEGORISIZ: 0.0})
+        self.assertEqual(pivot['2026-01'], {"Fatura": 0.0, "Kira": 0.0, KATEGORISIZ: 15.0})
+
+    def test_kategorisiz_gider_yoksa_sutun_eklenmez(self):
+        GiderKategorisi.objects.create(ad="Kira")
+        pivot, kategoriler = gider_kategori_pivotu(ay_sayisi=1)
+        self.assertEqual(kategoriler, ["Kira"])
+        self.assertEqual(list(pivot.values()), [{"Kira": 0.0}])
+
+
+class OtomatikTamamlamaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'sifre'))
+
+    def sonuclar(self, model_name, field_name, term):
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'satis', 'model_name': model_name, 'field_name': field_name, 'term': term,
+        })
+        self.assertEqual(response.status_code, 200)
+        return sorted(sonuc['text'] for sonuc in response.json()['results'])
+
+    def test_musteri_kaydedilince_sonuclar_yenilenir(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            musteri = Musteri.objects.create(ad="Ali", soyad="Yılmaz")
+        self.assertEqual(len(self.sonuclar('satis', 'musteri', 'Al')), 1)
+
+        # Sinyalsiz değişiklik sürümü artırmaz: önbellekteki sonuç döner
+        Musteri.objects.filter(pk=musteri.pk).update(ad="Veli")
+        self.assertEqual(len(self.sonuclar('satis', 'musteri', 'Al')), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Musteri.objects.get(pk=musteri.pk).save()
+        self.assertEqual(self.sonuclar('satis', 'musteri', 'Al'), [])
+
+    def test_urun_eklenip_silinince_sonuclar_yenilenir(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Urun.objects.create(ad="Çerçeve", marka="Ray-Ban", satis_fiyati=Decimal('100.00'))
+        self.assertEqual(len(self.sonuclar('satisurun', 'urun', 'Ray')), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ikinci = Urun.objects.create(ad="Güneş Gözlüğü", marka="Ray-Ban", satis_fiyati=Decimal('200.00'))
+        self.assertEqual(len(self.sonuclar('satisurun', 'urun', 'Ray')), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ikinci.delete()
+        self.assertEqual(len(self.sonuclar('satisurun', 'urun', 'Ray')), 1)
+
+
+class AramaIndeksiTests(TestCase):
+    def ara(self, model, terim):
+        return set(model.objects.filter(pk__in=RawSQL(*arama.eslesen_idler_sql(model, terim))).values_list('pk', flat=True))
+
+    def test_turkce_katlama(self):
+        self.assertEqual(arama.turkce_katla('İSTANBUL'), 'istanbul')
+        self.assertEqual(arama.turkce_katla('IŞIK'), 'isik')
+        self.assertEqual(arama.turkce_katla('ılık Şeker'), 'ilik seker')
+        self.assertEqual(arama.turkce_katla(None), '')
+        self.assertIsNone(arama.eslesme_ifadesi('- / .'))
+
+    def test_kaydetme_ve_silme_indeksi_gunceller(self):
+        musteri = Musteri.objects.create(ad="İsmail", soyad="Işık", telefon="0532 123 45 67")
+        for terim in ("ismail", "ISMA", "işık", "ISIK", "05321234567", "ismail isik"):
+            self.assertEqual(self.ara(Musteri, terim), {musteri.pk}, terim)
+        self.assertEqual(self.ara(Musteri, "ismail yilmaz"), set())
+
+        musteri.soyad = "Yılmaz"
+        musteri.save()
+        self.assertEqual(self.ara(Musteri, "isik"), set())
+        self.assertEqual(self.ara(Musteri, "yilmaz"), {musteri.pk})
+
+        musteri.delete()
+        self.assertEqual(self.ara(Musteri, "ismail"), set())
+
+    def test_toplu_katalog_aktarimi_indeksi_gunceller(self):
+        mevcut = Urun.objects.create(ad="Çerçeve", marka="Ray-Ban", model_kodu="RB-3025", satis_fiyati=Decimal('100.00'))
+        KatalogGuncelleyici().calistir([
+            (2, {'marka': "Ray-Ban", 'model_kodu': "RB-3025", 'ad': "Aviator"}),
+            (3, {'marka': "Oakley", 'model_kodu': "OO-9208", 'satis_fiyati': '250'}),
+        ])
+        yeni = Urun.objects.get(model_kodu="OO-9208")
+        self.assertEqual(self.ara(Urun, "aviator"), {mevcut.pk})
+        self.assertEqual(self.ara(Urun, "cerceve"), set())
+        self.assertEqual(self.ara(Urun, "oo9208"), {yeni.pk})
+
+    def test_admin_aramasi_indeksi_kullanir(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'sifre'))
+        musteri = Musteri.objects.create(ad="Şükrü", soyad="Öztürk")
+        Musteri.objects.create(ad="Ali", soyad="Yılmaz")
+        response = self.client.get(reverse('admin:musteri_musteri_changelist'), {'q': "sukru OZTURK"})
+        self.assertEqual([nesne.pk for nesne in response.context['cl'].result_list], [musteri.pk])
+
+
+class DisaAktarmaTests(TestCase):
+    def setUp(self):
+        self.musteri = Musteri.objects.create(ad="Ayşe", soyad="Kaya")
+        self.urun = Urun.objects.create(ad="Çerçeve, metal", satis_fiyati=Decimal('100.00'), stok_adedi=10)
+
+    def satirlar(self, tur, queryset=None):
+        model, satir_uretici = DISA_AKTARIMLAR[tur]
+        metin = ''.join(csv_akisi(satir_uretici(model.objects.all() if queryset is None else queryset)))
+        self.assertTrue(metin.startswith('\ufeff'))
+        return list(csv.reader(StringIO(metin[1:])))
+
+    def test_satis_urun_ve_odeme_satirlari(self):
+        satis = Satis.objects.create(musteri=self.musteri, odeme_sekli='Nakit')
+        SatisUrun.objects.create(satis=satis, urun=self.urun, adet=2)
+        SatisOdeme.objects.create(satis=satis, miktar=Decimal('50'), odeme_sekli='Nakit')
+        bos = Satis.objects.create(notlar="not")
+
+        baslik, *satirlar = self.satirlar('satis')
+        self.assertEqual(baslik[:3], ['Satış No', 'Satış Tarihi', 'Müşteri'])
+        self.assertEqual(len(satirlar), 3)
+        urun_satiri, odeme_satiri, bos_satir = satirlar
+        self.assertEqual(urun_satiri[0], str(satis.pk))
+        self.assertEqual(urun_satiri[2], "Ayşe Kaya")
+        self.assertEqual(urun_satiri[4:12], ['200.00', '50.00', '150.00', 'Ürün', "Çerçeve, metal", '2', '100.00', '200.00'])
+        self.assertEqual(odeme_satiri[7:13], ['Ödeme', '', '', '', '50.00', 'Nakit'])
+        self.assertEqual((bos_satir[0], bos_satir[7], bos_satir[-1]), (str(bos.pk), 'Satış', "not"))
+
+    def test_siparis_ve_gider_satirlari(self):
+        siparis = Siparis.objects.create(musteri=self.musteri, toplam_tutar=Decimal('300.00'))
+        Odeme.objects.create(siparis=siparis, miktar=Decimal('100.00'), odeme_sekli='Nakit')
+        Odeme.objects.create(siparis=siparis, miktar=Decimal('50.00'), odeme_sekli='Nakit')
+        _, *satirlar = self.satirlar('siparis')
+        self.assertEqual(sorted(satir[5:9] for satir in satirlar), [['300.00', '150.00', '150.00', '100.00'], ['300.00', '150.00', '150.00', '50.00']])
+
+        kullanici = User.objects.create_user('ayse', first_name="Ayşe", last_name="Kaya")
+        gider = Gider.objects.create(kategori=GiderKategorisi.objects.create(ad="Kira"), miktar=Decimal('1000'))
+        gider.harcanan_kullanicilar.add(kullanici, User.objects.create_user('mehmet'))
+        baslik, satir = self.satirlar('gider')
+        self.assertEqual(len(baslik), len(satir))
+        self.assertEqual(satir[2:5], ['Kira', '1000.00', "Ayşe Kaya, mehmet"])
+
+    def test_sorgu_sayisi_kayit_sayisindan_bagimsiz(self):
+        def sorgu_sayisi():
+            with CaptureQueriesContext(connection) as sorgular:
+                self.satirlar('satis')
+            return len(sorgular)
+
+        SatisUrun.objects.create(satis=Satis.objects.create(), urun=self.urun, adet=1)
+        tek = sorgu_sayisi()
+        for _ in range(5):
+            satis = Satis.objects.create(musteri=self.musteri)
+            SatisUrun.objects.create(satis=satis, urun=self.urun, adet=1)
+            SatisOdeme.objects.create(satis=satis, miktar=Decimal('10'), odeme_sekli='Nakit')
+        self.assertEqual(sorgu_sayisi(), tek)
+
+    def test_komut_ve_admin_aksiyonu(self):
+        SatisUrun.objects.create(satis=Satis.objects.create(), urun=self.urun, adet=1)
+        with tempfile.TemporaryDirectory() as dizin:
+            dosya = os.path.join(dizin, 'satislar.csv')
+            call_command('export_data', 'satis', '--yil', str(timezone.localdate().year), '--cikti', dosya, stdout=StringIO())
+            with open(dosya, encoding='utf-8-sig', newline='') as csv_dosyasi:
+                self.assertEqual(len(list(csv.reader(csv_dosyasi))), 2)
+            call_command('export_data', 'satis', '--yil', '2000', '--cikti', dosya, stdout=StringIO())
+            with open(dosya, encoding='utf-8-sig', newline='') as csv_dosyasi:
+                self.assertEqual(len(list(csv.reader(csv_dosyasi))), 1)
+
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'sifre'))
+        response = self.client.post(reverse('admin:satis_satis_changelist'), {
+            'action': 'satis_csv_disa_aktar', admin.helpers.ACTION_CHECKBOX_NAME: list(Satis.objects.values_list('pk', flat=True)),
+        })
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="satislar_', response['Content-Disposition'])
+        self.assertIn("Çerçeve, metal", b''.join(response.streaming_content).decode('utf-8'))
+
+
+class IceAktarmaTests(TestCase):
+    def setUp(self):
+        self.musteri = Musteri.objects.create(ad="Ayşe", soyad="Kaya")
+        self.urun = Urun.objects.create(ad="Çerçeve", satis_fiyati=Decimal('100.00'), stok_adedi=20)
+        self.dun = (timezone.localdate() - timedelta(days=1)).isoformat()
+
+    def jsonl(self, *belgeler):
+        return '\n'.join(belge if isinstance(belge, str) else json.dumps(belge) for belge in belgeler) + '\n'
+
+    def belgeler(self):
+        return self.jsonl(
+            {'tur': 'satis', 'tarih': self.dun, 'musteri_id': self.musteri.pk,
+             'urunler': [{'urun_id': self.urun.pk, 'adet': 2}, {'urun_id': self.urun.pk, 'adet': 1}],
+             'odemeler': [{'miktar': '100'}]},
+            '{bozuk',
+            {'tur': 'satis', 'urunler': [{'urun_id': 999999, 'adet': 1}]},
+            {'tur': 'satis', 'urunler': [{'urun_id': self.urun.pk, 'adet': 0}]},
+            {'tur': 'siparis', 'musteri_id': 'abc'},
+            {'tur': 'siparis', 'tarih': self.dun, 'durum': 'Teslim Edildi', 'toplam_tutar': '500',
+             'odemeler': [{'miktar': '-5'}]},
+            {'tur': 'siparis', 'tarih': self.dun, 'durum': 'Teslim Edildi', 'toplam_tutar': '500',
+             'odemeler': [{'miktar': '200', 'tarih': self.dun}]},
+        )
+
+    def test_hatali_belgeler_satir_numarasiyla_raporlanir(self):
+        ice_aktarici = IceAktarici(parca_boyutu=2).calistir(jsonl_belgeleri(StringIO(self.belgeler())))
+        self.assertEqual([satir_no for satir_no, _ in ice_aktarici.hatalar], [2, 3, 4, 5, 6])
+        self.assertIn("Geçersiz JSON", ice_aktarici.hatalar[0][1])
+        self.assertIn("Ürün bulunamadı: 999999", ice_aktarici.hatalar[1][1])
+        self.assertIn("'adet' pozitif olmalı: 0", ice_aktarici.hatalar[2][1])
+        self.assertIn("'musteri_id'", ice_aktarici.hatalar[3][1])
+        self.assertIn("negatif", ice_aktarici.hatalar[4][1])
+        self.assertEqual(
+            (ice_aktarici.sayaclar['okunan'], ice_aktarici.sayaclar['satis'], ice_aktarici.sayaclar['siparis'], ice_aktarici.sayaclar['satis_urun']),
+            (7, 1, 1, 1),
+        )
+
+        # Aynı ürünün satırları birleştirilir, tarih korunur, stok ve defter güncellenir
+        satis = Satis.objects.get()
+        self.assertEqual(timezone.localtime(satis.satis_tarihi).date().isoformat(), self.dun)
+        self.assertEqual(list(satis.satis_urunleri.values_list('adet', 'birim_fiyat')), [(3, Decimal('100.00'))])
+        self.assertEqual(Urun.objects.get(pk=self.urun.pk).stok_adedi, 17)
+        self.assertEqual(
+            list(StokHareketi.objects.filter(neden=HAREKET_ICE_AKTARMA).values_list('degisim', 'satis_no')),
+            [(-3, satis.pk)],
+        )
+
+        # Artımlı yazılan günlük özetler sıfırdan hesaplananla aynı olmalı
+        dun = timezone.localdate() - timedelta(days=1)
+        artimli = finans_ozetleri()
+        self.assertEqual(artimli[dun][:2], (Decimal('300.00'), Decimal('200.00')))
+        snapshotlari_yeniden_olustur()
+        self.assertEqual(artimli, finans_ozetleri())
+
+    def test_stoksuz_aktarma_stogu_degistirmez(self):
+        IceAktarici(stok_guncelle=False).calistir(jsonl_belgeleri(StringIO(self.belgeler())))
+        self.assertEqual(Urun.objects.get(pk=self.urun.pk).stok_adedi, 20)
+        self.assertFalse(StokHareketi.objects.filter(neden=HAREKET_ICE_AKTARMA).exists())
+
+    def test_csv_satirlari_belgede_birlestirilir(self):
+        metin = (
+            "tur,kaynak_no,tarih,musteri_id,urun_id,adet,odeme_miktar\n"
+            f"satis,A1,{self.dun},{self.musteri.pk},{self.urun.pk},2,\n"
+            "satis,A1,,,,,150\n"
+            f"satis,A2,{self.dun},,{self.urun.pk},1,\n"
+        )
+        belgeler = list(csv_belgeleri(StringIO(metin)))
+        self.assertEqual([satir_no for satir_no, _ in belgeler], [2, 4])
+        self.assertEqual(len(belgeler[0][1]['urunler']), 1)
+        self.assertEqual(belgeler[0][1]['odemeler'][0]['miktar'], '150')
+
+        IceAktarici().calistir(belgeler)
+        self.assertEqual(Satis.objects.count(), 2)
+        self.assertEqual(Urun.objects.get(pk=self.urun.pk).stok_adedi, 17)
+
+    def test_dry_run_komutu_yazmaz(self):
+        with tempfile.TemporaryDirectory() as dizin:
+            dosya = os.path.join(dizin, 'belgeler.jsonl')
+            with open(dosya, 'w', encoding='utf-8') as jsonl_dosyasi:
+                jsonl_dosyasi.write(self.belgeler())
+            cikti, hatalar = StringIO(), StringIO()
+            call_command('import_data', dosya, '--dry-run', stdout=cikti, stderr=hatalar)
+
+        self.assertIn("[DRY RUN] Doğrulandı: 1 satış, 1 ürün satırı, 1 sipariş", cikti.getvalue())
+        self.assertIn("Satır 2: Geçersiz JSON", hatalar.getvalue())
+        self.assertFalse(Satis.objects.exists())
+        self.assertFalse(Siparis.objects.exists())
+        self.assertEqual(Urun.objects.get(pk=self.urun.pk).stok_adedi, 20)
+        self.assertEqual(finans_ozetleri(), {})
+
+
+@override_settings(SORGU_OLCUMU={}) # test ayarlarında örnekleme kapalı; varsayılan (1.0) kullanılır
+class SorguOlcumuTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'sifre'))
+
+    def test_parmak_izi_sabitleri_ve_in_listelerini_yok_sayar(self):
+        bir, _ = parmak_izi('SELECT * FROM "urun_urun" WHERE "id" IN (%s, %s) AND "ad" = \'a\' LIMIT 21')
+        iki, kalip = parmak_izi('SELECT * FROM "urun_urun" WHERE "id" IN (%s, %s, %s) AND "ad" = \'b\' LIMIT 5')
+        self.assertEqual(bir, iki)
+        self.assertIn('IN (...)', kalip)
+        self.assertNotEqual(bir, parmak_izi('SELECT * FROM "musteri_musteri" WHERE "id" = %s')[0])
+
+    def test_server_timing_basligi_ve_log_kaydi(self):
+        with self.assertLogs('optik.sorgular', 'INFO') as loglar:
+            response = self.client.get('/admin/satis/satis/')
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ sorgu", uygulama;dur=[\d.]+$')
+        kayit = json.loads(loglar.records[-1].getMessage())
+        self.assertEqual(kayit['gorunum'], 'admin:satis_satis_changelist')
+        self.assertGreater(kayit['sorgu_sayisi'], 0)
+        self.assertFalse(kayit['butce_asildi'])
+
+    @override_settings(SORGU_OLCUMU={'GORUNUM_BUTCELERI': {'admin:satis_satis_changelist': 1}, 'TEKRAR_ESIGI': 1})
+    def test_butce_asilinca_uyari_yazar(self):
+        with self.assertLogs('optik.sorgular', 'WARNING') as loglar:
+            self.client.get('/admin/satis/satis/')
+        kayit = json.loads(loglar.records[-1].getMessage())
+        self.assertTrue(kayit['butce_asildi'])
+        self.assertEqual(kayit['butce'], 1)
+        self.assertTrue(kayit['tekrarlar'])
+
+    @override_settings(SORGU_OLCUMU={'ORNEKLEME_ORANI': 0})
+    def test_orneklenmeyen_istek_olculmez(self):
+        response = self.client.get('/admin/satis/satis/')
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'admin-sorgu-sayisi'}},
+    SORGU_OLCUMU={'ORNEKLEME_ORANI': 0},
+)
+class DashboardVeresiyeTests(TestCase):
+    SORGU_SAYISI = 9 # alacaklar satış ve sipariş için birer aggregate; StokAyarlari kaydı yok
+
+    def setUp(self):
+        cache.clear()
+        self.urun = Urun.objects.create(ad="Çerçeve", satis_fiyati=Decimal('100.00'), stok_adedi=1000)
+
+    def belgeler_ekle(self):
+        # Fazla ödenmiş, tamamı ödenmiş ve kısmen ödenmiş birer satış ve sipariş
+        for odenen in ('150.00', '100.00', '30.00'):
+            satis = Satis.objects.create()
+            SatisUrun.objects.create(satis=satis, urun=self.urun, adet=1)
+            SatisOdeme.objects.create(satis=satis, miktar=Decimal(odenen))
+        for odenen in ('250.00', '200.00', '50.00'):
+            siparis = Siparis.objects.create(toplam_tutar=Decimal('200.00'))
+            Odeme.objects.create(siparis=siparis, miktar=Decimal(odenen))
+
+    def test_sadece_pozitif_bakiyeler_toplanir(self):
+        self.belgeler_ekle()
+        with self.assertNumQueries(self.SORGU_SAYISI):
+            context = dashboard_context(timezone.now())
+        self.assertEqual(context['toplam_veresiye_alinacak_data'], {'siparis_veresiye': 150.0, 'satis_veresiye': 70.0})
+
+        # Kayıt sayısı arttığında sorgu sayısı değişmez
+        self.belgeler_ekle()
+        cache.clear()
+        with self.assertNumQueries(self.SORGU_SAYISI):
+            context = dashboard_context(timezone.now())
+        self.assertEqual(context['toplam_veresiye_alinacak_data'], {'siparis_veresiye': 300.0, 'satis_veresiye': 140.0})
+
+
+class DashboardGrafikVerisiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'sifre')
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            Gider.objects.create(miktar=Decimal('75.00'))
+
+    def url(self, grafik='gider', zaman_dilimi='haftalik'):
+        return reverse('dashboard_grafik_verisi', args=[grafik, zaman_dilimi])
+
+    def test_super_kullanici_seriyi_alir(self):
+        response = self.client.get(self.url())
+        self.assertEqual(response.status_code, 200)
+        veri = response.json()
+        self.assertEqual(veri['title'], "Haftalık Giderler")
+        self.assertEqual(veri['labels'], ['Pzt', 'Sal', 'Çar', 'Per', 'Cum', 'Cmt', 'Paz'])
+        beklenen = [0.0] * 7
+        beklenen[timezone.localdate().weekday()] = 75.0
+        self.assertEqual(veri['values'], beklenen)
+
+        veri = self.client.get(self.url('net_kazanc', 'tumzamanlar')).json()
+        self.assertEqual((veri['labels'], veri['values']), ([timezone.localdate().year], [-75.0]))
+
+    def test_yetki_ve_bilinmeyen_parametreler(self):
+        self.client.force_login(User.objects.create_user('personel', is_staff=True))
+        self.assertEqual(self.client.get(self.url()).status_code, 403)
+
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url()).status_code, 302)
+
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(self.url('ciro', 'haftalik')).status_code, 404)
+        self.assertEqual(self.client.get(self.url('gider', 'gunluk')).status_code, 404)
+
+    def test_etag_degismediyse_304_doner(self):
+        response = self.client.get(self.url())
+        self.assertEqual(response['Cache-Control'], 'private, max-age=60')
+        etag = response['ETag']
+
+        response = self.client.get(self.url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Cache-Control'], 'private, max-age=60')
+
+        # Veri değişince eski ETag geçersizleşir
+        with self.captureOnCommitCallbacks(execute=True):
+            Gider.objects.create(miktar=Decimal('25.00'))
+        response = self.client.get(self.url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(sum(response.json()['values']), 100.0)
+
+
+class AdminSorguSayisiTests(TestCase):
+    """
+    Kayıtlı her admin sayfası için sorgu sayısı üst sınırı. Sayfalar önbellek boşken ölçülür.
+    Veri 10 katına çıktığında sorgu sayısı değişmemeli; satır başına sorgu (N+1) bu testi bozar.
+    Yeni kayıtlı admin sayfaları otomatik olarak kapsanır; varsayılanı aşan sınırlar SINIRLAR'da tanımlanır.
+    """
+    TEMEL_ADET = 2 # 10 katındaki satırlar (ürün ve stok hareketleri dahil) tek changelist sayfasına sığmalı
+    VARSAYILAN_SINIR = 12
+    SINIRLAR = {
+        'admin:index': 16,
+        'admin:auth_user_change': 14,
+        'admin:satis_satis_change': 15,
+        'admin:giderler_gider_changelist': 15, # kullanıcı filtresi önbelleğinin sürüm sorgusu dahil
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'sifre')
+        self.client.force_login(self.user)
+        StokAyarlari.objects.create()
+        self.sira = 0
+
+    def veri_ekle(self, adet):
+        # Her modelden 'adet' kayıt; ilişkili satır sayıları (satış başına 2 ürün vb.) sabit
+        kategori = Kategori.objects.create(ad=f"Kategori {self.sira}")
+        gider_kategorisi = GiderKategorisi.objects.create(ad=f"Gider Kategorisi {self.sira}")
+        for _ in range(adet):
+            self.sira += 1
+            musteri = Musteri.objects.create(ad=f"Ad {self.sira}", soyad="Soyad", telefon=f"555{self.sira:07d}")
+            urunler = [
+                Urun.objects.create(ad=f"Ürün {self.sira}-{i}", kategori=kategori, marka="Marka", model_kodu=f"M{self.sira}-{i}",
+                                    satis_fiyati=Decimal('100.00'), stok_adedi=15)
+                for i in range(2)
+            ]
+            satis = Satis.objects.create(musteri=musteri)
+            for urun in urunler:
+                SatisUrun.objects.create(satis=satis, urun=urun, adet=1)
+            SatisOdeme.objects.create(satis=satis, miktar=Decimal('50.00'))
+            siparis = Siparis.objects.create(musteri=musteri, toplam_tutar=Decimal('300.00'), durum='Teslim Edildi')
+            Odeme.objects.create(siparis=siparis, miktar=Decimal('100.00'))
+            kullanici = User.objects.create_user(f"kullanici{self.sira}", is_staff=True)
+            gider = Gider.objects.create(miktar=Decimal('25.00'), kategori=gider_kategorisi)
+            gider.harcanan_kullanicilar.add(self.user, kullanici)
+
+    def sayfalar(self):
+        yield 'admin:index', reverse('admin:index')
+        istek = RequestFactory().get('/')
+        istek.user = self.user
+        for model, model_admin in admin.site._registry.items():
+            opts = model._meta
+            yield f'admin:{opts.app_label}_{opts.model_name}_changelist', reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+            nesne = model_admin.get_queryset(istek).order_by('pk').first()
+            if nesne is not None:
+                yield f'admin:{opts.app_label}_{opts.model_name}_change', reverse(f'admin:{opts.app_label}_{opts.model_name}_change', args=[nesne.pk])
+
+    def sorgu_sayilari(self):
+        sayilar = {}
+        for ad, url in self.sayfalar():
+            # Süreç içi ContentType önbelleği de boşaltılır; aksi halde ilk ölçüm fazladan sorgu sayar
+            cache.clear()
+            ContentType.objects.clear_cache()
+            with CaptureQueriesContext(connection) as sorgular:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            sayilar[ad] = len(sorgular)
+        return sayilar
+
+    def test_sorgu_sayilari_sinirin_altinda_ve_veri_boyutundan_bagimsiz(self):
+        self.veri_ekle(self.TEMEL_ADET)
+        once = self.sorgu_sayilari()
+        self.veri_ekle(self.TEMEL_ADET * 9)
+        sonra = self.sorgu_sayilari()
+
+        for ad, sayi in once.items():
+            with self.subTest(sayfa=ad):
+                self.assertLessEqual(sayi, self.SINIRLAR.get(ad, self.VARSAYILAN_SINIR))
+                self.assertEqual(sonra[ad], sayi, f"{ad}: {self.TEMEL_ADET * 10} kayıtta {sonra[ad]} sorgu (önce {sayi})")
+
+
+class SentetikVeriTests(TestCase):
+    def ozetler(self):
+        return {
+            ozet.gun: (ozet.satis_geliri, ozet.siparis_odeme_geliri, ozet.gider_toplami)
+            for ozet in DailyFinanceSnapshot.objects.all()
+            if ozet.satis_geliri or ozet.siparis_odeme_geliri or ozet.gider_toplami
+        }
+
+    def test_uretilen_veri_tutarli(self):
+        uretici = SentetikVeriUretici(satis=60, siparis=40, yil=1, kullanici=3, parca_boyutu=25).calistir()
+        self.assertEqual(Satis.objects.count(), 60)
+        self.assertEqual(uretici.sayaclar['urun'], Urun.objects.count())
+        self.assertEqual(set(Siparis.objects.values_list('durum', flat=True)), {durum for durum, _ in Siparis.SIPARIS_DURUM_SECENEKLERI})
+        self.assertTrue(Gider.harcanan_kullanicilar.through.objects.exists())
+
+        # Artımlı yazılan günlük özetler sıfırdan hesaplananla aynı olmalı
+        artimli = self.ozetler()
+        snapshotlari_yeniden_olustur()
+        self.assertEqual(artimli, self.ozetler())
+
+
+class YukTestiTests(TransactionTestCase):
+    def test_kisa_yuk_testi_rapor_uretir(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("Bellek içi SQLite test veritabanı thread'ler arasında paylaşılamaz.")
+        kullanici = User.objects.create_superuser('admin', 'admin@example.com', 'sifre')
+        Urun.objects.create(ad="Çerçeve", satis_fiyati=Decimal('100.00'), stok_adedi=1000)
+        Satis.objects.create()
+
+        rapor = YukTesti(kullanici, kasiyer=2, yonetici=1, sure=1, tohum=1).calistir().rapor()
+        self.assertGreater(rapor['toplam']['istek'], 0)
+        self.assertLessEqual(rapor['toplam']['p50_ms'], rapor['toplam']['p99_ms'])
+        for ozet in rapor['is_yukleri'].values():
+            # Eşzamanlılıktan kaynaklanan kilit hataları dışında hata olmamalı
+            self.assertEqual(set(ozet['hatalar']) - {'kilit'}, set())
+
+
+class SqliteAyarlariTests(TransactionTestCase):
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("Yalnızca SQLite için.")
+
+    def test_pragmalar_yeni_baglantida_uygulanir(self):
+        baglanti = connection.copy()
+        try:
+            with baglanti.cursor() as cursor:
+                cursor.execute('PRAGMA busy_timeout')
+                self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMALARI['busy_timeout'])
+                cursor.execute('PRAGMA synchronous')
+                self.assertEqual(cursor.fetchone()[0], 1) # NORMAL
+        finally:
+            baglanti.close()
+
+    def test_atomic_blok_yazma_kilidini_baslangicta_alir(self):
+        if connection.is_in_memory_db():
+            self.skipTest("Bellek içi SQLite test veritabanı başka bağlantıdan açılamaz.")
+        diger = sqlite3.connect(connection.settings_dict['NAME'], timeout=0)
+        try:
+            with transaction.atomic():
+                # Henüz sorgu çalışmadı ama BEGIN IMMEDIATE yazma kilidini almış olmalı
+                with self.assertRaisesMessage(sqlite3.OperationalError, 'database is locked'):
+                    diger.execute('BEGIN IMMEDIATE')
+            diger.execute('BEGIN IMMEDIATE')
+            diger.rollback()
+        finally:
+            diger.close()
+
+    def test_okuma_istegi_yazma_kilidini_beklemez(self):
+        if connection.is_in_memory_db():
+            self.skipTest("Bellek içi SQLite test veritabanı başka bağlantıdan açılamaz.")
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'sifre'))
+        urun = Urun.objects.create(ad="Çerçeve", satis_fiyati=Decimal('100.00'))
+        diger = sqlite3.connect(connection.settings_dict['NAME'], timeout=0)
+        try:
+            diger.execute('BEGIN IMMEDIATE')
+            # Değişiklik formu GET'i atomic içinde çalışır; düz BEGIN ile açıldığı için yazarı beklemez
+            response = self.client.get(reverse('admin:urun_urun_change', args=[urun.pk]))
+            self.assertEqual(response.status_code, 200)
+            diger.rollback()
+        finally:
+            diger.close()
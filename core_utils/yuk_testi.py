@@ -0,0 +1,279 @@
+# core_utils/yuk_testi.py
+
+import http.cookiejar
+import json
+import logging
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import defaultdict
+
+from django.db import OperationalError, connection
+from django.test import Client
+from django.urls import reverse
+
+from core_utils.benchmark import yuzdelik
+from satis.models import Satis
+from urun.models import Urun
+
+KILIT_HATASI = 'database is locked'
+
+# İş yükü -> ağırlık; her rol kendi karışımından rastgele seçer
+ROLLER = {
+    'kasiyer': {'satis_olustur': 50, 'odeme_ekle': 15, 'changelist': 35},
+    'yonetici': {'dashboard': 60, 'changelist': 40},
+}
+CHANGELISTLER = (
+    'admin:satis_satis_changelist',
+    'admin:siparis_siparis_changelist',
+    'admin:urun_urun_changelist',
+    'admin:musteri_musteri_changelist',
+    'admin:giderler_gider_changelist',
+)
+
+
+class IstekHatasi(Exception):
+    def __init__(self, durum, govde=''):
+        super().__init__(f"HTTP {durum}")
+        self.durum = durum
+        self.kilit = KILIT_HATASI in govde
+
+
+class WsgiOturumu:
+    """Uygulamayı aynı süreçte, sunucu olmadan çağırır; her thread kendi Client'ını ve DB bağlantısını kullanır."""
+
+    def __init__(self, kullanici):
+        self.client = Client()
+        self.client.force_login(kullanici)
+
+    def istek(self, metod, yol, veri=None, json_govde=None, basliklar=None):
+        ekstra = {f"HTTP_{ad.upper().replace('-', '_')}": deger for ad, deger in (basliklar or {}).items()}
+        if json_govde is not None:
+            response = self.client.post(yol, json.dumps(json_govde), content_type='application/json', **ekstra)
+        elif metod == 'POST':
+            response = self.client.post(yol, veri, **ekstra)
+        else:
+            response = self.client.get(yol, **ekstra)
+        if response.status_code >= 400:
+            raise IstekHatasi(response.status_code, response.content.decode(errors='replace') if not response.streaming else '')
+        return response.status_code
+
+    def kapat(self):
+        connection.close()
+
+
+class HttpOturumu:
+    """Çalışan bir sunucuya (örn. gunicorn/runserver) gerçek HTTP istekleri gönderir; girişi admin login formuyla yapar."""
+
+    def __init__(self, kullanici, sifre, adres):
+        self.adres = adres.rstrip('/')
+        self.cerezler = http.cookiejar.CookieJar()
+        self.acici = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cerezler), _YonlendirmeyiIzleme())
+        giris = reverse('admin:login')
+        self.istek('GET', giris)
+        self.istek('POST', giris, {'username': kullanici.get_username(), 'password': sifre, 'next': reverse('admin:index')})
+        if 'sessionid' not in {cerez.name for cerez in self.cerezler}:
+            raise ValueError("Sunucuya giriş yapılamadı; kullanıcı adı/şifreyi kontrol edin.")
+
+    def _csrf(self):
+        return next((cerez.value for cerez in self.cerezler if cerez.name == 'csrftoken'), '')
+
+    def istek(self, metod, yol, veri=None, json_govde=None, basliklar=None):
+        basliklar = {'Referer': self.adres + yol, **(basliklar or {})}
+        govde = None
+        if json_govde is not None:
+            govde, basliklar['Content-Type'] = json.dumps(json_govde).encode(), 'application/json'
+        elif metod == 'POST':
+            govde = urllib.parse.urlencode(veri or {}, doseq=True).encode()
+        if metod == 'POST':
+            basliklar['X-CSRFToken'] = self._csrf()
+        try:
+            with self.acici.open(urllib.request.Request(self.adres + yol, data=govde, headers=basliklar, method=metod), timeout=60) as yanit:
+                yanit.read()
+                return yanit.status
+        except urllib.error.HTTPError as exc:
+            if exc.code in (301, 302):
+                return exc.code
+            raise IstekHatasi(exc.code, exc.read().decode(errors='replace'))
+
+    def kapat(self):
+        pass
+
+
+class _YonlendirmeyiIzleme(urllib.request.HTTPRedirectHandler):
+    # Başarılı form gönderimleri 302 döner; sonraki sayfayı yüklemek ölçümü bozar
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class YukTesti:
+    """
+    Birden çok giriş yapmış oturumu (kasiyerler ve yöneticiler) eşzamanlı thread'lerde çalıştırır.
+
+    Kasiyerler POS uç noktasından satış oluşturur, satış formundan ödeme ekler ve listeleri açar;
+    yöneticiler dashboard ve listeleri açar. Her iş yükü için süreler, hata ve 'database is locked'
+    sayıları toplanır. adres verilirse istekler o sunucuya HTTP ile, verilmezse WSGI uygulamasına
+    süreç içinde gönderilir.
+    """
+
+    def __init__(self, kullanici, kasiyer=4, yonetici=1, sure=30, bekleme=0.0, adres=None, sifre=None, tohum=None):
+        self.kullanici = kullanici
+        self.roller = ['kasiyer'] * kasiyer + ['yonetici'] * yonetici
+        self.sure = sure
+        self.bekleme = bekleme
+        self.adres = adres
+        self.sifre = sifre
+        self.tohum = tohum
+        self.olcumler = defaultdict(list) # iş yükü -> [(süre_sn, hata_türü veya None)]
+        self.kilit = threading.Lock()
+        self.toplam_sure = 0.0
+        self.acilis_hatasi = None
+
+    def _oturum_ac(self):
+        if self.adres:
+            return HttpOturumu(self.kullanici, self.sifre, self.adres)
+        return WsgiOturumu(self.kullanici)
+
+    def _hazirla(self):
+        self.urun_idleri = list(Urun.objects.filter(stok_adedi__gt=0).values_list('pk', flat=True)[:2000])
+        if not self.urun_idleri:
+            raise ValueError("Stokta ürün yok; önce 'generate_data' ile veri üretin.")
+        self.satislar = list(Satis.objects.order_by('-pk').values_list('pk', 'musteri_id', 'odeme_sekli')[:500])
+
+    # --- İş yükleri ---
+
+    def satis_olustur(self, oturum, rastgele):
+        urunler = rastgele.sample(self.urun_idleri, min(rastgele.randint(1, 3), len(self.urun_idleri)))
+        return oturum.istek('POST', reverse('pos_satis'), json_govde={
+            'urunler': [{'urun_id': urun_id, 'adet': 1} for urun_id in urunler],
+            'odemeler': [{'miktar': '10.00', 'odeme_sekli': 'Nakit'}],
+        }, basliklar={'Idempotency-Key': uuid.uuid4().hex})
+
+    def odeme_ekle(self, oturum, rastgele):
+        if not self.satislar:
+            return self.satis_olustur(oturum, rastgele)
+        satis_id, musteri_id, odeme_sekli = rastgele.choice(self.satislar)
+        # Mevcut satırlara dokunmadan sadece yeni bir ödeme satırı gönderilir (INITIAL_FORMS=0)
+        durum = oturum.istek('POST', reverse('admin:satis_satis_change', args=[satis_id]), {
+            'musteri': musteri_id or '',
+            'odeme_sekli': odeme_sekli,
+            'notlar': '',
+            'satis_urunleri-TOTAL_FORMS': '0',
+            'satis_urunleri-INITIAL_FORMS': '0',
+            'satis_odemeleri-TOTAL_FORMS': '1',
+            'satis_odemeleri-INITIAL_FORMS': '0',
+            'satis_odemeleri-0-miktar': '5.00',
+            'satis_odemeleri-0-odeme_sekli': 'Nakit',
+        })
+        if durum != 302:
+            # Form doğrulama hatasıyla tekrar gösterildi (200); kayıt yapılmadı
+            raise IstekHatasi(durum)
+        return durum
+
+    def changelist(self, oturum, rastgele):
+        return oturum.istek('GET', reverse(rastgele.choice(CHANGELISTLER)))
+
+    def dashboard(self, oturum, rastgele):
+        return oturum.istek('GET', reverse('admin:index'))
+
+    # --- Çalıştırma ---
+
+    def _isci(self, sira, rol, baslangic_engeli, bitis):
+        rastgele = random.Random(None if self.tohum is None else self.tohum + sira)
+        karisim = ROLLER[rol]
+        is_yukleri, agirliklar = list(karisim), list(karisim.values())
+        oturum = None
+        try:
+            try:
+                oturum = self._oturum_ac()
+            except Exception as exc:
+                self.acilis_hatasi = exc
+                baslangic_engeli.abort()
+                return
+            try:
+                baslangic_engeli.wait()
+            except threading.BrokenBarrierError:
+                return
+            while time.monotonic() < bitis[0]:
+                is_yuku = rastgele.choices(is_yukleri, weights=agirliklar)[0]
+                hata = None
+                baslangic = time.perf_counter()
+                try:
+                    getattr(self, is_yuku)(oturum, rastgele)
+                except IstekHatasi as exc:
+                    hata = 'kilit' if exc.kilit else f'http_{exc.durum}'
+                except OperationalError as exc:
+                    hata = 'kilit' if KILIT_HATASI in str(exc) else 'veritabani'
+                except Exception as exc: # pragma: no cover - beklenmeyen hatalar rapora türüyle yazılır
+                    hata = type(exc).__name__
+                gecen = time.perf_counter() - baslangic
+                with self.kilit:
+                    self.olcumler[is_yuku].append((gecen, hata))
+                if self.bekleme:
+                    time.sleep(self.bekleme)
+        finally:
+            if oturum is not None:
+                oturum.kapat()
+            else:
+                connection.close()
+
+    def calistir(self):
+        self._hazirla()
+        # Süreç içi modda 500 yanıtlarının traceback'leri raporu boğmasın; hatalar zaten sayılıyor
+        istek_logu = logging.getLogger('django.request')
+        onceki, istek_logu.disabled = istek_logu.disabled, not self.adres
+        try:
+            self._threadleri_calistir()
+        finally:
+            istek_logu.disabled = onceki
+        return self
+
+    def _threadleri_calistir(self):
+        baslangic_engeli = threading.Barrier(len(self.roller) + 1)
+        bitis = [float('inf')] # oturumlar açıldıktan sonra belirlenir
+        threadler = [
+            threading.Thread(target=self._isci, args=(sira, rol, baslangic_engeli, bitis), daemon=True)
+            for sira, rol in enumerate(self.roller)
+        ]
+        for thread in threadler:
+            thread.start()
+        try:
+            baslangic_engeli.wait()
+        except threading.BrokenBarrierError:
+            for thread in threadler:
+                thread.join()
+            raise ValueError(f"Oturum açılamadı: {self.acilis_hatasi}")
+        baslangic = time.monotonic()
+        bitis[0] = baslangic + self.sure
+        for thread in threadler:
+            thread.join()
+        self.toplam_sure = time.monotonic() - baslangic
+
+    def rapor(self):
+        def ozet(olcumler):
+            sureler = [sure * 1000 for sure, _ in olcumler]
+            hatalar = [hata for _, hata in olcumler if hata]
+            return {
+                'istek': len(olcumler),
+                'istek_sn': round(len(olcumler) / self.toplam_sure, 2) if self.toplam_sure else 0.0,
+                'p50_ms': round(yuzdelik(sureler, 0.50), 2) if sureler else None,
+                'p95_ms': round(yuzdelik(sureler, 0.95), 2) if sureler else None,
+                'p99_ms': round(yuzdelik(sureler, 0.99), 2) if sureler else None,
+                'hata_orani': round(len(hatalar) / len(olcumler), 4) if olcumler else 0.0,
+                'kilit_orani': round(hatalar.count('kilit') / len(olcumler), 4) if olcumler else 0.0,
+                'hatalar': {hata: hatalar.count(hata) for hata in sorted(set(hatalar))},
+            }
+
+        tumu = [olcum for olcumler in self.olcumler.values() for olcum in olcumler]
+        return {
+            'sure_sn': round(self.toplam_sure, 2),
+            'kasiyer': self.roller.count('kasiyer'),
+            'yonetici': self.roller.count('yonetici'),
+            'mod': 'http' if self.adres else 'wsgi',
+            'toplam': ozet(tumu),
+            'is_yukleri': {is_yuku: ozet(olcumler) for is_yuku, olcumler in sorted(self.olcumler.items())},
+        }
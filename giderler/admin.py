@@ -1,8 +1,65 @@
 # giderler/admin.py
 
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from core_utils.cache import surumlu_onbellek, veri_surumu
+from core_utils.export import disa_aktarma_aksiyonu
 from .models import GiderKategorisi, Gider
 
+
+def _kullanici_adi(user):
+    return user.get_full_name() or user.username
+
+
+class HarcananKullaniciFilter(admin.SimpleListFilter):
+    """
+    Sadece en az bir gidere etiketlenmiş kullanıcıları listeler (tüm kullanıcı tablosunu değil).
+    Seçenekler önbellekten okunur; kullanıcı listesini görme yetkisi olmayanlar sadece kendilerini görür.
+    """
+    title = "Harcayan Kullanıcı"
+    parameter_name = 'harcanan_kullanici'
+
+    @staticmethod
+    def secenekler():
+        def hesapla():
+            kullanicilar = (
+                get_user_model().objects.filter(giderler__isnull=False).distinct()
+                .only('id', 'username', 'first_name', 'last_name')
+                .order_by('username')
+            )
+            return [(str(user.pk), _kullanici_adi(user)) for user in kullanicilar]
+
+        User = get_user_model()
+        return surumlu_onbellek(
+            f"gider_kullanici_secenekleri:u{veri_surumu(User._meta.label_lower)}",
+            hesapla,
+            kapsam=Gider._meta.label_lower,
+        )
+
+    @staticmethod
+    def tum_kullanicilari_gorebilir(request):
+        User = get_user_model()
+        return request.user.has_perm(f'{User._meta.app_label}.view_{User._meta.model_name}')
+
+    def lookups(self, request, model_admin):
+        secenekler = self.secenekler()
+        if self.tum_kullanicilari_gorebilir(request):
+            return secenekler
+        return [secenek for secenek in secenekler if secenek[0] == str(request.user.pk)]
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        # URL'den gelen değer de seçeneklerle aynı kapsamda olmalı; aksi halde admin
+        # geçersiz filtre parametresi gibi listeyi ?e=1 ile filtresiz açar
+        if not self.value().isdigit() or not (
+            self.value() == str(request.user.pk) or self.tum_kullanicilari_gorebilir(request)
+        ):
+            raise IncorrectLookupParameters(f"Geçersiz kullanıcı: {self.value()}")
+        return queryset.filter(harcanan_kullanicilar__id=self.value())
+
 @admin.register(GiderKategorisi)
 class GiderKategorisiAdmin(admin.ModelAdmin):
     list_display = ('ad', 'aciklama')
@@ -18,11 +75,12 @@ class GiderAdmin(admin.ModelAdmin):
         'kullanicilar_display', # Hangi kullanıcılar için harcandığını gösterecek
         'notlar'
     )
-    list_filter = ('kategori', 'gider_tarihi', 'harcanan_kullanicilar')
+    list_filter = ('kategori', 'gider_tarihi', HarcananKullaniciFilter)
     search_fields = ('notlar', 'kategori__ad')
     date_hierarchy = 'gider_tarihi'
     ordering = ('-gider_tarihi',)
     filter_horizontal = ('harcanan_kullanicilar',) # ManyToMany alanı için güzel bir arayüz sağlar
+    actions = [disa_aktarma_aksiyonu('gider', 'giderler')]
 
     fieldsets = (
         (None, {
@@ -31,7 +89,14 @@ class GiderAdmin(admin.ModelAdmin):
     )
     readonly_fields = ('gider_tarihi',)
 
+    def get_queryset(self, request):
+        # Satır başına kategori ve kullanıcı sorgusu çalışmaması için
+        kullanicilar = get_user_model().objects.only('id', 'username', 'first_name', 'last_name')
+        return super().get_queryset(request).select_related('kategori').prefetch_related(
+            Prefetch('harcanan_kullanicilar', queryset=kullanicilar)
+        )
+
     def kullanicilar_display(self, obj):
-        # İlgili kullanıcıları virgülle ayrılmış bir string olarak göster
-        return ", ".join([user.get_full_name() or user.username for user in obj.harcanan_kullanicilar.all()])
+        # İlgili kullanıcıları virgülle ayrılmış bir string olarak göster (prefetch edilmiş listeden)
+        return ", ".join([_kullanici_adi(user) for user in obj.harcanan_kullanicilar.all()])
     kullanicilar_display.short_description = "İlgili Kullanıcılar"
\ No newline at end of file
@@ -1,3 +1,64 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+
+from .models import Gider
+
+
+class HarcananKullaniciFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'sifre')
+        self.ayse = User.objects.create_user('ayse', first_name="Ayşe", last_name="Kaya", is_staff=True)
+        self.mehmet = User.objects.create_user('mehmet', is_staff=True)
+        User.objects.create_user('etiketsiz', is_staff=True)
+        self.gider = Gider.objects.create(miktar=Decimal('50.00'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.gider.harcanan_kullanicilar.add(self.ayse, self.mehmet)
+
+    def secenekler(self, kullanici, **parametreler):
+        self.client.force_login(kullanici)
+        response = self.client.get(reverse('admin:giderler_gider_changelist'), parametreler)
+        self.assertEqual(response.status_code, 200)
+        filtre = next(
+            spec for spec in response.context['cl'].filter_specs
+            if getattr(spec, 'parameter_name', None) == 'harcanan_kullanici'
+        )
+        return response, list(filtre.lookup_choices)
+
+    def test_sadece_gidere_etiketlenen_kullanicilar_listelenir(self):
+        _, secenekler = self.secenekler(self.admin)
+        self.assertEqual(secenekler, [(str(self.ayse.pk), "Ayşe Kaya"), (str(self.mehmet.pk), "mehmet")])
+
+    def test_kullanici_gorme_yetkisi_olmayan_sadece_kendini_gorur(self):
+        self.mehmet.user_permissions.add(Permission.objects.get(codename='view_gider'))
+        _, secenekler = self.secenekler(self.mehmet)
+        self.assertEqual(secenekler, [(str(self.mehmet.pk), "mehmet")])
+
+    def test_yeni_etiket_secenekleri_yeniler(self):
+        self.secenekler(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            Gider.objects.create(miktar=Decimal('10.00')).harcanan_kullanicilar.add(self.admin)
+        _, secenekler = self.secenekler(self.admin)
+        self.assertIn(str(self.admin.pk), [pk for pk, _ in secenekler])
+
+    def test_secilen_kullanicinin_giderleri_filtrelenir(self):
+        Gider.objects.create(miktar=Decimal('20.00')).harcanan_kullanicilar.add(self.ayse)
+        response, _ = self.secenekler(self.admin, harcanan_kullanici=self.mehmet.pk)
+        self.assertEqual([gider.pk for gider in response.context['cl'].result_list], [self.gider.pk])
+
+    def test_yetkisiz_kullanici_url_ile_baskasinin_giderlerini_listeleyemez(self):
+        self.mehmet.user_permissions.add(Permission.objects.get(codename='view_gider'))
+        self.client.force_login(self.mehmet)
+        url = reverse('admin:giderler_gider_changelist')
+        for deger in (self.ayse.pk, 'abc'):
+            response = self.client.get(url, {'harcanan_kullanici': deger})
+            self.assertEqual(response.status_code, 302)
+            self.assertTrue(response['Location'].endswith('?e=1'))
 
-# Create your tests here.
+        Gider.objects.create(miktar=Decimal('20.00')).harcanan_kullanicilar.add(self.ayse)
+        response = self.client.get(url, {'harcanan_kullanici': self.mehmet.pk})
+        self.assertEqual([gider.pk for gider in response.context['cl'].result_list], [self.gider.pk])
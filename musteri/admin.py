@@ -1,12 +1,14 @@
 # musteri/admin.py
 
 from django.contrib import admin
+from core_utils.admin import FtsAramaMixin, OnekAramaMixin
 from .models import Musteri
 
 @admin.register(Musteri)
-class MusteriAdmin(admin.ModelAdmin):
+class MusteriAdmin(OnekAramaMixin, FtsAramaMixin, admin.ModelAdmin):
     list_display = ('ad', 'soyad', 'telefon', 'eposta', 'kayit_tarihi')
     search_fields = ('ad', 'soyad', 'telefon', 'eposta')
+    onek_arama_alanlari = ('ad', 'soyad', 'telefon') # Satış/sipariş formlarındaki otomatik tamamlama
     list_filter = ('kayit_tarihi',)
     date_hierarchy = 'kayit_tarihi'
     ordering = ('-kayit_tarihi',)
\ No newline at end of file
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:27
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musteri', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='musteri',
+            index=models.Index(django.db.models.functions.comparison.Collate('ad', 'NOCASE'), name='musteri_ad_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='musteri',
+            index=models.Index(django.db.models.functions.comparison.Collate('soyad', 'NOCASE'), name='musteri_soyad_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='musteri',
+            index=models.Index(django.db.models.functions.comparison.Collate('telefon', 'NOCASE'), name='musteri_telefon_nocase_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 # musteri/models.py
 
 from django.db import models
+from django.db.models.functions import Collate
 
 class Musteri(models.Model):
     ad = models.CharField(max_length=100, verbose_name="Adı")
@@ -16,6 +17,12 @@ class Musteri(models.Model):
         verbose_name = "Müşteri"
         verbose_name_plural = "Müşteriler"
         ordering = ['-kayit_tarihi'] # En yeni müşteriyi en üstte göster
+        indexes = [
+            # Otomatik tamamlamadaki büyük/küçük harf duyarsız önek aramaları (LIKE 'terim%') için
+            models.Index(Collate('ad', 'NOCASE'), name='musteri_ad_nocase_idx'),
+            models.Index(Collate('soyad', 'NOCASE'), name='musteri_soyad_nocase_idx'),
+            models.Index(Collate('telefon', 'NOCASE'), name='musteri_telefon_nocase_idx'),
+        ]
 
     def __str__(self):
         return f"{self.ad} {self.soyad}"
\ No newline at end of file
@@ -2,12 +2,37 @@
 
 from django.contrib import admin
 from .models import Satis, SatisUrun, SatisOdeme
+from urun.models import HAREKET_IADE, HAREKET_SATIS
+from urun.stok import farklari_birlestir, stok_farklarini_uygula
+from core_utils.export import disa_aktarma_aksiyonu
 from django.db.models import Sum, F
+from decimal import Decimal
+
+
+class BakiyeDurumuFilter(admin.SimpleListFilter):
+    # Annotate edilmiş kalan_tutar üzerinden SQL'de filtreler
+    title = "Bakiye Durumu"
+    parameter_name = 'bakiye'
+
+    def lookups(self, request, model_admin):
+        return (
+            ('borclu', "Alınacak Tutarı Olan"),
+            ('odendi', "Tamamı Ödenmiş"),
+        )
+
+    def queryset(self, request, queryset):
+        if self.value() == 'borclu':
+            return queryset.filter(kalan_tutar__gt=0)
+        if self.value() == 'odendi':
+            return queryset.filter(kalan_tutar__lte=0)
+        return queryset
+
 
 class SatisUrunInline(admin.TabularInline):
     model = SatisUrun
     extra = 1
     fields = ('urun', 'adet', 'birim_fiyat', 'toplam_urun_fiyati')
+    autocomplete_fields = ('urun',) # Her satırda tüm ürünleri <select> olarak basmamak için
     readonly_fields = ('birim_fiyat', 'toplam_urun_fiyati',)
     can_delete = True
     verbose_name_plural = "Ürünler" # Burası güncellendi
@@ -31,11 +56,13 @@ class SatisAdmin(admin.ModelAdmin):
         'alinacak_tutar_display',
         'odeme_sekli'
     )
-    list_filter = ('satis_tarihi', 'odeme_sekli')
+    list_filter = ('satis_tarihi', 'odeme_sekli', BakiyeDurumuFilter)
     search_fields = ('musteri__ad', 'musteri__soyad', 'notlar')
     date_hierarchy = 'satis_tarihi'
     ordering = ('-satis_tarihi',)
     inlines = [SatisUrunInline, SatisOdemeInline]
+    actions = [disa_aktarma_aksiyonu('satis', 'satislar')]
+    autocomplete_fields = ('musteri',)
 
     fieldsets = (
         ("Satış Bilgileri", {
@@ -57,23 +84,55 @@ class SatisAdmin(admin.ModelAdmin):
         'alinacak_tutar_display'
     )
 
+    def get_queryset(self, request):
+        # Tutarlar satır başına ayrı sorgu yerine listeyle birlikte tek sorguda hesaplanır
+        return super().get_queryset(request).select_related('musteri').tutarlari_ekle()
+
+    def save_formset(self, request, form, formset, change):
+        if formset.model is not SatisUrun:
+            return super().save_formset(request, form, formset, change)
+
+        # Satışın tüm ürün satırlarının stok farkları toplanır ve ürün başına
+        # tek bir UPDATE ile uygulanır. Silinen satırlar diğer silme yolları gibi
+        # deftere iade, kaydedilenler satış olarak yazılır.
+        instances = formset.save(commit=False)
+        iade_farklari, satis_farklari = [], []
+        for obj in formset.deleted_objects:
+            iade_farklari.append(obj.stok_farklari(silindi=True))
+            obj.delete(stok_guncelle=False)
+        for instance in instances:
+            satis_farklari.append(instance.stok_farklari())
+            instance.save(stok_guncelle=False)
+        formset.save_m2m()
+        for farklar, neden in ((iade_farklari, HAREKET_IADE), (satis_farklari, HAREKET_SATIS)):
+            satis_farki = farklari_birlestir(*farklar)
+            stok_farklarini_uygula(satis_farki, neden, {form.instance.pk: satis_farki})
+
+    def _tutar(self, obj, annotation, property_adi):
+        if not obj.pk:
+            return Decimal('0.00')
+        if hasattr(obj, annotation):
+            return getattr(obj, annotation)
+        return getattr(obj, property_adi)
+
     def musteri_adi_soyadi(self, obj):
         if obj.musteri:
             return f"{obj.musteri.ad} {obj.musteri.soyad}"
         return "Belirtilmemiş"
     musteri_adi_soyadi.short_description = "Müşteri"
+    musteri_adi_soyadi.admin_order_field = 'musteri__ad'
 
     def hesaplanan_toplam_tutar_display(self, obj):
-        return obj.hesaplanan_toplam_tutar
+        return self._tutar(obj, 'hesaplanan_toplam', 'hesaplanan_toplam_tutar')
     hesaplanan_toplam_tutar_display.short_description = "Toplam Tutar"
-    hesaplanan_toplam_tutar_display.admin_order_field = 'hesaplanan_toplam_tutar'
+    hesaplanan_toplam_tutar_display.admin_order_field = 'hesaplanan_toplam'
 
     def odenen_toplam_tutar_display(self, obj):
-        return obj.odenen_toplam_tutar
+        return self._tutar(obj, 'odenen_toplam', 'odenen_toplam_tutar')
     odenen_toplam_tutar_display.short_description = "Ödenen Toplam Tutar"
-    odenen_toplam_tutar_display.admin_order_field = 'odenen_toplam_tutar'
+    odenen_toplam_tutar_display.admin_order_field = 'odenen_toplam'
 
     def alinacak_tutar_display(self, obj):
-        return obj.alinacak_tutar
+        return self._tutar(obj, 'kalan_tutar', 'alinacak_tutar')
     alinacak_tutar_display.short_description = "Alınacak Tutar"
-    alinacak_tutar_display.admin_order_field = 'alinacak_tutar'
\ No newline at end of file
+    alinacak_tutar_display.admin_order_field = 'kalan_tutar'
\ No newline at end of file
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:39
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('satis', '0003_alter_satis_toplam_tutar_satisodeme'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PosIslemi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anahtar', models.CharField(max_length=100, verbose_name='Tekrar Anahtarı')),
+                ('istek_ozeti', models.CharField(max_length=64, verbose_name='İstek Özeti')),
+                ('yanit', models.JSONField(verbose_name='Yanıt')),
+                ('olusturma_tarihi', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturma Tarihi')),
+                ('kullanici', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Kullanıcı')),
+                ('satis', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='satis.satis', verbose_name='Satış')),
+            ],
+            options={
+                'verbose_name': 'POS İşlemi',
+                'verbose_name_plural': 'POS İşlemleri',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='posislemi',
+            constraint=models.UniqueConstraint(fields=('kullanici', 'anahtar'), name='pos_islemi_kullanici_anahtar_benzersiz'),
+        ),
+    ]
@@ -1,10 +1,85 @@
 # satis/models.py
 
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
 from musteri.models import Musteri
-from urun.models import Urun
+from urun.models import HAREKET_IADE, HAREKET_SATIS, Urun
+from urun.stok import farklari_birlestir, stok_farklarini_uygula
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from decimal import Decimal # Bu satırı ekleyin!
 
+TUTAR_ALANI = DecimalField(max_digits=12, decimal_places=2)
+
+
+def _toplam_subquery(queryset, ifade):
+    # İlgili satırların toplamını ana sorguya tek bir alt sorgu olarak ekler; satır yoksa 0 döner
+    toplam = queryset.order_by().values('satis').annotate(toplam=Sum(ifade)).values('toplam')
+    return Coalesce(Subquery(toplam, output_field=TUTAR_ALANI), Value(Decimal('0.00')), output_field=TUTAR_ALANI)
+
+
+class SatisQuerySet(models.QuerySet):
+    def tutarlari_ekle(self):
+        """
+        hesaplanan_toplam, odenen_toplam ve kalan_tutar alanlarını veritabanında hesaplayarak ekler.
+        Satır başına ayrı aggregate sorgusu çalıştırmak yerine liste tek sorguda gelir.
+        """
+        return self.annotate(
+            hesaplanan_toplam=_toplam_subquery(
+                SatisUrun.objects.filter(satis=OuterRef('pk')), F('adet') * F('birim_fiyat')
+            ),
+            odenen_toplam=_toplam_subquery(
+                SatisOdeme.objects.filter(satis=OuterRef('pk')), F('miktar')
+            ),
+        ).annotate(
+            kalan_tutar=F('hesaplanan_toplam') - F('odenen_toplam'),
+        )
+
+    def delete(self):
+        # CASCADE ile silinen satış ürünlerinin stokları toplu olarak iade edilir
+        with transaction.atomic():
+            satis_farklari = SatisUrun.objects.filter(satis__in=self.values('pk')).stok_iade_farklari(satis_bazinda=True)
+            sonuc = super().delete()
+            stok_farklarini_uygula(farklari_birlestir(*satis_farklari.values()), HAREKET_IADE, satis_farklari)
+        return sonuc
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class SatisUrunQuerySet(models.QuerySet):
+    def stok_iade_farklari(self, satis_bazinda=False):
+        """
+        Bu satırlar silindiğinde stoğa iade edilecek adetleri ürün başına tek bir
+        GROUP BY sorgusuyla hesaplar. {urun_id: -adet} döndürür.
+        satis_bazinda=True ise stok defteri için {satis_id: {urun_id: -adet}} döndürür.
+        """
+        if satis_bazinda:
+            satis_farklari = {}
+            satirlar = self.filter(urun__isnull=False).order_by().values_list('satis', 'urun', 'adet')
+            for satis_id, urun_id, adet in satirlar:
+                if adet:
+                    satis_farki = satis_farklari.setdefault(satis_id, {})
+                    satis_farki[urun_id] = satis_farki.get(urun_id, 0) - adet
+            return satis_farklari
+        toplamlar = (
+            self.filter(urun__isnull=False)
+            .order_by().values('urun')
+            .annotate(toplam=Sum('adet'))
+            .values_list('urun', 'toplam')
+        )
+        return {urun_id: -toplam for urun_id, toplam in toplamlar if toplam}
+
+    def delete(self):
+        # Toplu silmede (örn. queryset.delete()) satır başına delete() çağrılmadan stok iade edilir
+        with transaction.atomic():
+            satis_farklari = self.stok_iade_farklari(satis_bazinda=True)
+            sonuc = super().delete()
+            stok_farklarini_uygula(farklari_birlestir(*satis_farklari.values()), HAREKET_IADE, satis_farklari)
+        return sonuc
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Satis(models.Model):
     musteri = models.ForeignKey(
         Musteri,
@@ -28,6 +103,8 @@ class Satis(models.Model):
     )
     notlar = models.TextField(blank=True, null=True, verbose_name="Notlar")
 
+    objects = SatisQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Satış"
         verbose_name_plural = "Satışlar"
@@ -51,6 +128,15 @@ class Satis(models.Model):
     def alinacak_tutar(self):
         return self.hesaplanan_toplam_tutar - self.odenen_toplam_tutar
 
+    def delete(self, *args, **kwargs):
+        # Satış silinince CASCADE ile giden ürün satırlarının stokları iade edilir
+        with transaction.atomic():
+            satis_id = self.pk
+            farklar = self.satis_urunleri.all().stok_iade_farklari()
+            sonuc = super().delete(*args, **kwargs)
+            stok_farklarini_uygula(farklar, HAREKET_IADE, {satis_id: farklar})
+        return sonuc
+
 class SatisUrun(models.Model):
     satis = models.ForeignKey(
         Satis,
@@ -68,6 +154,8 @@ class SatisUrun(models.Model):
     adet = models.PositiveIntegerField(default=1, verbose_name="Adet")
     birim_fiyat = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, verbose_name="Birim Fiyat")
 
+    objects = SatisUrunQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Satış Ürünü"
         verbose_name_plural = "Satış Ürünleri"
@@ -80,31 +168,48 @@ class SatisUrun(models.Model):
     def toplam_urun_fiyati(self):
         return self.adet * self.birim_fiyat
 
-    def save(self, *args, **kwargs):
-        if self.pk:
-            original_satis_urun = SatisUrun.objects.get(pk=self.pk)
-            original_adet = original_satis_urun.adet
-            adet_farki = self.adet - original_adet
-
-            if self.urun:
-                if self.urun.stok_adedi > 0 or adet_farki > 0:
-                    self.urun.stok_adedi -= adet_farki
-                    self.urun.save()
-        else:
-            if self.urun and self.urun.stok_adedi > 0:
-                self.urun.stok_adedi -= self.adet
-                self.urun.save()
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Veritabanından okunan ürün ve adet saklanır; kaydederken stok farkı
+        # kaydı tekrar sorgulamadan bulunur.
+        instance = super().from_db(db, field_names, values)
+        instance._stok_onceki = (instance.__dict__.get('urun_id'), instance.__dict__.get('adet'))
+        return instance
 
+    def stok_farklari(self, silindi=False):
+        """
+        Bu satırın kaydedilmesi (veya silinmesi) için gereken stok farklarını döndürür.
+        {urun_id: adet} — pozitif adet stoktan düşülür, negatif adet stoğa iade edilir.
+        """
+        onceki_urun_id, onceki_adet = getattr(self, '_stok_onceki', (None, 0))
+        farklar = {}
+        if onceki_urun_id is not None:
+            farklar[onceki_urun_id] = -(onceki_adet or 0)
+        if not silindi and self.urun_id is not None:
+            farklar[self.urun_id] = farklar.get(self.urun_id, 0) + self.adet
+        return {urun_id: adet for urun_id, adet in farklar.items() if adet}
+
+    def save(self, *args, stok_guncelle=True, **kwargs):
+        # stok_guncelle=False ile çağıran taraf (örn. admin formset) farkları toplayıp
+        # stok_farklarini_uygula ile tek seferde uygulamaktan sorumludur.
         if self.urun and (self.birim_fiyat == 0.00 or self.birim_fiyat is None):
             self.birim_fiyat = self.urun.satis_fiyati
 
-        super().save(*args, **kwargs)
+        farklar = self.stok_farklari()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if stok_guncelle:
+                stok_farklarini_uygula(farklar, HAREKET_SATIS, {self.satis_id: farklar})
+        self._stok_onceki = (self.urun_id, self.adet)
 
-    def delete(self, *args, **kwargs):
-        if self.urun:
-            self.urun.stok_adedi += self.adet
-            self.urun.save()
-        super().delete(*args, **kwargs)
+    def delete(self, *args, stok_guncelle=True, **kwargs):
+        farklar = self.stok_farklari(silindi=True)
+        with transaction.atomic():
+            satis_id = self.satis_id
+            sonuc = super().delete(*args, **kwargs)
+            if stok_guncelle:
+                stok_farklarini_uygula(farklar, HAREKET_IADE, {satis_id: farklar})
+        return sonuc
 
 
 class SatisOdeme(models.Model):
@@ -135,4 +240,28 @@ class SatisOdeme(models.Model):
         ordering = ['-odeme_tarihi']
 
     def __str__(self):
-        return f"Satış #{self.satis.id} için {self.miktar} TL ödeme ({self.odeme_tarihi.strftime('%Y-%m-%d %H:%M')})"
\ No newline at end of file
+        return f"Satış #{self.satis.id} için {self.miktar} TL ödeme ({self.odeme_tarihi.strftime('%Y-%m-%d %H:%M')})"
+
+
+class PosIslemi(models.Model):
+    """
+    Kasa (POS) uç noktasından gelen her satış isteğinin tekrar anahtarı (Idempotency-Key).
+    Satışla aynı transaction içinde yazılır; aynı anahtarla tekrar gönderilen istek yeni
+    satış oluşturmak yerine saklanan yanıtı alır.
+    """
+    kullanici = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name="Kullanıcı")
+    anahtar = models.CharField(max_length=100, verbose_name="Tekrar Anahtarı")
+    istek_ozeti = models.CharField(max_length=64, verbose_name="İstek Özeti")
+    satis = models.ForeignKey(Satis, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Satış")
+    yanit = models.JSONField(verbose_name="Yanıt")
+    olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
+
+    class Meta:
+        verbose_name = "POS İşlemi"
+        verbose_name_plural = "POS İşlemleri"
+        constraints = [
+            models.UniqueConstraint(fields=['kullanici', 'anahtar'], name='pos_islemi_kullanici_anahtar_benzersiz'),
+        ]
+
+    def __str__(self):
+        return f"{self.anahtar} -> Satış #{self.satis_id}"
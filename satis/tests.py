@@ -1,3 +1,335 @@
-from django.test import TestCase
+import json
+import threading
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from urun.models import HAREKET_IADE, HAREKET_SATIS, StokHareketi, Urun
+from core_utils.models import DailyFinanceSnapshot
+from .models import PosIslemi, Satis, SatisOdeme, SatisUrun
+
+
+class SatisUrunStokTests(TestCase):
+    def setUp(self):
+        self.urun = Urun.objects.create(ad="Çerçeve", satis_fiyati=Decimal('100.00'), stok_adedi=10)
+        self.satis = Satis.objects.create()
+
+    def stok(self):
+        return Urun.objects.values_list('stok_adedi', flat=True).get(pk=self.urun.pk)
+
+    def test_yeni_satir_stoktan_duser_ve_fiyati_doldurur(self):
+        satis_urun = SatisUrun.objects.create(satis=self.satis, urun=self.urun, adet=3)
+        self.assertEqual(self.stok(), 7)
+        self.assertEqual(satis_urun.birim_fiyat, Decimal('100.00'))
+
+    def test_adet_degisikligi_sadece_farki_uygular(self):
+        satis_urun = SatisUrun.objects.create(satis=self.satis, urun=self.urun, adet=3)
+        satis_urun = SatisUrun.objects.get(pk=satis_urun.pk)
+        satis_urun.adet = 5
+        satis_urun.save()
+        self.assertEqual(self.stok(), 5)
+
+        satis_urun.adet = 1
+        satis_urun.save()
+        self.assertEqual(self.stok(), 9)
+
+    def test_adet_degisikligi_kaydi_tekrar_sorgulamaz(self):
+        satis_urun = SatisUrun.objects.create(satis=self.satis, urun=self.urun, adet=3)
+        satis_urun = SatisUrun.objects.select_related('urun', 'satis').get(pk=satis_urun.pk)
+        satis_urun.adet = 4
+        with CaptureQueriesContext(connection) as sorgular:
+            satis_urun.save()
+        sql_listesi = [sorgu['sql'] for sorgu in sorgular]
+        self.assertFalse([sql for sql in sql_listesi if sql.startswith('SELECT') and 'satis_satisurun' in sql])
+        self.assertEqual(len([sql for sql in sql_listesi if sql.startswith('UPDATE "urun_urun"')]), 1)
+        self.assertEqual(self.stok(), 6)
+
+    def test_urun_degisikligi_eski_urune_iade_eder(self):
+        diger = Urun.objects.create(ad="Cam", satis_fiyati=Decimal('50.00'), stok_adedi=4)
+        satis_urun = SatisUrun.objects.create(satis=self.satis, urun=self.urun, adet=2)
+        satis_urun = SatisUrun.objects.get(pk=satis_urun.pk)
+        satis_urun.urun = diger
+        satis_urun.save()
+        self.assertEqual(self.stok(), 10)
+        self.assertEqual(Urun.objects.get(pk=diger.pk).stok_adedi, 2)
+
+    def test_silme_stogu_iade_eder(self):
+        satis_urun = SatisUrun.objects.create(satis=self.satis, urun=self.urun, adet=4)
+        satis_urun.delete()
+        self.assertEqual(self.stok(), 10)
+
+    def test_stokta_olmayan_urunden_dusulmez(self):
+        Urun.objects.filter(pk=self.urun.pk).update(stok_adedi=0)
+        SatisUrun.objects.create(satis=self.satis, urun=self.urun, adet=2)
+        self.assertEqual(self.stok(), 0)
+
+    def test_eski_urun_nesnesi_ile_guncelleme_kaybolmaz(self):
+        # İki kasiyer aynı ürünü bellekteki (artık eski) stok değeriyle satıyor
+        urun_kasa_1 = Urun.objects.get(pk=self.urun.pk)
+        urun_kasa_2 = Urun.objects.get(pk=self.urun.pk)
+        SatisUrun.objects.create(satis=self.satis, urun=urun_kasa_1, adet=2)
+        SatisUrun.objects.create(satis=Satis.objects.create(), urun=urun_kasa_2, adet=3)
+        self.assertEqual(self.stok(), 5)
+
+
+class SatisSilmeStokTests(TestCase):
+    def setUp(self):
+        self.cerceve = Urun.objects.create(ad="Çerçeve", satis_fiyati=Decimal('100.00'), stok_adedi=10)
+        self.cam = Urun.objects.create(ad="Cam", satis_fiyati=Decimal('40.00'), stok_adedi=10)
+        self.satis_1 = Satis.objects.create()
+        self.satis_2 = Satis.objects.create()
+        SatisUrun.objects.create(satis=self.satis_1, urun=self.cerceve, adet=2)
+        SatisUrun.objects.create(satis=self.satis_1, urun=self.cam, adet=1)
+        SatisUrun.objects.create(satis=self.satis_2, urun=self.cerceve, adet=3)
+
+    def stoklar(self):
+        return dict(Urun.objects.values_list('ad', 'stok_adedi'))
+
+    def test_satis_silinince_stok_iade_edilir(self):
+        self.satis_1.delete()
+        self.assertEqual(self.stoklar(), {"Çerçeve": 7, "Cam": 10})
+
+    def test_toplu_satis_silme_stogu_iade_eder(self):
+        Satis.objects.all().delete()
+        self.assertEqual(self.stoklar(), {"Çerçeve": 10, "Cam": 10})
+        self.assertFalse(SatisUrun.objects.exists())
+
+    def test_toplu_satis_urun_silme_stogu_iade_eder(self):
+        SatisUrun.objects.filter(urun=self.cerceve).delete()
+        self.assertEqual(self.stoklar(), {"Çerçeve": 10, "Cam": 9})
+
+    def test_toplu_silme_urun_basina_tek_update_calistirir(self):
+        with CaptureQueriesContext(connection) as sorgular:
+            Satis.objects.all().delete()
+        urun_updateleri = [sorgu['sql'] for sorgu in sorgular if sorgu['sql'].startswith('UPDATE "urun_urun"')]
+        self.assertLessEqual(len(urun_updateleri), 2)
+
+    def test_admin_toplu_silme_aksiyonu_stogu_iade_eder(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'sifre')
+        self.client.force_login(user)
+        response = self.client.post('/admin/satis/satis/', {
+            'action': 'delete_selected',
+            '_selected_action': [self.satis_1.pk, self.satis_2.pk],
+            'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Satis.objects.exists())
+        self.assertEqual(self.stoklar(), {"Çerçeve": 10, "Cam": 10})
+
+
+class SatisAdminStokTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'sifre')
+        self.client.force_login(self.user)
+        self.cerceve = Urun.objects.create(ad="Çerçeve", satis_fiyati=Decimal('100.00'), stok_adedi=10)
+        self.cam = Urun.objects.create(ad="Cam", satis_fiyati=Decimal('40.00'), stok_adedi=10)
+
+    def test_satis_formu_tum_satirlarin_stogunu_dusurur(self):
+        data = {
+            'odeme_sekli': 'Nakit',
+            'notlar': '',
+            'satis_urunleri-TOTAL_FORMS': '2',
+            'satis_urunleri-INITIAL_FORMS': '0',
+            'satis_urunleri-0-urun': str(self.cerceve.pk),
+            'satis_urunleri-0-adet': '2',
+            'satis_urunleri-1-urun': str(self.cam.pk),
+            'satis_urunleri-1-adet': '3',
+            'satis_odemeleri-TOTAL_FORMS': '0',
+            'satis_odemeleri-INITIAL_FORMS': '0',
+        }
+        response = self.client.post('/admin/satis/satis/add/', data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Urun.objects.get(pk=self.cerceve.pk).stok_adedi, 8)
+        self.assertEqual(Urun.objects.get(pk=self.cam.pk).stok_adedi, 7)
+
+    def test_satir_silme_ve_adet_degisikligi_deftere_dogru_nedenle_yazar(self):
+        satis = Satis.objects.create()
+        cerceve_satiri = SatisUrun.objects.create(satis=satis, urun=self.cerceve, adet=2)
+        cam_satiri = SatisUrun.objects.create(satis=satis, urun=self.cam, adet=3)
+        data = {
+            'odeme_sekli': 'Nakit',
+            'notlar': '',
+            'satis_urunleri-TOTAL_FORMS': '2',
+            'satis_urunleri-INITIAL_FORMS': '2',
+            'satis_urunleri-0-id': str(cerceve_satiri.pk),
+            'satis_urunleri-0-satis': str(satis.pk),
+            'satis_urunleri-0-urun': str(self.cerceve.pk),
+            'satis_urunleri-0-adet': '2',
+            'satis_urunleri-0-DELETE': 'on',
+            'satis_urunleri-1-id': str(cam_satiri.pk),
+            'satis_urunleri-1-satis': str(satis.pk),
+            'satis_urunleri-1-urun': str(self.cam.pk),
+            'satis_urunleri-1-adet': '4',
+            'satis_odemeleri-TOTAL_FORMS': '0',
+            'satis_odemeleri-INITIAL_FORMS': '0',
+        }
+        response = self.client.post(f'/admin/satis/satis/{satis.pk}/change/', data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Urun.objects.get(pk=self.cerceve.pk).stok_adedi, 10)
+        self.assertEqual(Urun.objects.get(pk=self.cam.pk).stok_adedi, 6)
+
+        son_hareketler = StokHareketi.objects.filter(satis_no=satis.pk).order_by('-id').values_list('urun', 'degisim', 'neden')[:2]
+        self.assertEqual(sorted(son_hareketler), sorted([
+            (self.cerceve.pk, 2, HAREKET_IADE),
+            (self.cam.pk, -1, HAREKET_SATIS),
+        ]))
+
+
+class SatisChangelistTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'sifre'))
+        self.urun = Urun.objects.create(ad="Çerçeve", satis_fiyati=Decimal('100.00'), stok_adedi=1000)
+        # (adet, ödenen): toplam / ödenen / kalan
+        self.kismi = self.satis_ekle(3, '100.00') # 300 / 100 / 200
+        self.odenmis = self.satis_ekle(1, '100.00') # 100 / 100 / 0
+        self.fazla = self.satis_ekle(2, '250.00') # 200 / 250 / -50
+        self.odemesiz = self.satis_ekle(1) # 100 / 0 / 100
+
+    def satis_ekle(self, adet, odenen=None):
+        satis = Satis.objects.create()
+        SatisUrun.objects.create(satis=satis, urun=self.urun, adet=adet)
+        if odenen:
+            SatisOdeme.objects.create(satis=satis, miktar=Decimal(odenen))
+        return satis
+
+    def liste(self, **parametreler):
+        response = self.client.get('/admin/satis/satis/', parametreler)
+        self.assertEqual(response.status_code, 200)
+        return [satis.pk for satis in response.context['cl'].result_list]
+
+    def test_bakiye_filtresi(self):
+        self.assertEqual(set(self.liste(bakiye='borclu')), {self.kismi.pk, self.odemesiz.pk})
+        self.assertEqual(set(self.liste(bakiye='odendi')), {self.odenmis.pk, self.fazla.pk})
+
+    def test_tutar_sutunlarina_gore_siralama(self):
+        # list_display: id, müşteri, tarih, toplam (4), ödenen (5), alınacak (6)
+        self.assertEqual(self.liste(o='4.1'), [self.odenmis.pk, self.odemesiz.pk, self.fazla.pk, self.kismi.pk])
+        self.assertEqual(self.liste(o='-5.1'), [self.fazla.pk, self.kismi.pk, self.odenmis.pk, self.odemesiz.pk])
+        self.assertEqual(self.liste(o='-6'), [self.kismi.pk, self.odemesiz.pk, self.odenmis.pk, self.fazla.pk])
+        self.assertEqual(self.liste(o='6', bakiye='borclu'), [self.odemesiz.pk, self.kismi.pk])
+
+    def test_sorgu_sayisi_satir_sayisindan_bagimsiz(self):
+        def sorgu_sayisi():
+            with CaptureQueriesContext(connection) as sorgular:
+                self.liste(bakiye='borclu', o='-6')
+            return len(sorgular)
+
+        once = sorgu_sayisi()
+        for _ in range(10):
+            self.satis_ekle(2, '50.00')
+        self.assertEqual(sorgu_sayisi(), once)
+
+
+class PosSatisTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser('kasa', 'kasa@example.com', 'sifre')
+        self.client.force_login(self.user)
+        self.cerceve = Urun.objects.create(ad="Çerçeve", satis_fiyati=Decimal('100.00'), stok_adedi=10)
+        self.cam = Urun.objects.create(ad="Cam", satis_fiyati=Decimal('40.00'), stok_adedi=10)
+
+    def gonder(self, veri, anahtar='kasa-1-0001'):
+        return self.client.post('/admin/pos/satis/', json.dumps(veri), content_type='application/json', HTTP_IDEMPOTENCY_KEY=anahtar)
+
+    def istek(self):
+        return {
+            'urunler': [
+                {'urun_id': self.cerceve.pk, 'adet': 2},
+                {'urun_id': self.cam.pk, 'adet': 1, 'birim_fiyat': '35.50'},
+            ],
+            'odemeler': [{'miktar': '200', 'odeme_sekli': 'Kredi Kartı'}],
+        }
+
+    def test_satis_fiyat_stok_ve_ozet_ile_olusturulur(self):
+        response = self.gonder(self.istek())
+        self.assertEqual(response.status_code, 201)
+        yanit = response.json()
+        self.assertEqual((yanit['toplam'], yanit['odenen'], yanit['kalan']), ('235.50', '200.00', '35.50'))
+
+        satis = Satis.objects.tutarlari_ekle().get(pk=yanit['satis_id'])
+        self.assertEqual(satis.hesaplanan_toplam, Decimal('235.50'))
+        self.assertEqual(dict(Urun.objects.values_list('ad', 'stok_adedi')), {"Çerçeve": 8, "Cam": 9})
+        self.assertEqual(DailyFinanceSnapshot.objects.get().satis_geliri, Decimal('235.50'))
+
+    def test_ayni_anahtarla_tekrar_yeni_satis_olusturmaz(self):
+        ilk = self.gonder(self.istek())
+        tekrar = self.gonder(self.istek())
+        self.assertEqual(tekrar.status_code, 200)
+        self.assertEqual(tekrar['Idempotent-Replayed'], 'true')
+        self.assertEqual(tekrar.json(), ilk.json())
+        self.assertEqual(Satis.objects.count(), 1)
+        self.assertEqual(Urun.objects.get(pk=self.cerceve.pk).stok_adedi, 8)
+
+        farkli = self.istek()
+        farkli['urunler'][0]['adet'] = 3
+        self.assertEqual(self.gonder(farkli).status_code, 422)
+
+    def test_hatali_istek_hicbir_sey_yazmaz(self):
+        veri = self.istek()
+        veri['urunler'].append({'urun_id': 999999, 'adet': 1})
+        response = self.gonder(veri)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('999999', response.json()['hatalar'][0])
+        self.assertFalse(Satis.objects.exists())
+        self.assertFalse(PosIslemi.objects.exists())
+
+        self.assertEqual(self.gonder(self.istek(), anahtar='').status_code, 400)
+
+    def test_sifir_adet_reddedilir(self):
+        for adet in (0, '0', ''):
+            veri = self.istek()
+            veri['urunler'][0]['adet'] = adet
+            response = self.gonder(veri, anahtar=f'kasa-1-adet-{adet}')
+            self.assertEqual(response.status_code, 400, adet)
+            self.assertIn("'adet'", response.json()['hatalar'][0])
+        self.assertFalse(Satis.objects.exists())
+        self.assertEqual(Urun.objects.get(pk=self.cerceve.pk).stok_adedi, 10)
+
+        # adet verilmemişse 1 kabul edilir
+        veri = self.istek()
+        del veri['urunler'][0]['adet']
+        self.assertEqual(self.gonder(veri).status_code, 201)
+        self.assertEqual(Urun.objects.get(pk=self.cerceve.pk).stok_adedi, 9)
+
+    def test_sorgu_sayisi_satir_sayisindan_bagimsizdir(self):
+        urunler = [Urun.objects.create(ad=f"Ürün {sira}", satis_fiyati=Decimal('10.00'), stok_adedi=5) for sira in range(20)]
+        veri = {'urunler': [{'urun_id': urun.pk, 'adet': 1} for urun in urunler]}
+        with CaptureQueriesContext(connection) as sorgular:
+            self.assertEqual(self.gonder(veri).status_code, 201)
+        self.assertLessEqual(len(sorgular), 20)
+
+
+class SatisUrunEsZamanliStokTests(TransactionTestCase):
+    KASIYER_SAYISI = 8
+
+    def test_eszamanli_satislarda_dusum_kaybolmaz(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("Bellek içi SQLite test veritabanı thread'ler arasında paylaşılamaz.")
+        urun = Urun.objects.create(ad="Çerçeve", satis_fiyati=Decimal('100.00'), stok_adedi=100)
+        satislar = [Satis.objects.create() for _ in range(self.KASIYER_SAYISI)]
+        baslat = threading.Barrier(self.KASIYER_SAYISI)
+        hatalar = []
+
+        def kasiyer(satis):
+            try:
+                # Her kasiyer aynı stok değerini okumuş bir ürün nesnesiyle satış yapar
+                kasiyer_urunu = Urun.objects.get(pk=urun.pk)
+                baslat.wait()
+                SatisUrun.objects.create(satis=satis, urun=kasiyer_urunu, adet=2)
+            except Exception as exc:  # pragma: no cover - hata ana thread'de raporlanır
+                hatalar.append(exc)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threadler = [threading.Thread(target=kasiyer, args=(satis,)) for satis in satislar]
+        for thread in threadler:
+            thread.start()
+        for thread in threadler:
+            thread.join()
+
+        self.assertEqual(hatalar, [])
+        urun.refresh_from_db()
+        self.assertEqual(urun.stok_adedi, 100 - 2 * self.KASIYER_SAYISI)
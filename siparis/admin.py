@@ -1,7 +1,32 @@
 # siparis/admin.py
 
 from django.contrib import admin
+from core_utils.export import disa_aktarma_aksiyonu
 from .models import Siparis, Odeme
+from decimal import Decimal
+
+
+class OdemeDurumuFilter(admin.SimpleListFilter):
+    # Annotate edilmiş odenen_toplam / kalan_tutar üzerinden SQL'de filtreler
+    title = "Ödeme Durumu"
+    parameter_name = 'odeme_durumu'
+
+    def lookups(self, request, model_admin):
+        return (
+            ('tamami', "Tamamı Ödenmiş"),
+            ('kismi', "Kısmen Ödenmiş"),
+            ('odenmemis', "Ödenmemiş"),
+        )
+
+    def queryset(self, request, queryset):
+        if self.value() == 'tamami':
+            return queryset.filter(kalan_tutar__lte=0)
+        if self.value() == 'kismi':
+            return queryset.filter(odenen_toplam__gt=0, kalan_tutar__gt=0)
+        if self.value() == 'odenmemis':
+            return queryset.filter(odenen_toplam=0, kalan_tutar__gt=0)
+        return queryset
+
 
 class OdemeInline(admin.TabularInline):
     # Bu sınıf, Sipariş detay sayfasında ödemeleri doğrudan eklemeye/görmeye yarar
@@ -23,8 +48,10 @@ class SiparisAdmin(admin.ModelAdmin):
         'durum',
         'teslimat_tarihi_formatted'
     )
-    list_filter = ('durum', 'siparis_tarihi', 'teslimat_tarihi')
+    list_filter = ('durum', OdemeDurumuFilter, 'siparis_tarihi', 'teslimat_tarihi')
     search_fields = ('musteri__ad', 'musteri__soyad', 'notlar')
+    autocomplete_fields = ('musteri',)
+    actions = [disa_aktarma_aksiyonu('siparis', 'siparisler')]
     date_hierarchy = 'siparis_tarihi'
     ordering = ('-siparis_tarihi',)
     inlines = [OdemeInline] # Ödeme kayıtlarını Sipariş detayında gösterir
@@ -41,21 +68,34 @@ class SiparisAdmin(admin.ModelAdmin):
 
     readonly_fields = ('siparis_tarihi', 'odenen_toplam_tutar', 'alinacak_tutar')
 
+    def get_queryset(self, request):
+        # Ödenen ve kalan tutarlar satır başına ayrı sorgu yerine listeyle birlikte hesaplanır
+        return super().get_queryset(request).select_related('musteri').tutarlari_ekle()
+
     def musteri_adi_soyadi(self, obj):
         if obj.musteri:
             return f"{obj.musteri.ad} {obj.musteri.soyad}"
         return "Belirtilmemiş"
     musteri_adi_soyadi.short_description = "Müşteri"
+    musteri_adi_soyadi.admin_order_field = 'musteri__ad'
 
     def odenen_toplam_tutar(self, obj):
+        if not obj.pk:
+            return Decimal('0.00')
+        if hasattr(obj, 'odenen_toplam'):
+            return obj.odenen_toplam
         return obj.odenen_toplam_tutar
     odenen_toplam_tutar.short_description = "Ödenen Toplam Tutar"
-    odenen_toplam_tutar.admin_order_field = 'odenen_toplam_tutar' # Sıralama için
+    odenen_toplam_tutar.admin_order_field = 'odenen_toplam' # Sıralama için (annotate edilmiş alan)
 
     def alinacak_tutar(self, obj):
+        if not obj.pk:
+            return obj.toplam_tutar
+        if hasattr(obj, 'kalan_tutar'):
+            return obj.kalan_tutar
         return obj.alinacak_tutar
     alinacak_tutar.short_description = "Alınacak Tutar"
-    alinacak_tutar.admin_order_field = 'alinacak_tutar' # Sıralama için
+    alinacak_tutar.admin_order_field = 'kalan_tutar' # Sıralama için (annotate edilmiş alan)
 
     def teslimat_tarihi_formatted(self, obj):
         return obj.teslimat_tarihi.strftime('%Y-%m-%d') if obj.teslimat_tarihi else 'Belirtilmemiş'
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('siparis', '0005_remove_siparis_odenmis_tutar_odeme'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='siparis',
+            index=models.Index(fields=['-siparis_tarihi'], name='siparis_tarih_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='siparis',
+            index=models.Index(fields=['durum'], name='siparis_durum_idx'),
+        ),
+    ]
@@ -1,8 +1,32 @@
 # siparis/models.py
 
 from django.db import models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from decimal import Decimal
 from musteri.models import Musteri
 
+TUTAR_ALANI = DecimalField(max_digits=12, decimal_places=2)
+
+
+class SiparisQuerySet(models.QuerySet):
+    def tutarlari_ekle(self):
+        """
+        odenen_toplam ve kalan_tutar alanlarını veritabanında hesaplayarak ekler.
+        Satır başına ayrı aggregate sorgusu çalıştırmak yerine liste tek sorguda gelir.
+        """
+        odenen = (
+            Odeme.objects.filter(siparis=OuterRef('pk'))
+            .order_by().values('siparis')
+            .annotate(toplam=Sum('miktar')).values('toplam')
+        )
+        return self.annotate(
+            odenen_toplam=Coalesce(Subquery(odenen, output_field=TUTAR_ALANI), Value(Decimal('0.00')), output_field=TUTAR_ALANI),
+        ).annotate(
+            kalan_tutar=F('toplam_tutar') - F('odenen_toplam'),
+        )
+
+
 class Siparis(models.Model):
     musteri = models.ForeignKey(
         Musteri,
@@ -34,10 +58,17 @@ class Siparis(models.Model):
     notlar = models.TextField(blank=True, null=True, verbose_name="Notlar")
     teslimat_tarihi = models.DateField(blank=True, null=True, verbose_name="Tahmini/Gerçek Teslimat Tarihi")
 
+    objects = SiparisQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Sipariş"
         verbose_name_plural = "Siparişler"
         ordering = ['-siparis_tarihi']
+        indexes = [
+            # Liste varsayılan sıralaması ve dashboard'daki durum sayımları için
+            models.Index(fields=['-siparis_tarihi'], name='siparis_tarih_idx'),
+            models.Index(fields=['durum'], name='siparis_durum_idx'),
+        ]
 
     def __str__(self):
         return f"Sipariş #{self.id} - {self.musteri.ad if self.musteri else 'Belirtilmemiş Müşteri'}"
@@ -45,7 +76,7 @@ class Siparis(models.Model):
     @property
     def odenen_toplam_tutar(self):
         # Bu siparişe yapılan tüm ödemelerin toplamını dinamik olarak hesaplar
-        return self.odemeler.aggregate(models.Sum('miktar'))['miktar__sum'] or models.Decimal('0.00')
+        return self.odemeler.aggregate(models.Sum('miktar'))['miktar__sum'] or Decimal('0.00')
 
     @property
     def alinacak_tutar(self):
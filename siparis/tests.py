@@ -1,3 +1,59 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .models import Odeme, Siparis
+
+
+class SiparisChangelistTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'sifre'))
+        # toplam / ödenen / kalan
+        self.tamami = self.siparis_ekle('200.00', '200.00') # 200 / 200 / 0
+        self.fazla = self.siparis_ekle('100.00', '80.00', '50.00') # 100 / 130 / -30
+        self.sifir = self.siparis_ekle('0.00') # 0 / 0 / 0
+        self.kismi = self.siparis_ekle('300.00', '120.00') # 300 / 120 / 180
+        self.odenmemis = self.siparis_ekle('150.00') # 150 / 0 / 150
+
+    def siparis_ekle(self, toplam, *odemeler):
+        siparis = Siparis.objects.create(toplam_tutar=Decimal(toplam))
+        for miktar in odemeler:
+            Odeme.objects.create(siparis=siparis, miktar=Decimal(miktar))
+        return siparis
+
+    def liste(self, **parametreler):
+        response = self.client.get('/admin/siparis/siparis/', parametreler)
+        self.assertEqual(response.status_code, 200)
+        return [siparis.pk for siparis in response.context['cl'].result_list]
+
+    def test_odeme_durumu_filtresi(self):
+        # Toplamı sıfır olan ve fazla ödenmiş siparişlerin alacağı yoktur
+        self.assertEqual(set(self.liste(odeme_durumu='tamami')), {self.tamami.pk, self.fazla.pk, self.sifir.pk})
+        self.assertEqual(self.liste(odeme_durumu='kismi'), [self.kismi.pk])
+        self.assertEqual(self.liste(odeme_durumu='odenmemis'), [self.odenmemis.pk])
+
+    def test_tutar_sutunlarina_gore_siralama(self):
+        # list_display: id, müşteri, tarih, toplam (4), ödenen (5), alınacak (6)
+        self.assertEqual(
+            self.liste(o='-5.1'),
+            [self.tamami.pk, self.fazla.pk, self.kismi.pk, self.sifir.pk, self.odenmemis.pk],
+        )
+        self.assertEqual(
+            self.liste(o='6.1'),
+            [self.fazla.pk, self.tamami.pk, self.sifir.pk, self.odenmemis.pk, self.kismi.pk],
+        )
+        self.assertEqual(self.liste(o='-6.1', odeme_durumu='tamami'), [self.tamami.pk, self.sifir.pk, self.fazla.pk])
+
+    def test_sorgu_sayisi_satir_sayisindan_bagimsiz(self):
+        def sorgu_sayisi():
+            with CaptureQueriesContext(connection) as sorgular:
+                self.liste(odeme_durumu='kismi', o='-6')
+            return len(sorgular)
 
-# Create your tests here.
+        once = sorgu_sayisi()
+        for _ in range(10):
+            self.siparis_ekle('100.00', '40.00')
+        self.assertEqual(sorgu_sayisi(), once)
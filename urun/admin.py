@@ -1,8 +1,49 @@
 # urun/admin.py
 
+from django import forms
 from django.contrib import admin
 from django.utils.html import format_html # format_html'i import edin
-from .models import Kategori, Urun, StokAyarlari
+from core_utils.admin import FtsAramaMixin, OnekAramaMixin
+from .models import (
+    Kategori, Urun, StokAyarlari, StokHareketi, YenidenSiparisUrunu,
+    STOK_YOK, STOK_KRITIK, STOK_AZ, STOK_YETERLI,
+)
+
+
+class StokBandiFilter(admin.SimpleListFilter):
+    # StokAyarlari eşiklerine göre stok_adedi aralıklarıyla filtreler (indeks kullanılabilir)
+    title = "Stok Durumu"
+    parameter_name = 'stok_bandi'
+
+    def lookups(self, request, model_admin):
+        ayarlar = StokAyarlari.yukle()
+        if ayarlar is None:
+            return [(str(STOK_YOK), 'Stokta Yok')]
+        return [
+            (str(STOK_YOK), 'Stokta Yok'),
+            (str(STOK_KRITIK), f'Stok Kritik (< {ayarlar.dusuk_stok_esik_1})'),
+            (str(STOK_AZ), f'Stok Az (< {ayarlar.dusuk_stok_esik_2})'),
+            (str(STOK_YETERLI), f'Stok Yeterli (≥ {ayarlar.dusuk_stok_esik_2})'),
+        ]
+
+    def queryset(self, request, queryset):
+        if self.value() is not None:
+            return queryset.stok_bandinda(self.value())
+        return queryset
+
+class UrunAdminForm(forms.ModelForm):
+    # Formun açıldığı andaki stok; kayıtta stok farkı buna göre hesaplanır (Urun.save).
+    # Form açıkken satış yapıldıysa, stok alanına dokunulmadan kaydedilen form o düşümü ezmez.
+    stok_adedi_formdaki = forms.IntegerField(widget=forms.HiddenInput, required=False)
+
+    class Meta:
+        model = Urun
+        fields = '__all__'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['stok_adedi_formdaki'].initial = self.instance.stok_adedi
 
 @admin.register(Kategori)
 class KategoriAdmin(admin.ModelAdmin):
@@ -10,18 +51,21 @@ class KategoriAdmin(admin.ModelAdmin):
     search_fields = ('ad',)
 
 @admin.register(Urun)
-class UrunAdmin(admin.ModelAdmin):
+class UrunAdmin(OnekAramaMixin, FtsAramaMixin, admin.ModelAdmin):
+    form = UrunAdminForm
     list_display = ('ad', 'kategori', 'marka', 'stok_adedi', 'satis_fiyati', 'eklenme_tarihi', 'stok_bildirimleri')
-    list_filter = ('kategori', 'marka', 'eklenme_tarihi')
+    list_filter = (StokBandiFilter, 'kategori', 'marka', 'eklenme_tarihi')
     search_fields = ('ad', 'marka', 'model_kodu', 'aciklama')
+    onek_arama_alanlari = ('ad', 'marka', 'model_kodu') # Satış formundaki otomatik tamamlama
     ordering = ('ad',)
     readonly_fields = ('eklenme_tarihi', 'guncelleme_tarihi')
+    show_full_result_count = False # Filtrelerken tüm tabloyu ayrıca COUNT etme
     fieldsets = (
         (None, {
             'fields': ('ad', 'kategori', 'marka', 'model_kodu', 'aciklama')
         }),
         ('Fiyat ve Stok Bilgileri', {
-            'fields': ('stok_adedi', 'alis_fiyati', 'satis_fiyati')
+            'fields': ('stok_adedi', 'stok_adedi_formdaki', 'alis_fiyati', 'satis_fiyati')
         }),
         ('Tarih Bilgileri', {
             'fields': ('eklenme_tarihi', 'guncelleme_tarihi'),
@@ -29,35 +73,77 @@ class UrunAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        # Stok bandı veritabanında hesaplanır; ayarlar istek başına bir kez (önbellekten) okunur
+        return super().get_queryset(request).select_related('kategori').stok_bandi_ekle()
+
+    def save_model(self, request, obj, form, change):
+        formdaki = form.cleaned_data.get('stok_adedi_formdaki')
+        if change and formdaki is not None:
+            obj._stok_onceki = formdaki
+        super().save_model(request, obj, form, change)
+
     def stok_bildirimleri(self, obj):
-        stok_ayarlari = StokAyarlari.objects.first()
-        if not stok_ayarlari:
+        stok_bandi = getattr(obj, 'stok_bandi', None)
+        if stok_bandi is None:
             return "Ayarlar Tanımlanmamış"
 
-        esik_1 = stok_ayarlari.dusuk_stok_esik_1
-        esik_2 = stok_ayarlari.dusuk_stok_esik_2
-
-        if obj.stok_adedi == 0:
+        if stok_bandi == STOK_YOK:
             return format_html("<strong><span style='color: red;'>Stokta Yok!</span></strong>")
-        elif obj.stok_adedi < esik_1:
-            return format_html(f"<span style='color: orange;'>Stok Kritik</span>")
-        elif obj.stok_adedi < esik_2:
-            return format_html(f"<span style='color: blue;'>Stok Az</span>")
+        elif stok_bandi == STOK_KRITIK:
+            return format_html("<span style='color: orange;'>Stok Kritik</span>")
+        elif stok_bandi == STOK_AZ:
+            return format_html("<span style='color: blue;'>Stok Az</span>")
         else:
             return ""
     stok_bildirimleri.short_description = "Bildirimler"
+    stok_bildirimleri.admin_order_field = 'stok_bandi'
     # allow_tags artık format_html kullanıldığı için gerekli değil ama zararı da yok.
     # Yine de güvenlik için format_html kullanmak daha iyidir.
     # stok_bildirimleri.allow_tags = True
 
+@admin.register(YenidenSiparisUrunu)
+class YenidenSiparisUrunuAdmin(UrunAdmin):
+    # Stoğu ikinci eşiğin altındaki ürünler, en az stoklu olan en üstte
+    list_display = ('ad', 'marka', 'model_kodu', 'stok_adedi', 'stok_bildirimleri', 'kategori', 'alis_fiyati')
+    list_filter = (StokBandiFilter, 'kategori', 'marka')
+    ordering = ('stok_adedi', 'ad')
+    list_per_page = 50
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).yeniden_siparis()
+
+    def has_add_permission(self, request):
+        return False
+
+@admin.register(StokHareketi)
+class StokHareketiAdmin(admin.ModelAdmin):
+    # Stok defteri sadece okunur; kayıtlar stok değiştiren kod yollarınca yazılır
+    list_display = ('tarih', 'urun', 'degisim', 'neden', 'satis_no', 'siparis_no')
+    list_filter = ('neden', 'tarih')
+    list_select_related = ('urun',)
+    search_fields = ('=satis_no', '=siparis_no')
+    autocomplete_fields = ('urun',)
+    date_hierarchy = 'tarih'
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 @admin.register(StokAyarlari)
 class StokAyarlariAdmin(admin.ModelAdmin):
     list_display = ('dusuk_stok_esik_1', 'dusuk_stok_esik_2')
     def has_add_permission(self, request):
-        return not StokAyarlari.objects.exists()
+        return StokAyarlari.yukle() is None
 
     def changelist_view(self, request, extra_context=None):
-        if StokAyarlari.objects.count() == 1:
-            obj = StokAyarlari.objects.first()
+        obj = StokAyarlari.yukle()
+        if obj is not None:
             return self.change_view(request, str(obj.pk))
         return super().changelist_view(request, extra_context)
\ No newline at end of file
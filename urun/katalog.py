@@ -0,0 +1,193 @@
+# urun/katalog.py
+
+import csv
+import json
+import time
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from core_utils import arama
+from core_utils.cache import model_verisi_degisti, veri_degisti
+from .models import HAREKET_ILK_STOK, Kategori, StokHareketi, Urun
+
+# Tedarikçi dosyasından güncellenebilen alanlar. Dosyada olmayan sütunlar mevcut ürünlerde değiştirilmez.
+# stok_adedi sadece yeni ürünlerde kullanılır; canlı stok fiyat listesiyle ezilmez.
+GUNCELLENEN_ALANLAR = ('ad', 'kategori_id', 'alis_fiyati', 'satis_fiyati', 'aciklama')
+
+
+class KatalogSatirHatasi(ValueError):
+    pass
+
+
+def urun_anahtari(marka, model_kodu):
+    # 'RAY-BAN' / 'Ray-Ban ' gibi yazımlar aynı ürünü göstersin
+    return (arama.turkce_katla(marka).strip(), arama.turkce_katla(model_kodu).strip())
+
+
+def katalog_satirlari(dosya, bicim):
+    """(satır_no, {alan: değer}) ikilileri üretir; bicim 'csv' veya 'jsonl'."""
+    if bicim == 'csv':
+        for satir_no, satir in enumerate(csv.DictReader(dosya), start=2):
+            yield satir_no, {alan.strip(): (deger or '').strip() for alan, deger in satir.items() if alan}
+        return
+    for satir_no, satir in enumerate(dosya, start=1):
+        if satir.strip():
+            try:
+                yield satir_no, json.loads(satir)
+            except json.JSONDecodeError as exc:
+                yield satir_no, KatalogSatirHatasi(f"Geçersiz JSON: {exc}")
+
+
+def _fiyat(deger, alan):
+    try:
+        fiyat = Decimal(str(deger).replace(',', '.')).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise KatalogSatirHatasi(f"'{alan}' geçerli bir fiyat değil: {deger}")
+    if fiyat < 0:
+        raise KatalogSatirHatasi(f"'{alan}' negatif olamaz: {deger}")
+    return fiyat
+
+
+class KatalogGuncelleyici:
+    """
+    Tedarikçi fiyat listesini marka + model_kodu anahtarıyla mevcut kataloğa uygular (upsert).
+
+    Mevcut katalog tek geçişte bellekteki bir indekse yüklenir ve dosyayla karşılaştırılır;
+    sadece değişen ürünler bulk_update ile, yeniler bulk_create ile yazılır. Dosyada geçen yeni
+    kategoriler de toplu olarak oluşturulur. Toplu işlemler sinyal tetiklemediği için arama
+    indeksi ve önbellek sürümleri burada güncellenir.
+    """
+
+    def __init__(self, parca_boyutu=500, dry_run=False):
+        self.parca_boyutu = parca_boyutu
+        self.dry_run = dry_run
+        self.sayaclar = Counter()
+        self.alan_degisiklikleri = Counter()
+        self.hatalar = []
+        self.sure = 0.0
+
+    def calistir(self, satirlar):
+        baslangic = time.monotonic()
+        self._katalogu_yukle()
+
+        gecerliler = {}
+        for satir_no, satir in satirlar:
+            self.sayaclar['okunan'] += 1
+            try:
+                if isinstance(satir, Exception):
+                    raise satir
+                anahtar, degerler = self._satiri_dogrula(satir)
+                if anahtar in gecerliler:
+                    raise KatalogSatirHatasi(f"Aynı marka/model kodu dosyada tekrar ediyor (ilk: satır {gecerliler[anahtar][0]}).")
+                if anahtar in self._belirsiz:
+                    raise KatalogSatirHatasi("Katalogda bu marka/model koduyla birden fazla ürün var; elle düzeltilmeli.")
+                gecerliler[anahtar] = (satir_no, degerler)
+            except KatalogSatirHatasi as exc:
+                self.hatalar.append((satir_no, str(exc)))
+
+        kategori_idleri = self._kategorileri_olustur(
+            degerler['kategori'] for _, degerler in gecerliler.values() if degerler.get('kategori')
+        )
+        yeniler, degisenler, degisen_alanlar = [], [], set()
+        simdi = timezone.now()
+        for anahtar, (_, degerler) in gecerliler.items():
+            if degerler.get('kategori'):
+                degerler['kategori_id'] = kategori_idleri[arama.turkce_katla(degerler.pop('kategori'))]
+            else:
+                degerler.pop('kategori', None)
+            urun = self._katalog.get(anahtar)
+            if urun is None:
+                yeniler.append(Urun(**degerler))
+                continue
+            alanlar = [alan for alan, deger in degerler.items() if alan in GUNCELLENEN_ALANLAR and getattr(urun, alan) != deger]
+            if not alanlar:
+                self.sayaclar['degismeyen'] += 1
+                continue
+            for alan in alanlar:
+                setattr(urun, alan, degerler[alan])
+                self.alan_degisiklikleri[alan] += 1
+            urun.guncelleme_tarihi = simdi # bulk_update auto_now alanını doldurmaz
+            degisenler.append(urun)
+            degisen_alanlar.update(alanlar)
+
+        self.sayaclar['yeni'] = len(yeniler)
+        self.sayaclar['guncellenen'] = len(degisenler)
+        if not self.dry_run and (yeniler or degisenler):
+            self._yaz(yeniler, degisenler, sorted(degisen_alanlar) + ['guncelleme_tarihi'])
+        self.sure = time.monotonic() - baslangic
+        return self
+
+    def _katalogu_yukle(self):
+        self._katalog, self._belirsiz = {}, set()
+        for urun in Urun.objects.only('id', 'marka', 'model_kodu', *GUNCELLENEN_ALANLAR).iterator(chunk_size=2000):
+            if not urun.model_kodu:
+                continue
+            anahtar = urun_anahtari(urun.marka, urun.model_kodu)
+            if anahtar in self._katalog:
+                self._belirsiz.add(anahtar)
+            self._katalog[anahtar] = urun
+        self._kategoriler = {arama.turkce_katla(ad): pk for pk, ad in Kategori.objects.values_list('pk', 'ad')}
+
+    def _satiri_dogrula(self, satir):
+        if not isinstance(satir, dict):
+            raise KatalogSatirHatasi("Satır bir nesne olmalı.")
+        marka, model_kodu = (satir.get('marka') or '').strip(), (satir.get('model_kodu') or '').strip()
+        if not model_kodu:
+            raise KatalogSatirHatasi("'model_kodu' zorunlu.")
+
+        degerler = {}
+        for alan in ('ad', 'aciklama', 'kategori'):
+            if satir.get(alan) not in (None, ''):
+                degerler[alan] = str(satir[alan]).strip()
+        for alan in ('alis_fiyati', 'satis_fiyati'):
+            if satir.get(alan) not in (None, ''):
+                degerler[alan] = _fiyat(satir[alan], alan)
+        if satir.get('stok_adedi') not in (None, ''):
+            try:
+                degerler['stok_adedi'] = int(satir['stok_adedi'])
+            except (TypeError, ValueError):
+                raise KatalogSatirHatasi(f"'stok_adedi' tam sayı olmalı: {satir['stok_adedi']}")
+
+        anahtar = urun_anahtari(marka, model_kodu)
+        if anahtar not in self._katalog:
+            if 'satis_fiyati' not in degerler:
+                raise KatalogSatirHatasi("Yeni ürün için 'satis_fiyati' zorunlu.")
+            degerler.setdefault('ad', f"{marka} {model_kodu}".strip())
+            degerler['marka'], degerler['model_kodu'] = marka or None, model_kodu
+        return anahtar, degerler
+
+    def _kategorileri_olustur(self, adlar):
+        yeni_adlar = {}
+        for ad in adlar:
+            katlanmis = arama.turkce_katla(ad)
+            if katlanmis not in self._kategoriler:
+                yeni_adlar.setdefault(katlanmis, ad)
+        self.sayaclar['yeni_kategori'] = len(yeni_adlar)
+        if yeni_adlar and self.dry_run:
+            # Yazılmayacakları için geçici (negatif) id verilir; karşılaştırmada "değişti" sayılırlar
+            self._kategoriler.update({katlanmis: -sira for sira, katlanmis in enumerate(yeni_adlar, start=1)})
+        elif yeni_adlar:
+            Kategori.objects.bulk_create([Kategori(ad=ad) for ad in yeni_adlar.values()], ignore_conflicts=True)
+            self._kategoriler.update({
+                arama.turkce_katla(ad): pk
+                for pk, ad in Kategori.objects.filter(ad__in=yeni_adlar.values()).values_list('pk', 'ad')
+            })
+        return self._kategoriler
+
+    @transaction.atomic
+    def _yaz(self, yeniler, degisenler, alanlar):
+        if yeniler:
+            Urun.objects.bulk_create(yeniler, batch_size=self.parca_boyutu)
+            # bulk_create Urun.save() çağırmadığı için ilk stoklar deftere burada yazılır
+            StokHareketi.objects.bulk_create([
+                StokHareketi(urun=urun, degisim=urun.stok_adedi, neden=HAREKET_ILK_STOK)
+                for urun in yeniler if urun.stok_adedi
+            ], batch_size=self.parca_boyutu)
+        if degisenler:
+            Urun.objects.bulk_update(degisenler, alanlar, batch_size=self.parca_boyutu)
+        arama.indeksle(Urun, yeniler + degisenler)
+        veri_degisti()
+        model_verisi_degisti(Urun)
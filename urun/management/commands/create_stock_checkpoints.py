@@ -0,0 +1,25 @@
+# urun/management/commands/create_stock_checkpoints.py
+
+from django.core.management.base import BaseCommand
+
+from urun.stok import kontrol_noktalari_olustur
+
+
+class Command(BaseCommand):
+    help = (
+        "Son kontrol noktasından beri stoğu değişen ürünler için stok kontrol noktası yazar "
+        "(periyodik olarak, örn. her gece çalıştırılmalıdır). Defterle uyuşmayan stokları raporlar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sapma-limiti', type=int, default=50, help="Ekrana yazılacak en fazla sapma sayısı.")
+
+    def handle(self, *args, **options):
+        olusturulan, sapmalar = kontrol_noktalari_olustur()
+        for urun_id, defterdeki_stok, stok_adedi in sapmalar[:options['sapma_limiti']]:
+            self.stderr.write(f"Ürün #{urun_id}: defterdeki stok {defterdeki_stok}, kayıtlı stok {stok_adedi}")
+        if len(sapmalar) > options['sapma_limiti']:
+            self.stderr.write(f"... ve {len(sapmalar) - options['sapma_limiti']} sapma daha.")
+
+        mesaj = f"{olusturulan} stok kontrol noktası yazıldı, {len(sapmalar)} üründe defter sapması bulundu."
+        self.stdout.write((self.style.WARNING if sapmalar else self.style.SUCCESS)(mesaj))
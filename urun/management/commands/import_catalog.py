@@ -0,0 +1,54 @@
+# urun/management/commands/import_catalog.py
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from urun.katalog import KatalogGuncelleyici, katalog_satirlari
+
+
+class Command(BaseCommand):
+    help = (
+        "Tedarikçi fiyat listesini (CSV veya JSONL) marka + model_kodu anahtarıyla ürün kataloğuna uygular. "
+        "Sadece değişen ürünler güncellenir, yeni ürünler ve kategoriler toplu olarak oluşturulur."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dosya', help="Fiyat listesi (.csv veya .jsonl). Sütunlar: marka, model_kodu, ad, kategori, alis_fiyati, satis_fiyati, aciklama, stok_adedi")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Dosya biçimi; verilmezse uzantıdan anlaşılır.")
+        parser.add_argument('--parca-boyutu', type=int, default=500, help="bulk_create/bulk_update parça boyutu.")
+        parser.add_argument('--dry-run', action='store_true', help="Sadece değişiklik özetini göster, veritabanına yazma.")
+        parser.add_argument('--hata-limiti', type=int, default=20, help="Ekrana yazılacak en fazla hata sayısı.")
+
+    def handle(self, *args, **options):
+        dosya_yolu = options['dosya']
+        bicim = options['format'] or os.path.splitext(dosya_yolu)[1].lstrip('.').lower()
+        if bicim not in ('csv', 'jsonl'):
+            raise CommandError(f"Dosya biçimi anlaşılamadı: {dosya_yolu} (--format csv|jsonl kullanın)")
+        if options['parca_boyutu'] < 1:
+            raise CommandError("--parca-boyutu en az 1 olmalı.")
+
+        guncelleyici = KatalogGuncelleyici(parca_boyutu=options['parca_boyutu'], dry_run=options['dry_run'])
+        try:
+            with open(dosya_yolu, encoding='utf-8-sig', newline='') as dosya:
+                guncelleyici.calistir(katalog_satirlari(dosya, bicim))
+        except OSError as exc:
+            raise CommandError(f"Dosya okunamadı: {exc}")
+
+        for satir_no, mesaj in guncelleyici.hatalar[:options['hata_limiti']]:
+            self.stderr.write(f"Satır {satir_no}: {mesaj}")
+        if len(guncelleyici.hatalar) > options['hata_limiti']:
+            self.stderr.write(f"... ve {len(guncelleyici.hatalar) - options['hata_limiti']} hata daha.")
+
+        sayaclar = guncelleyici.sayaclar
+        onek = "[DRY RUN] " if options['dry_run'] else ""
+        self.stdout.write(
+            f"{onek}{sayaclar['okunan']} satır okundu: {sayaclar['yeni']} yeni ürün, "
+            f"{sayaclar['guncellenen']} güncellenen, {sayaclar['degismeyen']} değişmeyen, "
+            f"{len(guncelleyici.hatalar)} hatalı. {sayaclar['yeni_kategori']} yeni kategori."
+        )
+        for alan, sayi in guncelleyici.alan_degisiklikleri.most_common():
+            self.stdout.write(f"  {alan}: {sayi} üründe değişti")
+        self.stdout.write(f"Süre: {guncelleyici.sure:.2f} sn")
+        stil = self.style.WARNING if guncelleyici.hatalar else self.style.SUCCESS
+        self.stdout.write(stil("Tamamlandı."))
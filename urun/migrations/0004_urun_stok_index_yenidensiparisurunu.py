@@ -0,0 +1,31 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('urun', '0003_stokayarlari'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='YenidenSiparisUrunu',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'Yeniden Sipariş Edilecek Ürün',
+                'verbose_name_plural': 'Yeniden Sipariş Edilecek Ürünler',
+                'ordering': ['stok_adedi', 'ad'],
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('urun.urun',),
+        ),
+        migrations.AddIndex(
+            model_name='urun',
+            index=models.Index(fields=['stok_adedi'], name='urun_stok_adedi_idx'),
+        ),
+    ]
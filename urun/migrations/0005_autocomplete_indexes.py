@@ -0,0 +1,26 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:27
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('urun', '0004_urun_stok_index_yenidensiparisurunu'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='urun',
+            index=models.Index(django.db.models.functions.comparison.Collate('ad', 'NOCASE'), name='urun_ad_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='urun',
+            index=models.Index(django.db.models.functions.comparison.Collate('marka', 'NOCASE'), name='urun_marka_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='urun',
+            index=models.Index(django.db.models.functions.comparison.Collate('model_kodu', 'NOCASE'), name='urun_model_kodu_nocase_idx'),
+        ),
+    ]
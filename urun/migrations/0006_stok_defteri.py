@@ -0,0 +1,71 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def baslangic_kontrol_noktalari(apps, schema_editor):
+    # Defter başlangıcı: mevcut ürünlerin bugünkü stoğu ilk kontrol noktası olarak yazılır
+    Urun = apps.get_model('urun', 'Urun')
+    StokKontrolNoktasi = apps.get_model('urun', 'StokKontrolNoktasi')
+    simdi = django.utils.timezone.now()
+    kontrol_noktalari = [
+        StokKontrolNoktasi(urun_id=urun_id, tarih=simdi, stok_adedi=stok_adedi)
+        for urun_id, stok_adedi in Urun.objects.values_list('pk', 'stok_adedi').iterator(chunk_size=2000)
+    ]
+    StokKontrolNoktasi.objects.bulk_create(kontrol_noktalari, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('urun', '0005_autocomplete_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StokKontrolNoktasi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tarih', models.DateTimeField(verbose_name='Tarih')),
+                ('stok_adedi', models.IntegerField(verbose_name='Stok Adedi')),
+                ('urun', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stok_kontrol_noktalari', to='urun.urun', verbose_name='Ürün')),
+            ],
+            options={
+                'verbose_name': 'Stok Kontrol Noktası',
+                'verbose_name_plural': 'Stok Kontrol Noktaları',
+                'ordering': ['-tarih'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StokHareketi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('degisim', models.IntegerField(verbose_name='Değişim')),
+                ('neden', models.CharField(choices=[('satis', 'Satış'), ('iade', 'Satış İptali / İade'), ('duzeltme', 'Elle Düzeltme'), ('ilk_stok', 'İlk Stok'), ('ice_aktarma', 'Toplu İçe Aktarma')], max_length=20, verbose_name='Neden')),
+                ('satis_no', models.PositiveIntegerField(blank=True, null=True, verbose_name='Satış No')),
+                ('siparis_no', models.PositiveIntegerField(blank=True, null=True, verbose_name='Sipariş No')),
+                ('tarih', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Tarih')),
+                ('urun', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stok_hareketleri', to='urun.urun', verbose_name='Ürün')),
+            ],
+            options={
+                'verbose_name': 'Stok Hareketi',
+                'verbose_name_plural': 'Stok Hareketleri',
+                'ordering': ['-tarih', '-id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='stokkontrolnoktasi',
+            constraint=models.UniqueConstraint(fields=('urun', 'tarih'), name='stok_kontrol_noktasi_urun_tarih_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='stokhareketi',
+            index=models.Index(fields=['urun', 'tarih'], name='stok_hareketi_urun_tarih_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stokhareketi',
+            index=models.Index(fields=['satis_no'], name='stok_hareketi_satis_idx'),
+        ),
+        migrations.RunPython(baslangic_kontrol_noktalari, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,119 @@
 # urun/models.py
 
-from django.db import models
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Case, DateTimeField, F, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Collate
+from django.utils import timezone
+
+# Stok bantları (küçükten büyüğe sıralandığında en acil olan en üstte olur)
+STOK_YOK = 0
+STOK_KRITIK = 1
+STOK_AZ = 2
+STOK_YETERLI = 3
+
+STOK_BANDI_SECENEKLERI = [
+    (STOK_YOK, 'Stokta Yok'),
+    (STOK_KRITIK, 'Stok Kritik'),
+    (STOK_AZ, 'Stok Az'),
+    (STOK_YETERLI, 'Stok Yeterli'),
+]
+
+# Stok hareketi nedenleri
+HAREKET_SATIS = 'satis'
+HAREKET_IADE = 'iade'
+HAREKET_DUZELTME = 'duzeltme'
+HAREKET_ILK_STOK = 'ilk_stok'
+HAREKET_ICE_AKTARMA = 'ice_aktarma'
+
+HAREKET_NEDENLERI = [
+    (HAREKET_SATIS, 'Satış'),
+    (HAREKET_IADE, 'Satış İptali / İade'),
+    (HAREKET_DUZELTME, 'Elle Düzeltme'),
+    (HAREKET_ILK_STOK, 'İlk Stok'),
+    (HAREKET_ICE_AKTARMA, 'Toplu İçe Aktarma'),
+]
+
+# Kontrol noktası olmayan ürünlerde hareketler bu andan itibaren toplanır
+DEFTER_BASLANGICI = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class UrunQuerySet(models.QuerySet):
+    def stok_bandinda(self, stok_bandi, ayarlar=None):
+        """
+        Verilen stok bandındaki ürünleri stok_adedi aralıklarıyla filtreler,
+        böylece sorgu stok_adedi indeksini kullanabilir.
+        """
+        if ayarlar is None:
+            ayarlar = StokAyarlari.yukle()
+        stok_bandi = int(stok_bandi)
+        if stok_bandi == STOK_YOK:
+            return self.filter(stok_adedi__lte=0)
+        if ayarlar is None:
+            return self.none()
+        if stok_bandi == STOK_KRITIK:
+            return self.filter(stok_adedi__gt=0, stok_adedi__lt=ayarlar.dusuk_stok_esik_1)
+        if stok_bandi == STOK_AZ:
+            return self.filter(stok_adedi__gte=ayarlar.dusuk_stok_esik_1, stok_adedi__lt=ayarlar.dusuk_stok_esik_2)
+        return self.filter(stok_adedi__gte=ayarlar.dusuk_stok_esik_2)
+
+    def yeniden_siparis(self, ayarlar=None):
+        # İkinci uyarı eşiğinin altındaki (yeniden sipariş edilmesi gereken) ürünler
+        if ayarlar is None:
+            ayarlar = StokAyarlari.yukle()
+        if ayarlar is None:
+            return self.filter(stok_adedi__lte=0)
+        return self.filter(stok_adedi__lt=ayarlar.dusuk_stok_esik_2)
+
+    def stok_bandi_ekle(self, ayarlar=None):
+        """
+        Her ürüne StokAyarlari eşiklerine göre 'stok_bandi' alanını veritabanında ekler.
+        Ayarlar tanımlanmamışsa stok_bandi None olur.
+        """
+        if ayarlar is None:
+            ayarlar = StokAyarlari.yukle()
+        if ayarlar is None:
+            return self.annotate(stok_bandi=Value(None, output_field=IntegerField()))
+        return self.annotate(stok_bandi=Case(
+            When(stok_adedi__lte=0, then=Value(STOK_YOK)),
+            When(stok_adedi__lt=ayarlar.dusuk_stok_esik_1, then=Value(STOK_KRITIK)),
+            When(stok_adedi__lt=ayarlar.dusuk_stok_esik_2, then=Value(STOK_AZ)),
+            default=Value(STOK_YETERLI),
+            output_field=IntegerField(),
+        ))
+
+    def tarihteki_stok_ekle(self, an=None):
+        """
+        Her ürüne verilen andaki stok adedini 'tarihteki_stok' olarak ekler.
+        Ürünün o andan önceki en yakın kontrol noktasına sadece ondan sonraki hareketler eklenir;
+        tüm geçmiş tekrar toplanmaz. Defter başlamadan (ilk kontrol noktasından) önceki anlar için
+        sonuç anlamlı değildir.
+        """
+        if an is None:
+            an = timezone.now()
+        kontrol_noktalari = StokKontrolNoktasi.objects.filter(urun=OuterRef('pk'), tarih__lte=an).order_by('-tarih')
+        queryset = self.annotate(
+            kontrol_tarihi=Subquery(kontrol_noktalari.values('tarih')[:1]),
+            kontrol_stogu=Subquery(kontrol_noktalari.values('stok_adedi')[:1]),
+        )
+        hareket_toplami = (
+            StokHareketi.objects
+            .filter(
+                urun=OuterRef('pk'),
+                tarih__lte=an,
+                tarih__gt=Coalesce(OuterRef('kontrol_tarihi'), Value(DEFTER_BASLANGICI), output_field=DateTimeField()),
+            )
+            .order_by().values('urun')
+            .annotate(toplam=Sum('degisim'))
+            .values('toplam')
+        )
+        return queryset.annotate(tarihteki_stok=(
+            Coalesce(F('kontrol_stogu'), Value(0))
+            + Coalesce(Subquery(hareket_toplami, output_field=IntegerField()), Value(0))
+        ))
 
 class Kategori(models.Model):
     ad = models.CharField(max_length=100, unique=True, verbose_name="Kategori Adı")
@@ -32,14 +145,120 @@ class Urun(models.Model):
     eklenme_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Eklenme Tarihi")
     guncelleme_tarihi = models.DateTimeField(auto_now=True, verbose_name="Güncelleme Tarihi")
 
+    objects = UrunQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Ürün"
         verbose_name_plural = "Ürünler"
         ordering = ['ad']
+        indexes = [
+            # Düşük stok sayımları, stok bandı filtresi ve yeniden sipariş listesi için
+            models.Index(fields=['stok_adedi'], name='urun_stok_adedi_idx'),
+            # Otomatik tamamlamadaki büyük/küçük harf duyarsız önek aramaları (LIKE 'terim%') için
+            models.Index(Collate('ad', 'NOCASE'), name='urun_ad_nocase_idx'),
+            models.Index(Collate('marka', 'NOCASE'), name='urun_marka_nocase_idx'),
+            models.Index(Collate('model_kodu', 'NOCASE'), name='urun_model_kodu_nocase_idx'),
+        ]
 
     def __str__(self):
         return f"{self.ad} ({self.marka if self.marka else 'Yok'})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Elle yapılan stok değişikliklerinin farkını deftere yazabilmek için okunan stok saklanır
+        instance = super().from_db(db, field_names, values)
+        instance._stok_onceki = instance.__dict__.get('stok_adedi')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Yeni kayıtta ilk stok, mevcut kayıtta elle yapılan stok düzeltmesi deftere yazılır.
+
+        Mevcut kayıtta stok_adedi mutlak değer olarak yazılmaz: okunduğundan (_stok_onceki) bu
+        yana değişmediyse kaydedilen alanlardan çıkarılır, değiştiyse fark F() ile uygulanır.
+        Böylece form açıkken yapılan eşzamanlı bir satışın düşümü ezilmez ve stok_adedi ile
+        defter ayrışmaz. update_fields stok_adedi içermiyorsa deftere bir şey yazılmaz.
+        """
+        if self._state.adding:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                if self.stok_adedi:
+                    StokHareketi.objects.create(urun=self, degisim=self.stok_adedi, neden=HAREKET_ILK_STOK)
+            self._stok_onceki = self.stok_adedi
+            return
+
+        onceki = getattr(self, '_stok_onceki', None)
+        update_fields = kwargs.get('update_fields')
+        if onceki is None or (update_fields is not None and 'stok_adedi' not in update_fields):
+            # Stok okunmadı (ertelenmiş alan) veya bu kayıtta yazılmıyor
+            super().save(*args, **kwargs)
+            return
+
+        fark = self.stok_adedi - onceki
+        if update_fields is None:
+            ertelenmis = self.get_deferred_fields()
+            update_fields = [alan.attname for alan in self._meta.concrete_fields if not alan.primary_key and alan.attname not in ertelenmis]
+        # Değiştirilmiş başka alan olmasa da post_save sinyalleri (önbellek sürümü, arama) çalışsın
+        kwargs['update_fields'] = [alan for alan in update_fields if alan != 'stok_adedi'] or ['guncelleme_tarihi']
+        with transaction.atomic():
+            if fark:
+                Urun.objects.filter(pk=self.pk).update(stok_adedi=F('stok_adedi') + fark)
+                StokHareketi.objects.create(urun=self, degisim=fark, neden=HAREKET_DUZELTME)
+                self.stok_adedi = Urun.objects.filter(pk=self.pk).values_list('stok_adedi', flat=True).get()
+            super().save(*args, **kwargs)
+        self._stok_onceki = self.stok_adedi
+
+    def tarihteki_stok(self, an):
+        return Urun.objects.filter(pk=self.pk).tarihteki_stok_ekle(an).values_list('tarihteki_stok', flat=True).first()
+
+class YenidenSiparisUrunu(Urun):
+    # Sadece yeniden sipariş listesi (stoğu ikinci eşiğin altındaki ürünler) için ayrı admin sayfası
+    class Meta:
+        proxy = True
+        verbose_name = "Yeniden Sipariş Edilecek Ürün"
+        verbose_name_plural = "Yeniden Sipariş Edilecek Ürünler"
+        ordering = ['stok_adedi', 'ad']
+
+class StokHareketi(models.Model):
+    # Stok defteri: her stok değişikliği (ürün, fark, neden, kaynak) olarak yazılır.
+    # Kaynak satış/sipariş numarası düz sayı olarak tutulur; kayıt silinse de iz kaybolmaz.
+    urun = models.ForeignKey(Urun, on_delete=models.CASCADE, related_name='stok_hareketleri', verbose_name="Ürün")
+    degisim = models.IntegerField(verbose_name="Değişim") # Pozitif: stoğa giriş, negatif: stoktan çıkış
+    neden = models.CharField(max_length=20, choices=HAREKET_NEDENLERI, verbose_name="Neden")
+    satis_no = models.PositiveIntegerField(blank=True, null=True, verbose_name="Satış No")
+    siparis_no = models.PositiveIntegerField(blank=True, null=True, verbose_name="Sipariş No")
+    tarih = models.DateTimeField(default=timezone.now, verbose_name="Tarih")
+
+    class Meta:
+        verbose_name = "Stok Hareketi"
+        verbose_name_plural = "Stok Hareketleri"
+        ordering = ['-tarih', '-id']
+        indexes = [
+            # Kontrol noktasından sonraki hareketleri toplamak için sınırlı aralık taraması
+            models.Index(fields=['urun', 'tarih'], name='stok_hareketi_urun_tarih_idx'),
+            models.Index(fields=['satis_no'], name='stok_hareketi_satis_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.urun_id} {self.degisim:+d} ({self.get_neden_display()})"
+
+class StokKontrolNoktasi(models.Model):
+    # Belirli bir andaki ürün stoğu; geçmiş tarihli stok bu noktadan itibaren hesaplanır.
+    urun = models.ForeignKey(Urun, on_delete=models.CASCADE, related_name='stok_kontrol_noktalari', verbose_name="Ürün")
+    tarih = models.DateTimeField(verbose_name="Tarih")
+    stok_adedi = models.IntegerField(verbose_name="Stok Adedi")
+
+    class Meta:
+        verbose_name = "Stok Kontrol Noktası"
+        verbose_name_plural = "Stok Kontrol Noktaları"
+        ordering = ['-tarih']
+        constraints = [
+            models.UniqueConstraint(fields=['urun', 'tarih'], name='stok_kontrol_noktasi_urun_tarih_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.urun_id} @ {self.tarih:%Y-%m-%d %H:%M}: {self.stok_adedi}"
+
 class StokAyarlari(models.Model):
     # Bu model, stok bildirim eşiklerini tutar ve tek bir kayıt olmalıdır.
     dusuk_stok_esik_1 = models.PositiveIntegerField(default=20, verbose_name="Düşük Stok Eşiği (Uyarı 1 - Örn: 20)")
@@ -52,8 +271,38 @@ class StokAyarlari(models.Model):
     def __str__(self):
         return "Genel Stok Ayarları"
 
+    ONBELLEK_ANAHTARI = 'optik:stok_ayarlari'
+
+    @classmethod
+    def yukle(cls):
+        """
+        Tekil ayar kaydını önbellekten döndürür; kayıt yoksa None.
+        Her satır/istek için StokAyarlari.objects.first() sorgusu çalıştırmak yerine kullanılır.
+        Kayıt kaydedilince/silinince önbellek temizlenir; temizleme kaçırılsa bile (örn. başka bir
+        veritabanıyla çalışan süreç) değer en fazla STOK_AYARLARI_CACHE_TIMEOUT kadar eski kalır.
+        """
+        ayarlar = cache.get(cls.ONBELLEK_ANAHTARI)
+        if ayarlar is None:
+            ayarlar = cls.objects.first()
+            timeout = getattr(settings, 'STOK_AYARLARI_CACHE_TIMEOUT', 5 * 60)
+            # Kayıt olmaması da (False) önbelleğe alınır ama daha kısa süreliğine
+            cache.set(cls.ONBELLEK_ANAHTARI, ayarlar or False, timeout if ayarlar else min(timeout, 60))
+        return ayarlar or None
+
+    @classmethod
+    def onbellegi_temizle(cls):
+        cache.delete(cls.ONBELLEK_ANAHTARI)
+        # İşlem tamamlanmadan eski değeri okuyup önbelleğe yazan istekler için commit sonrası tekrar
+        transaction.on_commit(lambda: cache.delete(cls.ONBELLEK_ANAHTARI))
+
     def save(self, *args, **kwargs):
         # Sadece tek bir StokAyarlari kaydı olmasına izin ver
         if StokAyarlari.objects.exists() and not self.pk:
             raise ValueError("Sadece bir Stok Ayarları kaydı oluşturulabilir.")
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+        StokAyarlari.onbellegi_temizle()
+
+    def delete(self, *args, **kwargs):
+        sonuc = super().delete(*args, **kwargs)
+        StokAyarlari.onbellegi_temizle()
+        return sonuc
\ No newline at end of file
@@ -0,0 +1,101 @@
+# urun/stok.py
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from .models import HAREKET_SATIS, StokHareketi, StokKontrolNoktasi, Urun
+
+
+def farklari_birlestir(*farklar):
+    """
+    Birden fazla {urun_id: adet} sözlüğünü toplayarak tek sözlükte birleştirir.
+    Sıfırlanan ürünler sonuçtan çıkarılır.
+    """
+    toplam = defaultdict(int)
+    for fark in farklar:
+        for urun_id, adet in fark.items():
+            if urun_id is not None:
+                toplam[urun_id] += adet
+    return {urun_id: adet for urun_id, adet in toplam.items() if adet}
+
+
+def stok_farklarini_uygula(farklar, neden=HAREKET_SATIS, satis_farklari=None):
+    """
+    {urun_id: adet} biçimindeki stok farklarını veritabanına uygular.
+    Pozitif adet stoktan düşülür, negatif adet stoğa geri eklenir.
+
+    Güncellemeler F('stok_adedi') ifadeleriyle atomik olarak yapılır; eşzamanlı satışlarda
+    okuma-değiştirme-yazma kaynaklı kayıp olmaz ve ürünün diğer alanları yeniden yazılmaz.
+    Aynı farka sahip ürünler tek bir UPDATE ile güncellenir.
+    Stokta olmayan (stok_adedi <= 0) ürünlerden düşüm yapılmaz.
+
+    Uygulanan farklar stok defterine (StokHareketi) tek bir bulk_create ile yazılır.
+    satis_farklari ({satis_id: {urun_id: adet}}) verilirse hareketler satış bazında,
+    verilmezse ürün başına kaynaksız olarak yazılır.
+    """
+    farklar = {urun_id: adet for urun_id, adet in farklar.items() if urun_id is not None and adet}
+    if not farklar:
+        return
+
+    simdi = timezone.now()
+    with transaction.atomic():
+        dusulecekler = [urun_id for urun_id, adet in farklar.items() if adet > 0]
+        if dusulecekler:
+            # Stokta olmayan ürünler atlanır; deftere de yazılmazlar
+            stokta_olanlar = set(Urun.objects.filter(pk__in=dusulecekler, stok_adedi__gt=0).values_list('pk', flat=True))
+            farklar = {urun_id: adet for urun_id, adet in farklar.items() if adet < 0 or urun_id in stokta_olanlar}
+
+        gruplar = defaultdict(list)
+        for urun_id, adet in farklar.items():
+            gruplar[adet].append(urun_id)
+        for adet, urun_idleri in gruplar.items():
+            urunler = Urun.objects.filter(pk__in=urun_idleri)
+            if adet > 0:
+                urunler = urunler.filter(stok_adedi__gt=0)
+            urunler.update(stok_adedi=F('stok_adedi') - adet, guncelleme_tarihi=simdi)
+
+        if satis_farklari is None:
+            hareketler = [
+                StokHareketi(urun_id=urun_id, degisim=-adet, neden=neden, tarih=simdi)
+                for urun_id, adet in farklar.items()
+            ]
+        else:
+            hareketler = [
+                StokHareketi(urun_id=urun_id, degisim=-adet, neden=neden, satis_no=satis_id, tarih=simdi)
+                for satis_id, satis_farki in satis_farklari.items()
+                for urun_id, adet in satis_farki.items()
+                if urun_id in farklar and adet
+            ]
+        StokHareketi.objects.bulk_create(hareketler)
+
+
+def kontrol_noktalari_olustur(an=None):
+    """
+    Son kontrol noktasından beri hareket görmüş (veya hiç kontrol noktası olmayan) ürünler için
+    güncel stok_adedi ile yeni kontrol noktası yazar.
+    Defterden hesaplanan stok ile stok_adedi farklıysa (defter dışı değişiklik) ürün sapmalar
+    listesinde döner: (urun_id, defterdeki_stok, stok_adedi).
+    Döndürülen değer: (oluşturulan kontrol noktası sayısı, sapmalar).
+    """
+    if an is None:
+        an = timezone.now()
+    son_hareket = StokHareketi.objects.filter(urun=OuterRef('pk'), tarih__lte=an).order_by('-tarih').values('tarih')[:1]
+    with transaction.atomic():
+        urunler = (
+            Urun.objects.tarihteki_stok_ekle(an)
+            .annotate(son_hareket_tarihi=Subquery(son_hareket))
+            .order_by()
+            .values_list('pk', 'stok_adedi', 'tarihteki_stok', 'kontrol_tarihi', 'son_hareket_tarihi')
+        )
+        kontrol_noktalari, sapmalar = [], []
+        for urun_id, stok_adedi, defterdeki_stok, kontrol_tarihi, son_hareket_tarihi in urunler.iterator(chunk_size=2000):
+            if defterdeki_stok != stok_adedi:
+                sapmalar.append((urun_id, defterdeki_stok, stok_adedi))
+            elif kontrol_tarihi is not None and (son_hareket_tarihi is None or son_hareket_tarihi <= kontrol_tarihi):
+                continue # son kontrol noktasından beri değişiklik yok
+            kontrol_noktalari.append(StokKontrolNoktasi(urun_id=urun_id, tarih=an, stok_adedi=stok_adedi))
+        StokKontrolNoktasi.objects.bulk_create(kontrol_noktalari, batch_size=1000)
+    return len(kontrol_noktalari), sapmalar
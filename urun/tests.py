@@ -1,3 +1,248 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Sum
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from satis.models import Satis, SatisUrun
+from .katalog import KatalogGuncelleyici, katalog_satirlari
+from .models import (
+    HAREKET_DUZELTME, HAREKET_IADE, HAREKET_ILK_STOK, HAREKET_SATIS, STOK_AZ, STOK_KRITIK, STOK_YETERLI, STOK_YOK,
+    Kategori, StokAyarlari, StokHareketi, StokKontrolNoktasi, Urun,
+)
+from .stok import kontrol_noktalari_olustur
+
+
+class StokDefteriTests(TestCase):
+    def setUp(self):
+        self.urun = Urun.objects.create(ad="Çerçeve", satis_fiyati=Decimal('100.00'), stok_adedi=10)
+
+    def hareketler(self):
+        return list(StokHareketi.objects.filter(urun=self.urun).order_by('id').values_list('degisim', 'neden', 'satis_no'))
+
+    def test_stok_degistiren_yollar_deftere_yazar(self):
+        satis = Satis.objects.create()
+        satis_urun = SatisUrun.objects.create(satis=satis, urun=self.urun, adet=3)
+        satis_urun.delete()
+        urun = Urun.objects.get(pk=self.urun.pk)
+        urun.stok_adedi = 15
+        urun.save()
+        self.assertEqual(self.hareketler(), [
+            (10, HAREKET_ILK_STOK, None),
+            (-3, HAREKET_SATIS, satis.pk),
+            (3, HAREKET_IADE, satis.pk),
+            (5, HAREKET_DUZELTME, None),
+        ])
+
+    def defter_toplami(self):
+        return StokHareketi.objects.filter(urun=self.urun).aggregate(toplam=Sum('degisim'))['toplam']
+
+    def test_stok_yazilmayan_kayit_deftere_yazmaz(self):
+        urun = Urun.objects.get(pk=self.urun.pk)
+        urun.ad = "Güneş Gözlüğü"
+        urun.stok_adedi = 99
+        urun.save(update_fields=['ad'])
+        self.assertEqual(Urun.objects.get(pk=self.urun.pk).stok_adedi, 10)
+        self.assertFalse(StokHareketi.objects.filter(neden=HAREKET_DUZELTME).exists())
+
+    def test_eszamanli_satis_elle_kayitta_ezilmez(self):
+        urun = Urun.objects.get(pk=self.urun.pk) # form açıldı: 10
+        SatisUrun.objects.create(satis=Satis.objects.create(), urun=self.urun, adet=1) # 9
+        urun.ad = "Güneş Gözlüğü"
+        urun.save()
+        self.assertEqual(Urun.objects.get(pk=self.urun.pk).stok_adedi, 9)
+
+        # Elle düzeltme okunan değere göre fark olarak uygulanır: 9 + (14 - 9)
+        urun = Urun.objects.get(pk=self.urun.pk)
+        SatisUrun.objects.create(satis=Satis.objects.create(), urun=self.urun, adet=2) # 7
+        urun.stok_adedi = 14
+        urun.save()
+        self.assertEqual(urun.stok_adedi, 12)
+        self.assertEqual(Urun.objects.get(pk=self.urun.pk).stok_adedi, 12)
+        self.assertEqual(self.defter_toplami(), 12)
+
+    def test_admin_formu_acilistaki_stoga_gore_kaydeder(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'sifre'))
+        veri = {
+            'ad': "Çerçeve", 'satis_fiyati': '100.00', 'stok_adedi': '10', 'stok_adedi_formdaki': '10',
+            'kategori': '', 'marka': '', 'model_kodu': '', 'aciklama': '', 'alis_fiyati': '',
+        }
+        # Form 10 ile açıkken 3 adet satıldı; stok alanına dokunulmadan kaydedildi
+        SatisUrun.objects.create(satis=Satis.objects.create(), urun=self.urun, adet=3)
+        response = self.client.post(reverse('admin:urun_urun_change', args=[self.urun.pk]), veri)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Urun.objects.get(pk=self.urun.pk).stok_adedi, 7)
+
+        # Stok 7 iken açılan formda 12 girildi, kayıttan önce 1 adet daha satıldı: +5 düzeltme
+        SatisUrun.objects.create(satis=Satis.objects.create(), urun=self.urun, adet=1)
+        self.client.post(reverse('admin:urun_urun_change', args=[self.urun.pk]), {**veri, 'stok_adedi': '12', 'stok_adedi_formdaki': '7'})
+        self.assertEqual(Urun.objects.get(pk=self.urun.pk).stok_adedi, 11)
+        self.assertEqual(self.defter_toplami(), 11)
+
+    def test_toplu_silme_hareketleri_satis_bazinda_yazar(self):
+        satis_1, satis_2 = Satis.objects.create(), Satis.objects.create()
+        SatisUrun.objects.create(satis=satis_1, urun=self.urun, adet=2)
+        SatisUrun.objects.create(satis=satis_2, urun=self.urun, adet=1)
+        Satis.objects.all().delete()
+        iadeler = StokHareketi.objects.filter(neden=HAREKET_IADE).order_by('satis_no').values_list('satis_no', 'degisim')
+        self.assertEqual(list(iadeler), [(satis_1.pk, 2), (satis_2.pk, 1)])
+
+    def test_stokta_olmayan_urunun_dusumu_deftere_yazilmaz(self):
+        Urun.objects.filter(pk=self.urun.pk).update(stok_adedi=0)
+        SatisUrun.objects.create(satis=Satis.objects.create(), urun=self.urun, adet=2)
+        self.assertFalse(StokHareketi.objects.filter(neden=HAREKET_SATIS).exists())
+
+    def test_tarihteki_stok_kontrol_noktasindan_hesaplanir(self):
+        simdi = timezone.now()
+        StokHareketi.objects.filter(urun=self.urun).update(tarih=simdi - timedelta(days=10))
+        StokKontrolNoktasi.objects.create(urun=self.urun, tarih=simdi - timedelta(days=5), stok_adedi=8)
+        StokHareketi.objects.create(urun=self.urun, degisim=-2, neden=HAREKET_SATIS, tarih=simdi - timedelta(days=3))
+        StokHareketi.objects.create(urun=self.urun, degisim=4, neden=HAREKET_DUZELTME, tarih=simdi - timedelta(days=1))
+
+        self.assertEqual(self.urun.tarihteki_stok(simdi - timedelta(days=7)), 10)
+        self.assertEqual(self.urun.tarihteki_stok(simdi - timedelta(days=5)), 8)
+        self.assertEqual(self.urun.tarihteki_stok(simdi - timedelta(days=2)), 6)
+        self.assertEqual(self.urun.tarihteki_stok(simdi), 10)
+
+    def test_kontrol_noktasi_sapmalari_raporlar(self):
+        # Defter dışı (doğrudan UPDATE) değişiklik sapma olarak görünür
+        Urun.objects.filter(pk=self.urun.pk).update(stok_adedi=7)
+        olusturulan, sapmalar = kontrol_noktalari_olustur()
+        self.assertEqual(olusturulan, 1)
+        self.assertEqual(sapmalar, [(self.urun.pk, 10, 7)])
+        self.assertEqual(self.urun.tarihteki_stok(timezone.now()), 7)
+
+        # Yeni hareket yoksa tekrar kontrol noktası yazılmaz
+        self.assertEqual(kontrol_noktalari_olustur(), (0, []))
+
+
+class StokAyarlariTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_kayit_yoklugu_sinirli_sure_onbellekte_kalir(self):
+        with mock.patch.object(cache, 'set', wraps=cache.set) as onbellege_yaz:
+            self.assertIsNone(StokAyarlari.yukle())
+        deger, timeout = onbellege_yaz.call_args.args[1:]
+        self.assertIs(deger, False)
+        self.assertIsNotNone(timeout)
+        self.assertLessEqual(timeout, 60)
+
+    def test_kaydetme_onbellegi_temizler(self):
+        self.assertIsNone(StokAyarlari.yukle())
+        with self.captureOnCommitCallbacks(execute=True):
+            StokAyarlari.objects.create(dusuk_stok_esik_1=5, dusuk_stok_esik_2=15)
+        ayarlar = StokAyarlari.yukle()
+        self.assertEqual((ayarlar.dusuk_stok_esik_1, ayarlar.dusuk_stok_esik_2), (5, 15))
+        with self.assertNumQueries(0):
+            StokAyarlari.yukle()
+
+
+class StokBandiTests(TestCase):
+    STOKLAR = (-2, 0, 1, 9, 10, 29, 30, 100)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'sifre'))
+        self.ayarlar = StokAyarlari.objects.create(dusuk_stok_esik_1=10, dusuk_stok_esik_2=30)
+        self.urunler = {
+            stok: Urun.objects.create(ad=f"Ürün {stok:+04d}", satis_fiyati=Decimal('10.00'), stok_adedi=stok)
+            for stok in self.STOKLAR
+        }
+
+    def liste(self, url='admin:urun_urun_changelist', **parametreler):
+        response = self.client.get(reverse(url), parametreler)
+        self.assertEqual(response.status_code, 200)
+        return [urun.stok_adedi for urun in response.context['cl'].result_list]
+
+    def bantlar(self):
+        return {bant: sorted(self.liste(stok_bandi=bant)) for bant in (STOK_YOK, STOK_KRITIK, STOK_AZ, STOK_YETERLI)}
+
+    def test_bant_sinirlari(self):
+        beklenen = {
+            STOK_YOK: [-2, 0],
+            STOK_KRITIK: [1, 9], # esik_1 dahil değil
+            STOK_AZ: [10, 29], # esik_2 dahil değil
+            STOK_YETERLI: [30, 100],
+        }
+        self.assertEqual(self.bantlar(), beklenen)
+        # Liste sütunundaki bant (annotation) filtreyle aynı sınırları kullanır
+        for stok, bant in Urun.objects.stok_bandi_ekle().values_list('stok_adedi', 'stok_bandi'):
+            self.assertIn(stok, beklenen[bant])
+
+    def test_ayar_degisince_esikler_yenilenir(self):
+        self.assertEqual(self.bantlar()[STOK_KRITIK], [1, 9])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('admin:urun_stokayarlari_change', args=[self.ayarlar.pk]), {
+                'dusuk_stok_esik_1': '5', 'dusuk_stok_esik_2': '50',
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.bantlar(), {
+            STOK_YOK: [-2, 0], STOK_KRITIK: [1], STOK_AZ: [9, 10, 29, 30], STOK_YETERLI: [100],
+        })
+        response = self.client.get(reverse('admin:urun_urun_changelist'))
+        self.assertContains(response, "Stok Kritik (&lt; 5)")
+
+    def test_yeniden_siparis_listesi(self):
+        url = 'admin:urun_yenidensiparisurunu_changelist'
+        self.assertEqual(self.liste(url), [-2, 0, 1, 9, 10, 29])
+        self.assertEqual(self.liste(url, stok_bandi=STOK_AZ), [10, 29])
+
+        # Ayar kaydı yoksa sadece stokta olmayanlar listelenir
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ayarlar.delete()
+        self.assertEqual(self.liste(url), [-2, 0])
+
+
+class KatalogGuncelleyiciTests(TestCase):
+    def setUp(self):
+        self.gunes = Kategori.objects.create(ad="Güneş Gözlüğü")
+        self.aviator = Urun.objects.create(
+            ad="Aviator", marka="Ray-Ban", model_kodu="RB-3025", kategori=self.gunes,
+            alis_fiyati=Decimal('400.00'), satis_fiyati=Decimal('900.00'), stok_adedi=5,
+        )
+        self.wayfarer = Urun.objects.create(ad="Wayfarer", marka="Ray-Ban", model_kodu="RB-2140", satis_fiyati=Decimal('800.00'), stok_adedi=3)
+
+    def katalog(self):
+        metin = (
+            "marka,model_kodu,ad,kategori,alis_fiyati,satis_fiyati,stok_adedi\n"
+            "RAY-BAN ,rb-3025,Aviator,GÜNEŞ GÖZLÜĞÜ,400,950,99\n" # fiyat değişti; stok ezilmez
+            "Ray-Ban,RB-2140,Wayfarer,,,800.00,\n" # değişmedi
+            "Oakley,OO-9208,,Spor,\"300,50\",600,4\n" # yeni ürün ve kategori
+            "Oakley,OO-0000,,,,,\n" # yeni ürün için satis_fiyati zorunlu
+            "Ray-Ban,RB-2140,,,,-1,\n" # dosyada tekrar ediyor
+            ",,Adsız,,,100,\n" # model_kodu zorunlu
+        )
+        return katalog_satirlari(StringIO(metin), 'csv')
+
+    def test_yeni_guncellenen_ve_degismeyen_urunler_sayilir(self):
+        guncelleyici = KatalogGuncelleyici(parca_boyutu=1).calistir(self.katalog())
+        self.assertEqual(
+            {alan: guncelleyici.sayaclar[alan] for alan in ('okunan', 'yeni', 'guncellenen', 'degismeyen', 'yeni_kategori')},
+            {'okunan': 6, 'yeni': 1, 'guncellenen': 1, 'degismeyen': 1, 'yeni_kategori': 1},
+        )
+        self.assertEqual(dict(guncelleyici.alan_degisiklikleri), {'satis_fiyati': 1})
+        self.assertEqual([satir_no for satir_no, _ in guncelleyici.hatalar], [5, 6, 7])
+
+        self.aviator.refresh_from_db()
+        self.assertEqual((self.aviator.satis_fiyati, self.aviator.stok_adedi, self.aviator.kategori), (Decimal('950.00'), 5, self.gunes))
+        yeni = Urun.objects.get(model_kodu="OO-9208")
+        self.assertEqual((yeni.ad, yeni.kategori.ad, yeni.alis_fiyati, yeni.stok_adedi), ("Oakley OO-9208", "Spor", Decimal('300.50'), 4))
+        self.assertEqual(list(StokHareketi.objects.filter(urun=yeni).values_list('degisim', 'neden')), [(4, HAREKET_ILK_STOK)])
+
+        # Aynı dosya ikinci kez uygulandığında değişiklik yok
+        guncelleyici = KatalogGuncelleyici().calistir(self.katalog())
+        self.assertEqual((guncelleyici.sayaclar['yeni'], guncelleyici.sayaclar['guncellenen'], guncelleyici.sayaclar['degismeyen']), (0, 0, 3))
 
-# Create your tests here.
+    def test_dry_run_yazmaz(self):
+        guncelleyici = KatalogGuncelleyici(dry_run=True).calistir(self.katalog())
+        self.assertEqual((guncelleyici.sayaclar['yeni'], guncelleyici.sayaclar['guncellenen']), (1, 1))
+        self.assertFalse(Urun.objects.filter(model_kodu="OO-9208").exists())
+        self.assertFalse(Kategori.objects.filter(ad="Spor").exists())
+        self.assertEqual(Urun.objects.get(pk=self.aviator.pk).satis_fiyati, Decimal('900.00'))